@@ -0,0 +1,95 @@
+"""
+Compare picking random members from an IndexedSet against copying a set into a list
+
+The TaskSets used to do random.choice(list(members)) on every task, which copies every member.
+
+    python -m benchmarks.indexed_set [--sizes 100 1000 10000] [--iterations 10000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from open_discussions.util.sampling import IndexedSet
+
+
+def choice_from_set(members):
+    """How the TaskSets used to pick a member"""
+    return random.choice(list(members))
+
+
+def choice_from_indexed_set(members):
+    """How the TaskSets pick a member now"""
+    return members.choice()
+
+
+def churn(members, new_value):
+    """Pick a member, remove it and add a new one, like remove_contributor followed by add_contributor"""
+    value = members.choice() if isinstance(members, IndexedSet) else choice_from_set(members)
+    members.discard(value)
+    members.add(new_value)
+
+
+def measure(func, iterations):
+    """
+    Time a function and trace its allocations
+
+    Returns:
+        tuple: seconds per call and peak bytes allocated per call
+    """
+    start = time.perf_counter()
+    for iteration in range(iterations):
+        func(iteration)
+    seconds = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    peak = 0
+    for iteration in range(min(iterations, 100)):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(iteration)
+        peak += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return seconds, peak / min(iterations, 100)
+
+
+def benchmark_size(size, iterations):
+    """
+    Benchmark both containers holding size members
+
+    Returns:
+        list: rows of operation, container, seconds per call and bytes per call
+    """
+    values = ["user_{}".format(index) for index in range(size)]
+    members = set(values)
+    indexed = IndexedSet(values)
+
+    rows = []
+    for operation, container, func in [
+            ("choice", "set", lambda _: choice_from_set(members)),
+            ("choice", "IndexedSet", lambda _: choice_from_indexed_set(indexed)),
+            ("churn", "set", lambda iteration: churn(members, "new_{}".format(iteration))),
+            ("churn", "IndexedSet", lambda iteration: churn(indexed, "new_{}".format(iteration))),
+    ]:
+        seconds, alloc_bytes = measure(func, iterations)
+        rows.append((operation, container, seconds, alloc_bytes))
+    return rows
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="numbers of members")
+    parser.add_argument("--iterations", type=int, default=10000, help="calls per operation")
+    args = parser.parse_args()
+
+    print("  {:>8} {:<8} {:<12} {:>10} {:>10}".format("size", "op", "container", "us/call", "KiB/call"))
+    for size in args.sizes:
+        for operation, container, seconds, alloc_bytes in benchmark_size(size, args.iterations):
+            print("  {:>8} {:<8} {:<12} {:>10.2f} {:>10.2f}".format(
+                size, operation, container, seconds * 1e6, alloc_bytes / 1024
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Microbenchmarks for the client-side cost of our locustfiles
+
+Each suite drives a TaskSet from one of our locustfiles against the mock backend
+and reports, per task, the CPU time the load generator spends, the memory it allocates,
+and the resulting ceiling on requests per second for one core.
+
+The mock backend runs in a separate process so its CPU time isn't counted against the client.
+
+    python -m benchmarks.locustfiles [--iterations 200] [--suite learn_search ...]
+"""
+# locust must be imported first so gevent can monkey patch the standard library
+import locust  # pylint: disable=unused-import,wrong-import-order
+from locust.env import Environment
+from locust.exception import InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Suite = namedtuple("Suite", [
+    "name",
+    # dotted path of the locustfile module
+    "module",
+    # name of the user class in the module
+    "user_class",
+    # names of the TaskSet classes from the user down to the one being benchmarked
+    "task_sets",
+    # task names to run once, unmeasured, so the benchmarked tasks have data to work with,
+    # on the innermost TaskSet which has them
+    "warmup",
+    # task names to benchmark
+    "tasks",
+])
+
+SUITES = [
+    Suite(
+        "learn_search", "open_discussions.learn.search", "AnonymousUser",
+        ["SearchPage"], [], ["new_search", "next_page"],
+    ),
+    Suite(
+        "od_reddit", "open_discussions.channels.loadtest_reddit", "WebsiteUser",
+        ["UserBehavior", "UsersChannel"], ["add_contributor", "add_contributor", "create_post", "create_comment"],
+        [
+            "add_contributor", "load_frontpage", "load_channel_posts", "create_post",
+            "create_comment", "upvote_post", "upvote_comment", "remove_contributor",
+        ],
+    ),
+    Suite(
+        "od_users", "open_discussions.channels.loadtest_od_users", "WebsiteUser",
+        ["UserBehavior", "UsersChannel"], ["add_contributor", "add_contributor", "create_post", "create_comment"],
+        [
+            "add_contributor", "load_frontpage", "load_channels", "load_channel_posts",
+            "load_post_comments", "create_post", "create_comment", "upvote_post", "upvote_comment",
+            # last, since it empties the channel's contributors
+            "remove_contributor",
+        ],
+    ),
+    Suite(
+        "od_users_creation", "open_discussions.channels.loadtest_users_creation", "WebsiteUser",
+        ["UserCreation"], [], ["create_users", "update_users"],
+    ),
+    Suite(
+        "micromasters_login", "micromasters.loadtest_first_login", "WebsiteUser",
+        ["UserBehavior", "UserLogIn"], [], ["login", "logout"],
+    ),
+    Suite(
+        "micromasters_dashboard", "micromasters.loadtest_only_get", "WebsiteUser",
+        ["UserBehaviorGet", "UserLogIn", "UserDashboardRefresh"], ["login"], ["dashboard_reload"],
+    ),
+    Suite(
+        "rapid_response", "rapid_response.loadtest_rapid_response", "WebsiteUser",
+        ["UserBehavior", "UserLogIn", "ProblemSubmission"], ["login_and_enroll"], ["submit_answer"],
+    ),
+]
+
+TaskResult = namedtuple("TaskResult", ["task", "calls", "requests", "errors", "cpu_seconds", "alloc_bytes"])
+
+
+def mock_backend_environment(base_url):
+    """
+    Settings pointing every locustfile at the mock backend
+
+    Args:
+        base_url (str): the mock backend url
+
+    Returns:
+        dict: environment variables
+    """
+    return {
+        "OPEN_DISCUSSIONS_BASE_URL": base_url,
+        "OPEN_DISCUSSIONS_REDDIT_URL": base_url,
+        "OPEN_DISCUSSIONS_REDDIT_CLIENT_ID": "benchmark",
+        "OPEN_DISCUSSIONS_REDDIT_SECRET": "benchmark",
+        "OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN": "benchmark",
+        "OPEN_DISCUSSIONS_WAIT_BEFORE_LOAD_TEST_SECONDS": "0",
+        # measure the calls, not the pacing
+        "OPEN_DISCUSSIONS_PROVISIONING_RATE": "0",
+        "MICROMASTERS_BASE_URL": base_url,
+        "EDXORG_BASE_URL": base_url,
+        "LMS_BASE_URL": base_url,
+        "USERNAMES_IN_EDX": "benchmark_user_1,benchmark_user_2",
+        "RAPID_RESPONSE_COURSE_DATA": json.dumps([{
+            "course_id": "course-v1:MIT+benchmark+2020",
+            "blocks": [{
+                "id": "block-v1:MIT+benchmark+2020+type@problem+block@benchmark",
+                "choicegroup_id": "benchmark_2_1",
+                "answer_ids": ["choice_0", "choice_1"],
+            }],
+        }]),
+    }
+
+
+def start_mock_backend(port):
+    """
+    Start the mock backend in a subprocess and wait for it to accept connections
+
+    Args:
+        port (int): the port to listen on
+
+    Returns:
+        subprocess.Popen: the server process
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mock_backend", "--port", str(port)],
+        cwd=REPO_ROOT,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise Exception("Mock backend didn't start on port {}".format(port))
+
+
+def load_locustfile(module_name):
+    """
+    Import a locustfile the way locust would, with its own directory on the path
+
+    Args:
+        module_name (str): dotted path of the locustfile module
+
+    Returns:
+        module: the imported locustfile
+    """
+    directory = os.path.join(REPO_ROOT, *module_name.split(".")[:-1])
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(module_name)
+
+
+def run_task(task_set, task_name):
+    """
+    Run a task once
+
+    Returns:
+        bool: False if the task raised an exception other than an interrupt
+    """
+    try:
+        getattr(task_set, task_name)()
+    except (InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately):
+        pass
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def benchmark_suite(suite, host, iterations, alloc_iterations):
+    """
+    Benchmark the tasks of a suite
+
+    Args:
+        suite (Suite): the suite to run
+        host (str): the mock backend url
+        iterations (int): the number of timed calls per task
+        alloc_iterations (int): the number of calls per task measured for allocations
+
+    Returns:
+        list(TaskResult): the results for each task
+    """
+    module = load_locustfile(suite.module)
+    user_class = getattr(module, suite.user_class)
+    # the runner would normally do this when the host is given on the command line
+    user_class.host = host
+    environment = Environment(user_classes=[user_class], host=host)
+
+    request_counts = {"requests": 0, "errors": 0}
+
+    def count_request(response=None, exception=None, **kwargs):  # pylint: disable=unused-argument
+        if response is None:
+            # a custom event, e.g. a page's load time, rather than an HTTP request
+            return
+        request_counts["requests"] += 1
+        if exception is not None:
+            request_counts["errors"] += 1
+
+    environment.events.request.add_listener(count_request)
+
+    parent = user_class(environment)
+    task_sets = []
+    for task_set_name in suite.task_sets:
+        task_set = getattr(module, task_set_name)(parent)
+        task_set.on_start()
+        task_sets.append(task_set)
+        parent = task_set
+    for task_name in suite.warmup:
+        run_task(next(task_set for task_set in reversed(task_sets) if hasattr(task_set, task_name)), task_name)
+
+    results = []
+    for task_name in suite.tasks:
+        request_counts.update(requests=0, errors=0)
+        failures = 0
+        start = time.process_time()
+        for _ in range(iterations):
+            failures += not run_task(task_set, task_name)
+        cpu_seconds = time.process_time() - start
+        requests, errors = request_counts["requests"], request_counts["errors"] + failures
+
+        tracemalloc.start()
+        alloc_bytes = 0
+        for _ in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            run_task(task_set, task_name)
+            alloc_bytes += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+
+        results.append(TaskResult(
+            task_name, iterations, requests, errors, cpu_seconds, alloc_bytes / max(alloc_iterations, 1)
+        ))
+    return results
+
+
+def format_results(suite_name, results):
+    """Format a suite's results as a table"""
+    lines = [
+        suite_name,
+        "  {:<24} {:>8} {:>8} {:>7} {:>12} {:>12} {:>12}".format(
+            "task", "calls", "requests", "errors", "cpu us/call", "rps/core", "peak KiB"
+        ),
+    ]
+    for result in results:
+        per_call = result.cpu_seconds / result.calls * 1e6 if result.calls else 0
+        rps = result.requests / result.cpu_seconds if result.cpu_seconds else 0
+        lines.append("  {:<24} {:>8} {:>8} {:>7} {:>12.1f} {:>12.0f} {:>12.1f}".format(
+            result.task, result.calls, result.requests, result.errors, per_call, rps, result.alloc_bytes / 1024
+        ))
+    return "\n".join(lines)
+
+
+def main():
+    """Run the benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per task")
+    parser.add_argument("--alloc-iterations", type=int, default=20, help="calls per task traced for allocations")
+    parser.add_argument("--port", type=int, default=8099, help="port for the mock backend")
+    parser.add_argument("--suite", action="append", choices=[suite.name for suite in SUITES],
+                        help="suites to run, defaults to all of them")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    host = "http://127.0.0.1:{}".format(args.port)
+    for key, value in mock_backend_environment(host).items():
+        os.environ.setdefault(key, value)
+
+    server = start_mock_backend(args.port)
+    output = {}
+    try:
+        for suite in SUITES:
+            if args.suite and suite.name not in args.suite:
+                continue
+            try:
+                results = benchmark_suite(suite, host, args.iterations, args.alloc_iterations)
+            except Exception as ex:  # pylint: disable=broad-except
+                print("{}\n  skipped: {!r}".format(suite.name, ex))
+                output[suite.name] = {"skipped": repr(ex)}
+                continue
+            print(format_results(suite.name, results))
+            output[suite.name] = [result._asdict() for result in results]
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(output, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+An open-loop load model, where tasks start at a scheduled rate whether or not earlier ones have finished
+
+Waiting between tasks is a closed loop: when the server slows down users send fewer requests,
+and the requests that would have been sent while they waited are never measured. Here every
+process shares a timeline of intended task start times. A user that finishes its task takes
+the next intended start time and sleeps until then, or starts straight away if it's already late.
+The lateness is kept in an HDR histogram, which workers send to the master like the latency
+histograms, and its percentiles are logged when the test stops. Unless LOCUST_ARRIVAL_CORRECTED is
+false, the latency recorder also records every request under the CORRECTED request type, with the
+lateness of its task added to its response time, see latency.py. Greenlets spawned by a task to send
+some of its requests have to be started with in_task for their requests to be corrected too.
+
+Users have to keep up with the rate for the schedule to hold, so run enough of them that the
+schedule lag stays small. A user's first task starts as soon as it's spawned.
+
+The rate is set with LOCUST_ARRIVAL_RATE, either a constant rate
+
+    LOCUST_ARRIVAL_RATE=50
+
+or stages of SECONDS:RATE or SECONDS:FROM_RATE-TO_RATE, which ramp linearly. Users stop after the
+last stage:
+
+    LOCUST_ARRIVAL_RATE=60:0-50,600:50,60:50-0
+
+Rates are in tasks per second across all workers, each worker takes its share of the timeline.
+"""
+import logging
+import math
+import random
+import time
+from collections import namedtuple
+from threading import local
+
+from hdrh.histogram import HdrHistogram
+from locust import events
+from locust.exception import StopUser
+from locust.runners import MasterRunner, WorkerRunner
+
+from common import settings
+from common.reporting import Collector, send_shares
+
+log = logging.getLogger(__name__)
+
+SHARE_MESSAGE = "arrival_share"
+LAG_KEY = "arrival_lag"
+LAG_HIGHEST_US = 3600 * 1000 * 1000
+LAG_PERCENTILES = (50, 90, 99, 99.9)
+CORRECTED_REQUEST_TYPE = "CORRECTED"
+
+UNIFORM = "uniform"
+POISSON = "poisson"
+
+# the intended start and lateness of the task each user is running, greenlet local under gevent
+LOCAL = local()
+
+
+class Stage(namedtuple("Stage", ["duration", "start_rate", "end_rate"])):
+    """A period during which the arrival rate changes linearly from start_rate to end_rate per second"""
+
+    @property
+    def arrivals(self):
+        """The number of arrivals during the stage"""
+        if math.isinf(self.duration):
+            return math.inf if self.start_rate > 0 else 0
+        return (self.start_rate + self.end_rate) * self.duration / 2
+
+    def time_of(self, arrivals):
+        """
+        Find when a number of arrivals have happened since the start of the stage
+
+        Args:
+            arrivals (float): the number of arrivals, at most self.arrivals
+
+        Returns:
+            float: seconds from the start of the stage
+        """
+        if self.start_rate == self.end_rate:
+            return arrivals / self.start_rate
+        slope = (self.end_rate - self.start_rate) / self.duration
+        discriminant = max(self.start_rate ** 2 + 2 * slope * arrivals, 0)
+        return (math.sqrt(discriminant) - self.start_rate) / slope
+
+
+def parse_schedule(spec):
+    """
+    Parse an arrival rate schedule, see the module docstring for the format
+
+    Args:
+        spec (str): the schedule
+
+    Returns:
+        list of Stage: the stages
+    """
+    try:
+        if ":" not in spec:
+            return [Stage(math.inf, float(spec), float(spec))]
+        stages = []
+        for part in spec.split(","):
+            duration, _, rates = part.partition(":")
+            start_rate, _, end_rate = rates.partition("-")
+            stages.append(Stage(float(duration), float(start_rate), float(end_rate or start_rate)))
+    except ValueError as ex:
+        raise ValueError("Invalid arrival rate {!r}".format(spec)) from ex
+    if any(stage.duration <= 0 or stage.start_rate < 0 or stage.end_rate < 0 for stage in stages):
+        raise ValueError("Invalid arrival rate {!r}".format(spec))
+    return stages
+
+
+def arrival_offsets(stages, process=UNIFORM):
+    """
+    Generate arrival times
+
+    Args:
+        stages (list of Stage): the schedule
+        process (str): UNIFORM for evenly spaced arrivals, POISSON for exponentially distributed gaps
+
+    Yields:
+        float: seconds from the start of the schedule of each arrival
+    """
+    def gap():
+        return random.expovariate(1) if process == POISSON else 1
+
+    stage_start = 0
+    target = gap()
+    for stage in stages:
+        arrivals = stage.arrivals
+        while target <= arrivals:
+            yield stage_start + stage.time_of(target)
+            target += gap()
+        target -= arrivals
+        stage_start += stage.duration
+
+
+class ArrivalTimeline:
+    """
+    This process's share of the intended task start times
+
+    Args:
+        stages (list of Stage): the schedule for all processes
+        process (str): UNIFORM or POISSON
+    """
+    def __init__(self, stages, process=UNIFORM):
+        self.stages = stages
+        self.process = process
+        self.worker_index = 0
+        self.worker_count = 1
+        self._offsets = None
+        self._start = None
+
+    def set_share(self, worker_index, worker_count):
+        """Take every worker_count'th arrival, starting from the worker_index'th"""
+        self.worker_index = worker_index
+        self.worker_count = max(worker_count, 1)
+
+    def start(self):
+        """Start the schedule now"""
+        offsets = arrival_offsets(self.stages, self.process)
+        self._offsets = (
+            offset for number, offset in enumerate(offsets)
+            if number % self.worker_count == self.worker_index
+        )
+        self._start = time.monotonic()
+
+    def next_start(self):
+        """
+        Take the next intended start time
+
+        Returns:
+            float: a time.monotonic() time, or None after the last stage
+        """
+        if self._offsets is None:
+            self.start()
+        offset = next(self._offsets, None)
+        return None if offset is None else self._start + offset
+
+
+class LagHistogram:
+    """
+    How late tasks started, in microseconds
+
+    Args:
+        significant_figures (int): how precise the histograms are
+    """
+    def __init__(self, significant_figures=3):
+        self.significant_figures = significant_figures
+        self.unreported = self._new_histogram()
+        self.totals = self._new_histogram()
+
+    def _new_histogram(self):
+        """Make an empty histogram"""
+        return HdrHistogram(1, LAG_HIGHEST_US, self.significant_figures)
+
+    def record(self, lag):
+        """Record how many seconds late a task started"""
+        self.unreported.record_value(min(max(int(round(lag * 1000 * 1000)), 1), LAG_HIGHEST_US))
+
+    def report(self):
+        """
+        Take what was recorded since the last report
+
+        Returns:
+            str: the encoded histogram, or None if nothing was recorded
+        """
+        if not self.unreported.get_total_count():
+            return None
+        encoded = self.unreported.encode().decode("ascii")
+        self.unreported.reset()
+        return encoded
+
+    def merge(self, report):
+        """Add a report to the totals"""
+        self.totals.decode_and_add(report)
+
+    def reset(self):
+        """Forget everything recorded"""
+        self.unreported.reset()
+        self.totals.reset()
+
+    def log(self):
+        """Log the percentiles of the totals"""
+        count = self.totals.get_total_count()
+        if not count:
+            return
+        log.info(
+            "Schedule lag of %d tasks: %s, max %.1fms",
+            count,
+            ", ".join(
+                "p{} {:.1f}ms".format(percentile, self.totals.get_value_at_percentile(percentile) / 1000)
+                for percentile in LAG_PERCENTILES
+            ),
+            self.totals.get_max_value() / 1000,
+        )
+
+
+TIMELINE = ArrivalTimeline(parse_schedule(settings.LOCUST_ARRIVAL_RATE), settings.LOCUST_ARRIVAL_PROCESS) \
+    if settings.LOCUST_ARRIVAL_RATE else None
+LAG = LagHistogram(settings.LOCUST_HDR_SIGNIFICANT_FIGURES) if TIMELINE is not None else None
+
+
+def open_loop(closed_loop_wait):
+    """
+    Make a wait_time which follows the arrival timeline if LOCUST_ARRIVAL_RATE is set
+
+    Args:
+        closed_loop_wait (callable): the wait_time to use otherwise, e.g. between(1, 10)
+
+    Returns:
+        callable: a wait_time for a User
+    """
+    def wait_time(user):
+        if TIMELINE is None:
+            return closed_loop_wait(user)
+        intended_start = TIMELINE.next_start()
+        if intended_start is None:
+            raise StopUser()
+        now = time.monotonic()
+        LOCAL.intended_start = intended_start
+        LOCAL.lag = max(now - intended_start, 0)
+        LAG.record(LOCAL.lag)
+        return max(intended_start - now, 0)
+
+    return wait_time
+
+
+def in_task(function):
+    """
+    Wrap a function to run in another greenlet as part of the current task, so its requests are corrected
+    for the task's lateness too
+
+    Args:
+        function (callable): the function the greenlet runs
+
+    Returns:
+        callable: the wrapped function
+    """
+    intended_start = getattr(LOCAL, "intended_start", None)
+    lag = getattr(LOCAL, "lag", None)
+
+    def run(*args, **kwargs):
+        LOCAL.intended_start = intended_start
+        LOCAL.lag = lag
+        return function(*args, **kwargs)
+
+    return run
+
+
+def _on_share(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, take the share of the timeline the master gave us"""
+    TIMELINE.set_share(msg.data["worker_index"], msg.data["worker_count"])
+
+
+@events.init.add_listener
+def _attach(environment, **kwargs):
+    """Share the timeline between workers"""
+    if TIMELINE is not None and isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(SHARE_MESSAGE, _on_share)
+
+
+@events.test_start.add_listener
+def _start_timeline(environment, **kwargs):
+    """Start the timeline, or on the master tell each worker which share of it to take"""
+    if TIMELINE is None:
+        return
+    if isinstance(environment.runner, MasterRunner):
+        send_shares(environment.runner, SHARE_MESSAGE)
+    else:
+        TIMELINE.start()
+
+
+COLLECTOR = Collector(LAG_KEY, report=LAG.report, merge=LAG.merge, log=LAG.log, reset=LAG.reset) \
+    if LAG is not None else None
@@ -0,0 +1,292 @@
+"""
+Per-endpoint latency histograms, recorded from every HTTP request and exported when the test stops
+
+Locust's own stats round response times into coarse buckets, which is too rough for p99.9.
+The default "hdr" recorder keeps an HDR histogram per request type and endpoint, the name a
+request was reported under without its query string. They're accurate to
+LOCUST_HDR_SIGNIFICANT_FIGURES digits from 1 microsecond to an hour. Workers send their histograms
+to the master with each stats report and when they stop, and the master adds them together,
+so the merged percentiles are exact rather than averages of each worker's. Request events which
+aren't HTTP requests, like pages and transactions, see common.reporting.PSEUDO_REQUEST_TYPES,
+aren't recorded.
+
+If LOCUST_HDR_EXPECTED_INTERVAL_MS is set, HTTP requests are recorded with coordinated-omission
+correction: a request that took longer than the expected interval also records the requests
+that would have been sent while it was waiting, each waiting a little less. Use the interval
+between a user's requests under a healthy server. With LOCUST_ARRIVAL_RATE set, tasks start on schedule
+however slow the earlier requests were, so leave the interval unset. Requests sent by a task are also
+recorded under the CORRECTED request type, with how late the task started added to their response time,
+unless LOCUST_ARRIVAL_CORRECTED is false, see arrival.py.
+
+The histograms are written to LOCUST_HDR_FILE, one JSON object per line: a header, then for each
+endpoint its count, a few percentiles in milliseconds and the encoded histogram. Compare two runs with
+
+    python -m common.latency before.jsonl after.jsonl
+
+Other recorders can be plugged in with register_recorder and chosen with LOCUST_LATENCY_RECORDER,
+or set it to "" to record nothing.
+"""
+import abc
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from hdrh.histogram import HdrHistogram
+from locust import events
+
+from common import settings
+from common.arrival import CORRECTED_REQUEST_TYPE, LOCAL
+from common.reporting import PSEUDO_REQUEST_TYPES, Collector
+
+log = logging.getLogger(__name__)
+
+HISTOGRAMS_KEY = "latency_histograms"
+LOWEST_US = 1
+HIGHEST_US = 3600 * 1000 * 1000
+PERCENTILES = (50, 90, 99, 99.9, 99.99)
+
+
+def endpoint(name):
+    """The name a request was reported under, without a query string"""
+    return name.partition("?")[0]
+
+
+class LatencyRecorder(abc.ABC):
+    """
+    Records the response time of each request event, the interface recorders plug into
+
+    Recorders on workers hand their samples over with report() and the master passes them to merge().
+    """
+    @abc.abstractmethod
+    def record(self, request_type, name, response_time, response=None):
+        """
+        Record a request
+
+        Args:
+            request_type (str): the request type, e.g. GET
+            name (str): the name the request was reported under
+            response_time (float): milliseconds
+            response (requests.Response): the response, or None for requests that aren't HTTP
+        """
+
+    @abc.abstractmethod
+    def report(self):
+        """
+        Take the samples recorded since the last report, so a worker can send them to the master
+
+        Returns:
+            object: something JSON serializable, or None if nothing was recorded
+        """
+
+    @abc.abstractmethod
+    def merge(self, report):
+        """Add the samples from a worker's report"""
+
+    @abc.abstractmethod
+    def reset(self):
+        """Forget everything recorded"""
+
+    @abc.abstractmethod
+    def export(self, path):
+        """Write what was recorded to a file"""
+
+
+class HdrLatencyRecorder(LatencyRecorder):
+    """
+    Records an HDR histogram of microseconds per request type and endpoint
+
+    Each histogram takes around 200KiB, so requests with a query string in their name share one.
+
+    Args:
+        significant_figures (int): how precise the histograms are
+        expected_interval (float): milliseconds between requests for coordinated-omission correction, or 0
+    """
+    def __init__(self, significant_figures=3, expected_interval=0):
+        self.significant_figures = significant_figures
+        self.expected_interval = expected_interval
+        self.histograms = {}
+        # what has changed since the last report, so workers only send what's new
+        self._unreported = {}
+
+    def _new_histogram(self):
+        """Make an empty histogram"""
+        return HdrHistogram(LOWEST_US, HIGHEST_US, self.significant_figures)
+
+    def record(self, request_type, name, response_time, response=None):
+        value = min(max(int(round(response_time * 1000)), LOWEST_US), HIGHEST_US)
+        key = (request_type, endpoint(name))
+        histogram = self._unreported.get(key)
+        if histogram is None:
+            histogram = self._unreported[key] = self._new_histogram()
+        if response is not None and self.expected_interval:
+            histogram.record_corrected_value(value, int(self.expected_interval * 1000))
+        else:
+            histogram.record_value(value)
+
+    def totals(self):
+        """
+        Add the unreported histograms into the totals
+
+        Returns:
+            dict: (request_type, name) to HdrHistogram
+        """
+        for key, histogram in self._unreported.items():
+            if key in self.histograms:
+                self.histograms[key].add(histogram)
+            else:
+                self.histograms[key] = histogram
+        self._unreported = {}
+        return self.histograms
+
+    def report(self):
+        report = []
+        for (request_type, name), histogram in self._unreported.items():
+            if histogram.get_total_count():
+                report.append([request_type, name, histogram.encode().decode("ascii")])
+                # reused rather than replaced, they're too big to allocate on every report
+                histogram.reset()
+        return report or None
+
+    def merge(self, report):
+        for request_type, name, encoded in report:
+            key = (request_type, name)
+            if key not in self.histograms:
+                self.histograms[key] = self._new_histogram()
+            self.histograms[key].decode_and_add(encoded)
+
+    def reset(self):
+        self.histograms = {}
+        self._unreported = {}
+
+    def export(self, path):
+        histograms = self.totals()
+        with open(path, "w") as f:
+            f.write(json.dumps({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "unit": "us",
+                "lowest": LOWEST_US,
+                "highest": HIGHEST_US,
+                "significant_figures": self.significant_figures,
+                "expected_interval_ms": self.expected_interval,
+            }) + "\n")
+            for (request_type, name), histogram in sorted(histograms.items()):
+                f.write(json.dumps({
+                    "request_type": request_type,
+                    "name": name,
+                    "count": histogram.get_total_count(),
+                    "percentiles_ms": {
+                        str(percentile): histogram.get_value_at_percentile(percentile) / 1000
+                        for percentile in PERCENTILES
+                    },
+                    "max_ms": histogram.get_max_value() / 1000,
+                    "histogram": histogram.encode().decode("ascii"),
+                }) + "\n")
+        log.info("Wrote latency histograms for %d endpoints to %s", len(histograms), path)
+
+
+RECORDERS = {
+    "hdr": lambda: HdrLatencyRecorder(
+        settings.LOCUST_HDR_SIGNIFICANT_FIGURES, settings.LOCUST_HDR_EXPECTED_INTERVAL_MS
+    ),
+}
+
+
+def register_recorder(name, factory):
+    """
+    Make a recorder available to LOCUST_LATENCY_RECORDER
+
+    Args:
+        name (str): the name to select it with
+        factory (callable): makes a LatencyRecorder
+    """
+    RECORDERS[name] = factory
+
+
+def _make_recorder():
+    """Make the recorder chosen in the settings"""
+    if not settings.LOCUST_LATENCY_RECORDER:
+        return None
+    try:
+        return RECORDERS[settings.LOCUST_LATENCY_RECORDER]()
+    except KeyError as ex:
+        raise ValueError("Unknown latency recorder {!r}".format(settings.LOCUST_LATENCY_RECORDER)) from ex
+
+
+RECORDER = _make_recorder()
+
+
+@events.request.add_listener
+def _record(request_type, name, response_time, response=None, **kwargs):
+    """Record every HTTP request"""
+    if RECORDER is None or response_time is None or request_type in PSEUDO_REQUEST_TYPES:
+        return
+    RECORDER.record(request_type, name, response_time, response)
+    lag = getattr(LOCAL, "lag", None)
+    if lag is not None and settings.LOCUST_ARRIVAL_CORRECTED:
+        RECORDER.record(CORRECTED_REQUEST_TYPE, name, response_time + lag * 1000, response)
+
+
+def _export():
+    """Write the histograms"""
+    if settings.LOCUST_HDR_FILE:
+        RECORDER.export(settings.LOCUST_HDR_FILE)
+
+
+COLLECTOR = Collector(
+    HISTOGRAMS_KEY,
+    report=RECORDER.report,
+    merge=RECORDER.merge,
+    log=_export,
+    reset=RECORDER.reset,
+) if RECORDER is not None else None
+
+
+def load_histograms(path):
+    """
+    Read histograms exported by HdrLatencyRecorder
+
+    Args:
+        path (str): the exported file
+
+    Returns:
+        dict: (request_type, name) to HdrHistogram
+    """
+    histograms = {}
+    with open(path) as f:
+        next(f)
+        for line in f:
+            entry = json.loads(line)
+            histograms[(entry["request_type"], entry["name"])] = HdrHistogram.decode(entry["histogram"])
+    return histograms
+
+
+def compare(before_path, after_path, out=sys.stdout):
+    """
+    Print the percentiles of each endpoint in two exports side by side
+
+    Args:
+        before_path (str): the baseline export
+        after_path (str): the export to compare with it
+        out (file): where to print
+    """
+    before = load_histograms(before_path)
+    after = load_histograms(after_path)
+    out.write("{:<50} {:>8} {:>12} {:>12} {:>8}\n".format("endpoint", "pct", "before ms", "after ms", "change"))
+    for key in sorted(set(before) | set(after)):
+        for percentile in PERCENTILES:
+            values = [
+                histograms[key].get_value_at_percentile(percentile) / 1000 if key in histograms else None
+                for histograms in (before, after)
+            ]
+            change = "{:+.1%}".format(values[1] / values[0] - 1) if None not in values and values[0] else ""
+            out.write("{:<50} {:>8} {:>12} {:>12} {:>8}\n".format(
+                " ".join(key)[:50], "p{}".format(percentile),
+                *["-" if value is None else "{:.3f}".format(value) for value in values], change
+            ))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m common.latency BEFORE AFTER")
+    compare(sys.argv[1], sys.argv[2])
@@ -0,0 +1,202 @@
+"""
+Sessions logged in before the test starts and handed out to users
+
+Logging in takes several requests, so when every user logs in as part of its tasks, a large share of the
+traffic is logins rather than the pages being tested. With LOCUST_PRELOGIN set, each process logs in its share
+of the configured usernames when the test starts, LOCUST_PRELOGIN_CONCURRENCY at a time, and users start their
+tasks with one of those sessions instead:
+
+    LOGINS = login_pool("edX", settings.LMS_BASE_URL, settings.USERNAMES_IN_EDX, log_in)
+
+    def on_start(self):
+        login = LOGINS.hand_out(self.client)
+
+The logins aren't reported in locust's stats, so they don't skew a steady-state test. How many succeeded and
+how long they took is logged. The sessions are handed out in turn, so with more users than usernames several
+users share a session, and users mustn't log out of them. Each worker logs in every worker_count'th username,
+or one username if there are more workers than usernames, and a process running on its own logs in all of them.
+"""
+import logging
+import time
+from collections import namedtuple
+
+import gevent.pool
+from locust import events
+from locust.clients import HttpSession
+from locust.event import EventHook
+from locust.runners import MasterRunner, WorkerRunner
+
+from common import settings
+from common.reporting import send_shares
+
+log = logging.getLogger(__name__)
+
+Login = namedtuple("Login", [
+    "username",
+    # the session's cookies, http.cookiejar.Cookie
+    "cookies",
+    # what log_in returned, e.g. CSRF tokens
+    "variables",
+])
+
+SHARE_MESSAGE = "logins_share"
+
+# the pools to fill when the test starts
+POOLS = []
+
+
+class LoginPool:
+    """
+    Sessions of users logged in ahead of the test
+
+    Args:
+        name (str): what to call the logins in the logs
+        base_url (str): the host relative urls are sent to
+        usernames (list of str): the users to log in
+        log_in (callable): function of (client, username) which logs the user in with the client,
+            returning a dict of variables to hand out with the session, or None if it failed
+    """
+    def __init__(self, name, base_url, usernames, log_in):
+        self.name = name
+        self.base_url = base_url
+        self.usernames = usernames
+        self.log_in = log_in
+        self.worker_index = 0
+        self.worker_count = 1
+        self.logins = []
+        self._next = 0
+        self._requests = 0
+        self._failed_requests = 0
+
+    def set_share(self, worker_index, worker_count):
+        """Log in every worker_count'th username, starting from the worker_index'th"""
+        self.worker_index = worker_index
+        self.worker_count = max(worker_count, 1)
+
+    def share(self):
+        """
+        The usernames this process logs in
+
+        Returns:
+            list of str: every worker_count'th username, or one of them if there are more workers than usernames
+        """
+        usernames = self.usernames[self.worker_index::self.worker_count]
+        if not usernames and self.usernames:
+            usernames = [self.usernames[self.worker_index % len(self.usernames)]]
+        return usernames
+
+    def _count(self, exception=None, **kwargs):  # pylint: disable=unused-argument
+        """Count a login request"""
+        self._requests += 1
+        if exception is not None:
+            self._failed_requests += 1
+
+    def _log_in(self, username):
+        """Log a user in with a session of its own"""
+        request_event = EventHook()
+        request_event.add_listener(self._count)
+        client = HttpSession(self.base_url, request_event, None)
+        try:
+            variables = self.log_in(client, username)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Logging %s in to %s failed", username, self.name)
+            return None
+        if variables is None:
+            return None
+        return Login(username, list(client.cookies), variables)
+
+    def prepare(self, concurrency):
+        """
+        Log this process's share of the users in, replacing any sessions from before
+
+        Args:
+            concurrency (int): how many to log in at once
+        """
+        start = time.monotonic()
+        self._requests = self._failed_requests = 0
+        usernames = self.share()
+        pool = gevent.pool.Pool(concurrency)
+        self.logins = [login for login in pool.imap(self._log_in, usernames) if login is not None]
+        self._next = 0
+        log.info(
+            "Logged %d of %d users in to %s in %.1fs, %d at a time, with %d requests of which %d failed",
+            len(self.logins), len(usernames), self.name, time.monotonic() - start, concurrency,
+            self._requests, self._failed_requests,
+        )
+
+    def take(self):
+        """
+        Take the next session
+
+        Returns:
+            Login: the session, or None if nobody could be logged in
+        """
+        if not self.logins:
+            return None
+        login = self.logins[self._next % len(self.logins)]
+        self._next += 1
+        return login
+
+    def hand_out(self, client):
+        """
+        Give a user's client the next session
+
+        Args:
+            client (locust.clients.HttpSession or common.transport.RequestsCompatibleSession): the client
+
+        Returns:
+            Login: the session, or None if nobody could be logged in
+        """
+        login = self.take()
+        if login is not None:
+            for cookie in login.cookies:
+                client.cookies.set_cookie(cookie)
+        return login
+
+
+def login_pool(name, base_url, usernames, log_in):
+    """
+    Make a pool of sessions to fill when the test starts, if LOCUST_PRELOGIN is set
+
+    Args:
+        name (str): what to call the logins in the logs
+        base_url (str): the host relative urls are sent to
+        usernames (list of str): the users to log in
+        log_in (callable): function of (client, username), see LoginPool
+
+    Returns:
+        LoginPool: the pool, or None if LOCUST_PRELOGIN isn't set
+    """
+    if not settings.LOCUST_PRELOGIN:
+        return None
+    pool = LoginPool(name, base_url, usernames, log_in)
+    POOLS.append(pool)
+    return pool
+
+
+def _on_share(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, take the share of the usernames the master gave us"""
+    for pool in POOLS:
+        pool.set_share(msg.data["worker_index"], msg.data["worker_count"])
+
+
+@events.init.add_listener
+def _attach(environment, **kwargs):
+    """Share the usernames between workers"""
+    if POOLS and isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(SHARE_MESSAGE, _on_share)
+
+
+@events.test_start.add_listener
+def _prepare(environment, **kwargs):
+    """
+    Log everyone in before the users are spawned, in each process which runs users, or on the master tell each
+    worker which share of the usernames to log in
+    """
+    if not POOLS:
+        return
+    if isinstance(environment.runner, MasterRunner):
+        send_shares(environment.runner, SHARE_MESSAGE)
+        return
+    for pool in POOLS:
+        pool.prepare(settings.LOCUST_PRELOGIN_CONCURRENCY)
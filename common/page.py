@@ -0,0 +1,82 @@
+"""
+Page loads, a scenario item whose requests are sent concurrently like a browser sends them
+
+A browser fetches a page's API calls in parallel, over a few connections per host, so the page is as
+slow as its slowest chain of requests rather than the sum of them. A Page sends its requests on the
+user's session with at most LOCUST_PAGE_CONNECTIONS in flight. Each request is reported as usual, and the
+whole page as a PAGE request, timed from the first request being sent to the last response, which fails
+if any of its requests did.
+
+    DASHBOARD = Page(
+        "/dashboard/",
+        Request("GET", "/dashboard/"),
+        Request("GET", "/api/v0/dashboard/"),
+        Request("GET", "/api/v0/programs/"),
+    )
+    Step("dashboard", DASHBOARD)
+
+Requests on a page can extract variables, but shouldn't depend on each other's, since they're concurrent.
+"""
+import time
+
+import gevent
+from gevent.pool import Pool
+
+from common import settings
+from common.arrival import in_task
+from common.reporting import pseudo_request_type
+
+PAGE_REQUEST_TYPE = pseudo_request_type("PAGE")
+
+
+class PageError(Exception):
+    """Some of a page's requests failed"""
+
+
+class Page:
+    """
+    Requests sent concurrently
+
+    Args:
+        name (str): the name to report the page under
+        requests (common.scenario.Request): the requests
+        connections (int): how many requests can be in flight at once, LOCUST_PAGE_CONNECTIONS by default
+    """
+    def __init__(self, name, *requests, connections=None):
+        self.name = name
+        self.requests = requests
+        self.connections = connections
+
+    def compile(self):
+        """Make a function of (task_set, variables) which loads the page"""
+        name = self.name
+        requests = tuple(request.compile() for request in self.requests)
+        connections = self.connections or settings.LOCUST_PAGE_CONNECTIONS
+
+        def load(task_set, variables):
+            start = time.perf_counter()
+            if connections >= len(requests):
+                greenlets = [gevent.spawn(in_task(request), task_set, variables) for request in requests]
+            else:
+                pool = Pool(connections)
+                greenlets = [pool.spawn(in_task(request), task_set, variables) for request in requests]
+            gevent.joinall(greenlets)
+            response_time = (time.perf_counter() - start) * 1000
+
+            failures = 0
+            response_length = 0
+            for greenlet in greenlets:
+                response = greenlet.value
+                if not greenlet.successful() or response is None or not response.ok:
+                    failures += 1
+                else:
+                    response_length += len(response.content or b"")
+            task_set.user.environment.events.request.fire(
+                request_type=PAGE_REQUEST_TYPE,
+                name=name,
+                response_time=response_time,
+                response_length=response_length,
+                exception=PageError("{} of {} requests failed".format(failures, len(requests))) if failures else None,
+                context={},
+            )
+        return load
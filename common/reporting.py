@@ -0,0 +1,135 @@
+"""
+Collecting what every process recorded during a test on the master, and logging it when the test stops
+
+Workers send what they recorded since their last report with each of their stats reports, and the rest
+with a message of their own when they stop. The master merges them, or a process running on its own merges
+its own, and logs the totals when the test stops:
+
+    COLLECTOR = Collector("provisioning_counts", report=PROVISIONER.report, merge=REPORT.merge, log=REPORT.log)
+
+A headless master stops before its workers do, so it logs again when it quits if more came in afterwards.
+
+Some request events aren't HTTP requests, e.g. a page timed from its first request to its last response.
+Their request types are registered with pseudo_request_type, and listeners which aggregate HTTP traffic
+skip the types in PSEUDO_REQUEST_TYPES.
+
+Work divided between the workers, like a schedule of requests, is shared out with send_shares.
+"""
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+# the request types of request events which aren't HTTP requests
+PSEUDO_REQUEST_TYPES = set()
+
+
+def pseudo_request_type(request_type):
+    """
+    Register the request type of events which aren't HTTP requests
+
+    Args:
+        request_type (str): the request type, e.g. PAGE
+
+    Returns:
+        str: the request type
+    """
+    PSEUDO_REQUEST_TYPES.add(request_type)
+    return request_type
+
+
+def send_shares(runner, msg_type):
+    """
+    On the master, tell each worker its index and how many workers there are, so it can take its share of a schedule
+
+    Args:
+        runner (locust.runners.MasterRunner): the master's runner
+        msg_type (str): the message the workers listen for, its data has worker_index and worker_count
+    """
+    workers = sorted(runner.clients.values(), key=lambda worker: runner.get_worker_index(worker.id))
+    for index, worker in enumerate(workers):
+        runner.send_message(msg_type, {"worker_index": index, "worker_count": len(workers)}, client_id=worker.id)
+
+
+class Collector:
+    """
+    Sends what a process recorded to the master, and logs the totals when the test stops
+
+    Args:
+        key (str): the key of the reports in the workers' stats, and the type of the message they stop with
+        report (callable): takes what this process recorded since it last reported, returning something
+            which can be sent to the master, or None if nothing was recorded
+        merge (callable): adds a report to the totals
+        log (callable): logs the totals. Without report and merge, what it logs comes from elsewhere,
+            e.g. locust's own stats, so it's called again when quitting and should skip what it already logged
+        reset (callable): forgets what was recorded and the totals, when each test starts
+    """
+    def __init__(self, key, report=None, merge=None, log=None, reset=None):
+        self.key = key
+        self.report = report
+        self.merge = merge
+        self.log = log
+        self.reset = reset
+        # whether nothing was merged since the totals were last logged
+        self.logged = True
+        events.init.add_listener(self._attach)
+        events.test_start.add_listener(self._on_test_start)
+        events.report_to_master.add_listener(self._on_report_to_master)
+        events.worker_report.add_listener(self._on_worker_report)
+        events.test_stop.add_listener(self._on_test_stop)
+        events.quitting.add_listener(self._on_quitting)
+
+    def _merge(self, report):
+        """Add a report to the totals"""
+        self.merge(report)
+        self.logged = False
+
+    def _log(self):
+        """Log the totals if anything was merged since they were last logged"""
+        if self.log is None or (self.logged and self.merge is not None):
+            return
+        self.logged = True
+        self.log()
+
+    def _attach(self, environment, **kwargs):
+        """Listen for the reports workers send when they stop"""
+        if self.merge is not None and isinstance(environment.runner, MasterRunner):
+            environment.runner.register_message(self.key, self._on_final_report)
+
+    def _on_final_report(self, environment, msg, **kwargs):  # pylint: disable=unused-argument
+        """Add the report a worker sent when it stopped"""
+        self._merge(msg.data[self.key])
+
+    def _on_test_start(self, **kwargs):
+        """Count each test separately"""
+        if self.reset is not None:
+            self.reset()
+        self.logged = True
+
+    def _on_report_to_master(self, client_id, data, **kwargs):  # pylint: disable=unused-argument
+        """Send a worker's report with its stats"""
+        if self.report is None:
+            return
+        report = self.report()
+        if report is not None:
+            data[self.key] = report
+
+    def _on_worker_report(self, client_id, data, **kwargs):  # pylint: disable=unused-argument
+        """Add the report sent with a worker's stats"""
+        if self.merge is not None and self.key in data:
+            self._merge(data[self.key])
+
+    def _on_test_stop(self, environment, **kwargs):
+        """Send a worker's last report to the master, or log the totals"""
+        runner = environment.runner
+        report = self.report() if self.report is not None and not isinstance(runner, MasterRunner) else None
+        if isinstance(runner, WorkerRunner):
+            if report is not None:
+                runner.send_message(self.key, {self.key: report})
+            return
+        if report is not None:
+            self._merge(report)
+        self._log()
+
+    def _on_quitting(self, environment, **kwargs):
+        """Log the totals with any reports that came in after the test stopped"""
+        if not isinstance(environment.runner, WorkerRunner):
+            self._log()
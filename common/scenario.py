@@ -0,0 +1,429 @@
+"""
+Declarative locust scenarios, compiled once into TaskSets
+
+A scenario is a weighted mix of steps, and of nested scenarios which a user enters and stays in until it
+picks their stop task. Each step is a list of items run in order:
+
+    Request     an HTTP request, whose url, json, data, headers and params are templates
+    Page        requests sent concurrently, like a browser loading a page, see page.py
+    Repeat      items run a number of times
+    Think       a pause, in seconds
+    Set         variables to set
+    Call        a function of (task_set, variables) for anything the others can't express
+
+Every user has one dict of variables, shared by all the scenarios it enters. Templates are strings with
+{variable} fields, and dicts, lists and tuples of them. A string that is just one field is replaced by the
+variable itself rather than formatted, so a dict extracted from one response can be sent as the json of
+another. A callable in a template is called with the variables. Requests store values from their
+responses in variables with extract, e.g. extract={"token": cookie("csrftoken")}.
+
+    LOG_IN = Scenario(
+        "UserLogIn",
+        Step("login", Request("GET", "/login/", extract={"token": cookie("csrftoken")}), weight=5),
+        Step("dashboard", Request("GET", "/api/v0/profiles/{username}/"), requires=("token",), weight=10),
+        stop=1,
+    )
+    BEHAVIOR = Scenario("UserBehavior", LOG_IN, setup=[Set(username=lambda variables: random.choice(USERS))])
+
+    class WebsiteUser(BaseUser):
+        tasks = [BEHAVIOR.task_set()]
+
+Templates are parsed, constant parts built and urls joined when the TaskSet is compiled, so a step
+is a loop over prepared closures. Requests are named after their url template with fields in brackets,
+e.g. /api/v0/profiles/[username]/, unless they are given a name.
+"""
+import random
+import string
+from urllib.parse import urlparse
+
+import gevent
+from locust import TaskSet
+
+from common.transactions import Transaction
+from common.transport import response_cookies
+
+_FORMATTER = string.Formatter()
+
+
+def _fields(template):
+    """The names of the fields in a template string"""
+    return [field for _, field, _, _ in _FORMATTER.parse(template) if field is not None]
+
+
+def _compile_template(template):
+    """
+    Compile a template
+
+    Args:
+        template: a string, a callable, or a dict, list or tuple of templates
+
+    Returns:
+        tuple: (True, the value) if the template is constant, otherwise (False, a function of the variables)
+    """
+    if callable(template):
+        return False, template
+    if isinstance(template, str):
+        fields = _fields(template)
+        if not fields:
+            return True, template
+        if len(fields) == 1 and template == "{" + fields[0] + "}":
+            field = fields[0]
+            return False, lambda variables: variables[field]
+        return False, template.format_map
+    if isinstance(template, dict):
+        items = [(key, _compile_template(value)) for key, value in template.items()]
+        if all(constant for _, (constant, _) in items):
+            return True, template
+        return False, lambda variables: {
+            key: value if constant else value(variables) for key, (constant, value) in items
+        }
+    if isinstance(template, (list, tuple)):
+        items = [_compile_template(value) for value in template]
+        if all(constant for constant, _ in items):
+            return True, template
+        kind = type(template)
+        return False, lambda variables: kind(value if constant else value(variables) for constant, value in items)
+    return True, template
+
+
+def _template_name(template):
+    """The name to report a request under, the url template with its fields in brackets"""
+    return "".join(
+        literal + ("" if field is None else "[{}]".format(field))
+        for literal, field, _, _ in _FORMATTER.parse(template)
+    )
+
+
+def cookie(name, url=None):
+    """
+    Extract a cookie from the user's session
+
+    Args:
+        name (str): the cookie name
+        url (str): only take the cookie set for this url's host
+    """
+    domain = urlparse(url).hostname if url else None
+
+    def extract(response, task_set):  # pylint: disable=unused-argument
+        return task_set.client.cookies.get(name, domain=domain)
+    return extract
+
+
+def response_cookie(name):
+    """Extract a cookie set by the response"""
+    def extract(response, task_set):  # pylint: disable=unused-argument
+        return response_cookies(response).get(name)
+    return extract
+
+
+def json_value(*path):
+    """
+    Extract a value from a JSON response
+
+    Args:
+        path: keys and indexes leading to the value, none for the whole response
+
+    Returns None if the response isn't JSON or doesn't have the value.
+    """
+    def extract(response, task_set):  # pylint: disable=unused-argument
+        try:
+            value = response.json()
+            for key in path:
+                value = value[key]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+        return value
+    return extract
+
+
+class Request:
+    """
+    An HTTP request
+
+    Args:
+        method (str): GET, POST, ...
+        url (str): a template of the url, relative to the host or absolute
+        name (str): the name to report the request under
+        extract (dict): variable names to functions of (response, task_set) returning their value
+        kwargs: templates of the json, data, headers or params, or other arguments to client.request
+    """
+    def __init__(self, method, url, name=None, extract=None, **kwargs):
+        self.method = method
+        self.url = url
+        self.name = name
+        self.extract = extract or {}
+        self.kwargs = kwargs
+
+    def compile(self):
+        """Make a function of (task_set, variables) which sends the request and returns the response"""
+        method = self.method
+        name = self.name or _template_name(self.url)
+        url_constant, url = _compile_template(self.url)
+        static = {"name": name}
+        dynamic = []
+        for key, template in self.kwargs.items():
+            constant, value = _compile_template(template)
+            if constant:
+                static[key] = value
+            else:
+                dynamic.append((key, value))
+        extract = tuple(self.extract.items())
+
+        def request(task_set, variables):
+            if dynamic:
+                kwargs = static.copy()
+                for key, value in dynamic:
+                    kwargs[key] = value(variables)
+            else:
+                kwargs = static
+            response = task_set.client.request(method, url if url_constant else url(variables), **kwargs)
+            for variable, extractor in extract:
+                variables[variable] = extractor(response, task_set)
+            return response
+        return request
+
+
+class Repeat:
+    """Items run a number of times"""
+    def __init__(self, times, *items):
+        self.times = times
+        self.items = items
+
+    def compile(self):
+        """Make a function of (task_set, variables) which runs the items"""
+        times = range(self.times)
+        run = _compile_items(self.items)
+
+        def repeat(task_set, variables):
+            for _ in times:
+                run(task_set, variables)
+        return repeat
+
+
+class Think:
+    """A pause of min_seconds, or a random time up to max_seconds"""
+    def __init__(self, min_seconds, max_seconds=None):
+        self.min_seconds = min_seconds
+        self.max_seconds = min_seconds if max_seconds is None else max_seconds
+
+    def compile(self):
+        """Make a function of (task_set, variables) which pauses"""
+        min_seconds, max_seconds = self.min_seconds, self.max_seconds
+
+        def think(task_set, variables):  # pylint: disable=unused-argument
+            gevent.sleep(random.uniform(min_seconds, max_seconds))
+        return think
+
+
+class Set:
+    """Set variables to templates"""
+    def __init__(self, **values):
+        self.values = values
+
+    def compile(self):
+        """Make a function of (task_set, variables) which sets the variables"""
+        values = [(name, _compile_template(template)) for name, template in self.values.items()]
+
+        def set_variables(task_set, variables):  # pylint: disable=unused-argument
+            for name, (constant, value) in values:
+                variables[name] = value if constant else value(variables)
+        return set_variables
+
+
+class Call:
+    """Call a function of (task_set, variables)"""
+    def __init__(self, function):
+        self.function = function
+
+    def compile(self):
+        """The function itself"""
+        return self.function
+
+
+def _compile_items(items):
+    """Compile items into one function of (task_set, variables) which runs them in order"""
+    compiled = tuple(item.compile() for item in items)
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def run(task_set, variables):
+        for item in compiled:
+            item(task_set, variables)
+    return run
+
+
+def standalone(*items):
+    """
+    Compile items to run outside of a TaskSet, e.g. to log in before the test starts
+
+    Args:
+        items: Request, Repeat, Think, Set or Call
+
+    Returns:
+        callable: a function of (client, variables) which runs the items with the client
+    """
+    run = _compile_items(items)
+
+    def run_standalone(client, variables):
+        run(_Standalone(client), variables)
+    return run_standalone
+
+
+class _Standalone:
+    """What items run with standalone() see instead of a TaskSet"""
+    def __init__(self, client):
+        self.client = client
+
+
+def variables_of(task_set):
+    """The variables of the user running a task set"""
+    user = task_set.user
+    if not hasattr(user, "scenario_variables"):
+        user.scenario_variables = {}
+    return user.scenario_variables
+
+
+class Step:
+    """
+    A task, items run in order
+
+    Args:
+        name (str): the task name
+        items: Request, Repeat, Think, Set or Call
+        weight (int): how often the task is picked relative to the others in its scenario
+        requires (tuple of str): variables which must be set, otherwise the step is skipped
+            and the user leaves the scenario if it's nested
+        unless (tuple of str): variables which mustn't be set, likewise
+        transaction (str): report the step as a transaction with this name, see transactions.py
+    """
+    def __init__(self, name, *items, weight=1, requires=(), unless=(), transaction=None):
+        self.name = name
+        self.items = items
+        self.weight = weight
+        self.requires = tuple(requires)
+        self.unless = tuple(unless)
+        self.transaction = transaction
+
+    def compile(self, nested):
+        """
+        Make the task function
+
+        Args:
+            nested (bool): whether the step's scenario is nested in another, so it can be left
+        """
+        run = _compile_items(self.items)
+        requires, unless = self.requires, self.unless
+        if self.transaction:
+            run = _in_transaction(self.transaction, run)
+
+        def step(task_set):
+            variables = variables_of(task_set)
+            for variable in requires:
+                if not variables.get(variable):
+                    break
+            else:
+                for variable in unless:
+                    if variables.get(variable):
+                        break
+                else:
+                    run(task_set, variables)
+                    return
+            if nested:
+                task_set.interrupt()
+        step.__name__ = self.name
+        step.__qualname__ = self.name
+        return step
+
+
+def _in_transaction(name, run):
+    """Wrap a function of (task_set, variables) in a transaction"""
+    def transaction(task_set, variables):
+        with Transaction(name):
+            run(task_set, variables)
+    return transaction
+
+
+def _stop(task_set):
+    """Return to the parent scenario"""
+    task_set.interrupt()
+
+
+class Scenario:
+    """
+    A weighted mix of steps and nested scenarios
+
+    Args:
+        name (str): the name of the compiled TaskSet
+        steps: Step or Scenario
+        weight (int): how often the scenario is entered, when nested
+        stop (int): the weight of leaving the scenario, when nested
+        setup (list): items run when a user enters the scenario
+        wait_time (callable): the TaskSet's wait_time, otherwise the user's
+    """
+    def __init__(self, name, *steps, weight=1, stop=0, setup=(), wait_time=None):
+        self.name = name
+        self.steps = steps
+        self.weight = weight
+        self.stop = stop
+        self.setup = setup
+        self.wait_time = wait_time
+        self._task_set = None
+
+    def task_set(self, nested=False):
+        """
+        Compile the scenario, once
+
+        Args:
+            nested (bool): whether the scenario is nested in another
+
+        Returns:
+            type: a TaskSet
+        """
+        if self._task_set is not None:
+            return self._task_set
+        attributes = {"__doc__": "Compiled from the {} scenario".format(self.name)}
+        tasks = {}
+        for step in self.steps:
+            if isinstance(step, Scenario):
+                tasks[step.task_set(nested=True)] = step.weight
+            else:
+                task = step.compile(nested)
+                attributes[step.name] = task
+                tasks[task] = step.weight
+        if self.stop:
+            attributes["stop"] = _stop
+            tasks[_stop] = self.stop
+        attributes["tasks"] = tasks
+
+        if self.setup:
+            setup = _compile_items(self.setup)
+
+            def on_start(task_set):
+                setup(task_set, variables_of(task_set))
+            attributes["on_start"] = on_start
+        if self.wait_time is not None:
+            attributes["wait_time"] = self.wait_time
+        self._task_set = type(self.name, (TaskSet,), attributes)
+        return self._task_set
+
+
+def weighted(mix, **task_sets):
+    """
+    Set a TaskSet's tasks from a mix shared with other TaskSets
+
+    Args:
+        mix (dict): task names to weights, names the TaskSet doesn't have are skipped
+        task_sets: nested TaskSets named in the mix
+
+    Returns:
+        callable: a class decorator
+    """
+    def decorate(cls):
+        tasks = []
+        for name, weight in mix.items():
+            task = task_sets.get(name) or getattr(cls, name, None)
+            if task is not None:
+                tasks.extend([task] * weight)
+        cls.tasks = tasks
+        return cls
+    return decorate
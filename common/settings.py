@@ -0,0 +1,63 @@
+"""
+Settings shared by every app's locust tests
+"""
+import json
+import os
+
+
+def get_var(name, default=None):
+    """Return the settings in a the environment"""
+    value = os.environ.get(name, default)
+    if value is None:
+        raise Exception("Missing value for {}".format(name))
+    return value
+
+
+def get_list(name, path):
+    """Return a comma separated list from the environment, or the lines of a file if it isn't set"""
+    value = os.environ.get(name)
+    if value:
+        items = value.split(',')
+    else:
+        with open(path) as list_file:
+            items = list(list_file)
+    return [item.strip() for item in items if item.strip()]
+
+
+def get_json(name, path):
+    """Return JSON from the environment, or from a file if it isn't set"""
+    value = os.environ.get(name)
+    if value:
+        return json.loads(value.strip())
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+# start tasks at this many per second across all workers instead of waiting between them, see arrival.py
+LOCUST_ARRIVAL_RATE = get_var('LOCUST_ARRIVAL_RATE', '')
+# "uniform" spaces arrivals evenly, "poisson" spaces them randomly like independent visitors
+LOCUST_ARRIVAL_PROCESS = get_var('LOCUST_ARRIVAL_PROCESS', 'uniform')
+# also report each request's response time measured from when its task should have started
+LOCUST_ARRIVAL_CORRECTED = get_var('LOCUST_ARRIVAL_CORRECTED', 'true').lower() == 'true'
+
+# records every request's latency, "hdr" for per-endpoint HDR histograms or "" for nothing, see latency.py
+LOCUST_LATENCY_RECORDER = get_var('LOCUST_LATENCY_RECORDER', 'hdr')
+# the histograms are written here when the test stops, or not at all if this is ""
+LOCUST_HDR_FILE = get_var('LOCUST_HDR_FILE', 'latency_histograms.jsonl')
+LOCUST_HDR_SIGNIFICANT_FIGURES = int(get_var('LOCUST_HDR_SIGNIFICANT_FIGURES', 3))
+# milliseconds between a user's requests, set to correct for coordinated omission in closed-loop tests
+LOCUST_HDR_EXPECTED_INTERVAL_MS = float(get_var('LOCUST_HDR_EXPECTED_INTERVAL_MS', 0))
+
+# "requests" sends requests with python-requests, "fast" with geventhttpclient, see transport.py
+LOCUST_HTTP_BACKEND = get_var('LOCUST_HTTP_BACKEND', 'requests')
+
+# connections per host shared by all the users in a process, or 0 for each user to have its own, see user.py
+LOCUST_CONNECTIONS_PER_HOST = int(get_var('LOCUST_CONNECTIONS_PER_HOST', 0))
+
+# how many of a page's requests are in flight at once, like a browser's connections per host
+LOCUST_PAGE_CONNECTIONS = int(get_var('LOCUST_PAGE_CONNECTIONS', 6))
+
+# log users in concurrently before the test starts and hand their sessions out to locust users, see logins.py
+LOCUST_PRELOGIN = get_var('LOCUST_PRELOGIN', 'false').lower() == 'true'
+# how many users are logged in at once before the test starts
+LOCUST_PRELOGIN_CONCURRENCY = int(get_var('LOCUST_PRELOGIN_CONCURRENCY', 20))
@@ -0,0 +1,137 @@
+"""
+Transactions, multi-request flows like logging in timed end to end
+
+    with transaction("micromasters login"):
+        ...
+
+    @transaction("upvote post")
+    def upvote_post(self):
+        ...
+
+A transaction is reported as a TRANSACTION request, so locust aggregates it across workers like any
+other request. Its response time is from entering to leaving it, and its size is the number of HTTP
+requests sent during it, including those sent by greenlets it spawned such as a page's. It fails if it
+raises, if any of its requests failed, or if failure() is called. Transactions which send no requests,
+e.g. tasks which returned early because they had nothing to work on, aren't reported, nor are those
+left by a locust interrupt, reschedule or stop.
+"""
+import time
+from functools import wraps
+from weakref import WeakKeyDictionary
+
+import gevent
+from locust import events
+from locust.exception import InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately, StopUser
+
+from common.reporting import pseudo_request_type
+
+TRANSACTION_REQUEST_TYPE = pseudo_request_type("TRANSACTION")
+
+# the transactions each greenlet is in, innermost last
+_ACTIVE = WeakKeyDictionary()
+
+_CONTROL_FLOW = (InterruptTaskSet, RescheduleTask, RescheduleTaskImmediately, StopUser, gevent.GreenletExit)
+
+
+class TransactionError(Exception):
+    """A transaction failed"""
+
+
+def _greenlet_transactions():
+    """The transactions of the current greenlet, or of the closest greenlet which spawned it that has some"""
+    greenlet = gevent.getcurrent()
+    while greenlet is not None:
+        transactions = _ACTIVE.get(greenlet)
+        if transactions:
+            return transactions
+        spawning = getattr(greenlet, "spawning_greenlet", None)
+        greenlet = spawning() if spawning is not None else None
+    return None
+
+
+class Transaction:
+    """
+    A transaction, use transaction() to make one
+
+    Args:
+        name (str): the name to report the transaction under
+    """
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.failed_requests = 0
+        self.error = None
+        self._start = None
+        self._greenlet = None
+
+    def failure(self, error):
+        """
+        Mark the transaction as failed
+
+        Args:
+            error (str or Exception): why
+        """
+        self.error = error if isinstance(error, Exception) else TransactionError(error)
+
+    def __enter__(self):
+        self._greenlet = gevent.getcurrent()
+        _ACTIVE.setdefault(self._greenlet, []).append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        response_time = (time.perf_counter() - self._start) * 1000
+        _ACTIVE[self._greenlet].remove(self)
+        if exc_type is not None and issubclass(exc_type, _CONTROL_FLOW):
+            return False
+        if exc_value is not None:
+            self.failure(exc_value)
+        elif self.error is None and self.failed_requests:
+            self.failure("{} of {} requests failed".format(self.failed_requests, self.requests))
+        if self.requests:
+            events.request.fire(
+                request_type=TRANSACTION_REQUEST_TYPE,
+                name=self.name,
+                response_time=response_time,
+                response_length=self.requests,
+                exception=self.error,
+                context={},
+            )
+        return False
+
+    def __call__(self, function):
+        """Use the transaction as a decorator, each call is a new transaction with the same name"""
+        name = self.name
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with Transaction(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def transaction(name):
+    """
+    Make a transaction, to use as a context manager or a decorator
+
+    Args:
+        name (str): the name to report it under
+
+    Returns:
+        Transaction: the transaction
+    """
+    return Transaction(name)
+
+
+@events.request.add_listener
+def _count_request(response=None, exception=None, **kwargs):
+    """Count HTTP requests towards the transactions they were sent in"""
+    if response is None:
+        return
+    transactions = _greenlet_transactions()
+    if not transactions:
+        return
+    for active in transactions:
+        active.requests += 1
+        if exception is not None:
+            active.failed_requests += 1
@@ -0,0 +1,173 @@
+"""
+The HTTP client the locustfiles send requests with, chosen per run with LOCUST_HTTP_BACKEND
+
+"requests", the default, runs users on locust's HttpUser, built on python-requests. "fast" runs them on
+FastHttpUser, built on geventhttpclient, which spends several times less CPU per request, so each worker
+can send several times more. HttpUser here is whichever was chosen, the base of common.user.BaseUser.
+
+FastHttpUser's client isn't a requests.Session, but praw, open_discussions_api and the scenarios expect
+one: they set default headers on session.headers, post forms as dicts or lists of pairs, pass timeouts
+and read session.cookies and response.cookies. With the fast backend each user's client is wrapped in a
+RequestsCompatibleSession, which translates those, so the same locustfiles run on either backend.
+"""
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+import locust
+
+from common import settings
+
+REQUESTS = "requests"
+FAST = "fast"
+
+
+class SessionCookies:
+    """
+    The cookies in a cookie jar, looked up like a requests.Session's
+
+    Args:
+        jar (http.cookiejar.CookieJar): the jar
+    """
+    def __init__(self, jar):
+        self.jar = jar
+
+    def get(self, name, default=None, domain=None, path=None):
+        """
+        Get a cookie's value
+
+        Args:
+            name (str): the cookie name
+            default: what to return if there's no such cookie
+            domain (str): only take the cookie set for this domain
+            path (str): only take the cookie set for this path
+
+        Returns:
+            str: the value
+        """
+        for cookie in self.jar:
+            if cookie.name == name and domain in (None, cookie.domain) and path in (None, cookie.path):
+                return cookie.value
+        return default
+
+    def set_cookie(self, cookie):
+        """
+        Add a cookie
+
+        Args:
+            cookie (http.cookiejar.Cookie): the cookie
+        """
+        self.jar.set_cookie(cookie)
+
+
+def response_cookies(response):
+    """
+    The cookies a response set, from either backend
+
+    Args:
+        response (requests.Response or locust.contrib.fasthttp.FastResponse): the response
+
+    Returns:
+        dict-like: cookie values by name
+    """
+    cookies = getattr(response, "cookies", None)
+    if cookies is not None:
+        return cookies
+    parsed = SimpleCookie()
+    for header in response.headers.getlist("set-cookie") if response.headers is not None else []:
+        parsed.load(header)
+    return {name: morsel.value for name, morsel in parsed.items()}
+
+
+class RequestsCompatibleSession:
+    """
+    A FastHttpSession with the parts of the requests.Session interface our libraries use
+
+    Args:
+        session (locust.contrib.fasthttp.FastHttpSession): the fast session
+    """
+    def __init__(self, session):
+        self.session = session
+        # sent with every request, like requests.Session.headers
+        self.headers = {}
+        # kept for code which sets it, the fast session is always insecure
+        self.verify = False
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    @property
+    def cookies(self):
+        """The session's cookies"""
+        return SessionCookies(self.session.cookiejar)
+
+    def request(self, method, url, params=None, data=None, headers=None, files=None, timeout=None,  # pylint: disable=unused-argument
+                **kwargs):
+        """
+        Make a request, taking the arguments requests.Session.request does
+
+        Timeouts are set on the user with FastHttpUser's network_timeout and connection_timeout instead.
+        """
+        headers = dict(self.headers, **headers) if headers else dict(self.headers)
+        if data is not None and not isinstance(data, (str, bytes)):
+            data = urlencode(data)
+            if not any(header.lower() == "content-type" for header in headers):
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if params:
+            kwargs["params"] = params
+        if files:
+            kwargs["files"] = files
+        return self.session.request(method, url, data=data, headers=headers, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Make a GET request"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        """Make a POST request"""
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        """Make a PUT request"""
+        return self.request("PUT", url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        """Make a PATCH request"""
+        return self.request("PATCH", url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Make a DELETE request"""
+        return self.request("DELETE", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Make a HEAD request"""
+        return self.request("HEAD", url, **kwargs)
+
+    def options(self, url, **kwargs):
+        """Make an OPTIONS request"""
+        return self.request("OPTIONS", url, **kwargs)
+
+
+class FastHttpUser(locust.FastHttpUser):
+    """A FastHttpUser whose client can stand in for a requests.Session"""
+    abstract = True
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self.client = RequestsCompatibleSession(self.client)
+
+
+BACKENDS = {
+    REQUESTS: locust.HttpUser,
+    FAST: FastHttpUser,
+}
+
+
+def _user_class():
+    """The base user class chosen in the settings"""
+    try:
+        return BACKENDS[settings.LOCUST_HTTP_BACKEND]
+    except KeyError as ex:
+        raise ValueError("Unknown HTTP backend {!r}".format(settings.LOCUST_HTTP_BACKEND)) from ex
+
+
+HttpUser = _user_class()
@@ -0,0 +1,100 @@
+"""
+The base user every app's locustfile builds its users on
+
+    class WebsiteUser(BaseUser):
+        host = settings.LMS_BASE_URL
+        tasks = [UserBehavior]
+        wait_time = wait_between(settings.LOCUST_TASK_MIN_WAIT, settings.LOCUST_TASK_MAX_WAIT)
+
+A BaseUser is an HttpUser on the backend chosen with LOCUST_HTTP_BACKEND, see transport.py. Its module records
+latency histograms for every request, see latency.py. Since every app's users are built the same way, their
+locustfiles can run in the same process, and a change to how users send requests applies to all of them.
+
+Each user has its own connections by default, like a browser. With thousands of users per worker that's
+thousands of sockets, most of them idle. Set LOCUST_CONNECTIONS_PER_HOST to have all the users in a process
+share that many connections to each host instead. Requests then wait for a free connection, so use enough
+connections that they don't wait long.
+"""
+from geventhttpclient.client import HTTPClientPool
+from locust import between
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+
+from common import latency  # pylint: disable=unused-import
+from common import settings, transport
+from common.arrival import open_loop
+
+
+def wait_between(min_wait, max_wait):
+    """
+    Wait a random time between tasks, or follow the arrival rate if LOCUST_ARRIVAL_RATE is set
+
+    Args:
+        min_wait (int): the shortest wait in milliseconds
+        max_wait (int): the longest wait in milliseconds
+
+    Returns:
+        callable: a wait_time for a User
+    """
+    return open_loop(between(min_wait / 1000, max_wait / 1000))
+
+
+class _StoppableMixin:
+    """
+    A blocking connection pool which users can be stopped while waiting on
+
+    urllib3 puts an empty slot back in the pool when a request fails, even one killed while still waiting for
+    a connection, which overfills the pool and raises FullPoolError when locust stops its users.
+    """
+    def _put_conn(self, conn):
+        if conn is None and self.pool is not None and self.pool.full():
+            return
+        super()._put_conn(conn)
+
+
+class _StoppableHTTPConnectionPool(_StoppableMixin, HTTPConnectionPool):
+    pass
+
+
+class _StoppableHTTPSConnectionPool(_StoppableMixin, HTTPSConnectionPool):
+    pass
+
+
+def _shared_pool_manager(maxsize):
+    """
+    A PoolManager for all users to share, with at most maxsize connections per host
+
+    Args:
+        maxsize (int): the number of connections per host
+
+    Returns:
+        urllib3.PoolManager: the pool manager
+    """
+    manager = PoolManager(maxsize=maxsize, block=True)
+    manager.pool_classes_by_scheme = {"http": _StoppableHTTPConnectionPool, "https": _StoppableHTTPSConnectionPool}
+    return manager
+
+
+def shared_connections(connections_per_host):
+    """
+    Connections for a user class's users to share, on the backend chosen in the settings
+
+    Args:
+        connections_per_host (int): the number of connections to each host
+
+    Returns:
+        dict: the class attributes to give the user class
+    """
+    if settings.LOCUST_HTTP_BACKEND == transport.FAST:
+        return {"client_pool": HTTPClientPool(concurrency=connections_per_host)}
+    return {"pool_manager": _shared_pool_manager(connections_per_host)}
+
+
+class BaseUser(transport.HttpUser):
+    """A user of one of our apps"""
+    abstract = True
+
+
+# connections shared by every user in the process, if LOCUST_CONNECTIONS_PER_HOST is set
+if settings.LOCUST_CONNECTIONS_PER_HOST:
+    for attribute, value in shared_connections(settings.LOCUST_CONNECTIONS_PER_HOST).items():
+        setattr(BaseUser, attribute, value)
@@ -2,297 +2,179 @@
 locust file for micromasters
 This tests the very first login to micromasters
 """
-import random
-from urlparse import urljoin, urlparse
-
-from locust import HttpLocust, TaskSet, task
-
-import settings
-
-
-class UserDashboardRefresh(TaskSet):
-    """Dashboard refresh"""
-    def on_start(self):
-        """on_start is called before any task is scheduled """
-        self.username = self.parent.username
-        self.mm_csrftoken = self.parent.mm_csrftoken
-        self.profile_filled_out = self.parent.profile_filled_out
-
-    @task(1)
-    def stop(self):
-        """Return to the parent task"""
-        self.interrupt()
-
-    @task(10)
-    def dashboard_reload(self):
-        """
-        Loads dashboard page and 10 times the backends
-        """
-        if not self.mm_csrftoken or self.profile_filled_out:
-            self.interrupt()
-        # load the page
-        self.client.get('/dashboard/')
-        self.client.get(
-            '/api/v0/profiles/{}/'.format(self.username),
-            name="'/api/v0/profiles/[username]/"
-        )
-        self.client.get('/api/v0/dashboard/')
-        self.client.get('/api/v0/course_prices/')
-        self.client.get('/api/v0/programs/')
+from common.page import Page
+from common.scenario import Call, Request, Scenario, Set, Step, json_value
+from common.user import BaseUser, wait_between
+from micromasters import settings
+from micromasters.scenarios import DASHBOARD_PAGE, MICROMASTERS_HEADERS, log_in, user_behavior
+
+PATCH_PROFILE = Request(
+    "PATCH", '/api/v0/profiles/{username}/', json='{profile}', headers=MICROMASTERS_HEADERS,
+)
+
+
+def reset_profile(task_set, variables):  # pylint: disable=unused-argument
+    """Reset the profile as much as possible for the next run, and fill in the personal part"""
+    profile = variables["profile"] or {}
+    profile['education'] = []
+    profile['work_history'] = []
+    if profile.get('agreed_to_terms_of_service') is True:
+        del profile['agreed_to_terms_of_service']
+    else:
+        profile['agreed_to_terms_of_service'] = True
+    variables["filled_out"] = profile.pop('filled_out', None)
+    profile.pop('email_optin', None)
+    profile.pop('image', None)
+
+    username = variables["username"]
+    profile.update({
+        'birth_country': 'IT',
+        'city': 'Los Angeles',
+        'country': 'US',
+        'date_of_birth': '2000-01-12',
+        'first_name': '{}'.format(username),
+        'gender': 'f',
+        'last_name': 'Example',
+        'nationality': 'IT',
+        'preferred_language': 'en',
+        'preferred_name': '{} Preferred'.format(username),
+        'state_or_territory': 'US-CA',
+    })
+    variables["profile"] = profile
+
+
+def add_high_school(task_set, variables):  # pylint: disable=unused-argument
+    """Add the high school to the education"""
+    variables["profile"]['education'].append(
+        {
+            "degree_name": "hs",
+            "graduation_date": "1998-02-01",
+            "field_of_study": None,
+            "online_degree": False,
+            "school_name": "School User",
+            "school_city": "Lexington",
+            "school_state_or_territory": "US-MA",
+            "school_country": "US"
+        }
+    )
+
+
+def add_college(task_set, variables):  # pylint: disable=unused-argument
+    """Add college to the education"""
+    variables["profile"]['education'].append(
+        {
+            "degree_name": "m",
+            "graduation_date": "2008-12-01",
+            "field_of_study": "14.0903",
+            "online_degree": False,
+            "school_name": "University of Here",
+            "school_city": "Bologna",
+            "school_state_or_territory": "IT-BO",
+            "school_country": "IT",
+            "graduation_date_edit": {"year": "2008", "month": "12"}
+        }
+    )
+
+
+def add_work_history(task_set, variables):  # pylint: disable=unused-argument
+    """Add the professional part"""
+    variables["profile"]['work_history'].append(
+        {
+            "position": "Senior Software Engineer",
+            "industry": "Computer Software",
+            "company_name": "MIT",
+            "start_date": "2000-01-01",
+            "end_date": None,
+            "city": "Cambridge",
+            "country": "US",
+            "state_or_territory": "US-MA",
+            "start_date_edit": {"year": "2000", "month": "1"}
+        }
+    )
+
+
+_patch_profile = PATCH_PROFILE.compile()
+
+
+def finish_profile(task_set, variables):
+    """I am done!"""
+    if not variables["filled_out"]:
+        variables["profile"]['filled_out'] = True
+        _patch_profile(task_set, variables)
+
+
+# dashboard refresh, until the profile has been filled out
+DASHBOARD_REFRESH = Scenario(
+    "UserDashboardRefresh",
+    Step(
+        "dashboard_reload",
+        DASHBOARD_PAGE,
         # reload 10 times the dashboard api to simulate refresh waiting for enrollment
         # enrollment not tested
-        for _ in range(10):
-            self.client.get('/api/v0/dashboard/')
-
-
-class UserTab1(TaskSet):
-    """First Tab of the user profile"""
-    tasks = {UserDashboardRefresh: 10}
-    profile_filled_out = False
-
-    def on_start(self):
-        """on_start is called before any task is scheduled """
-        self.username = self.parent.username
-        self.mm_csrftoken = self.parent.mm_csrftoken
-
-    @task(1)
-    def stop(self):
-        """Return to the parent task"""
-        self.interrupt()
-
-    @task(2)
-    def profile_tabs(self):
-        """
-        Profile tabs
-        """
-        if self.mm_csrftoken is None:
-            self.interrupt()
-
+        Page('/api/v0/dashboard/ [refresh]', *[Request("GET", '/api/v0/dashboard/')] * 10),
+        weight=10,
+        requires=("mm_csrftoken",),
+        unless=("profile_filled_out",),
+    ),
+    weight=10,
+    stop=1,
+)
+
+# first tab of the user profile
+TAB_1 = Scenario(
+    "UserTab1",
+    DASHBOARD_REFRESH,
+    Step(
+        "profile_tabs",
         # loading part
-        self.client.get('/profile/')
-        resp_profile = self.client.get(
-            '/api/v0/profiles/{}/'.format(self.username),
-            name="'/api/v0/profiles/[username]/"
-        )
-        profile = resp_profile.json()
-        self.client.get('/api/v0/dashboard/')
-        self.client.get('/api/v0/course_prices/')
-        self.client.get('/api/v0/programs/')
-
-        # reset the profile as much as possible for the next run
-        profile['education'] = []
-        profile['work_history'] = []
-        if profile.get('agreed_to_terms_of_service') is True:
-            del profile['agreed_to_terms_of_service']
-        else:
-            profile['agreed_to_terms_of_service'] = True
-        filled_out = profile.get('filled_out')
-        if 'filled_out' in profile:
-            del profile['filled_out']
-        if 'email_optin' in profile:
-            del profile['email_optin']
-        if 'image' in profile:
-            del profile['image']
-
+        Page(
+            '/profile/',
+            Request("GET", '/profile/'),
+            Request("GET", '/api/v0/profiles/{username}/', extract={"profile": json_value()}),
+            Request("GET", '/api/v0/dashboard/'),
+            Request("GET", '/api/v0/course_prices/'),
+            Request("GET", '/api/v0/programs/'),
+        ),
         # submission part
-        profile.update({
-            'birth_country': 'IT',
-            'city': 'Los Angeles',
-            'country': 'US',
-            'date_of_birth': '2000-01-12',
-            'first_name': '{}'.format(self.username),
-            'gender': 'f',
-            'last_name': 'Example',
-            'nationality': 'IT',
-            'preferred_language': 'en',
-            'preferred_name': '{} Preferred'.format(self.username),
-            'state_or_territory': 'US-CA',
-        })
-
-        self.client.patch(
-            '/api/v0/profiles/{}/'.format(self.username),
-            json=profile,
-            headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                     'X-CSRFToken': self.mm_csrftoken},
-            name="'/api/v0/profiles/[username]/",
-        )
-        self.client.post(
-            '/api/v0/enrolledprograms/',
-            json={'program_id': settings.MICROMASTERS_PROGRAM_ID},
-            headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                     'X-CSRFToken': self.mm_csrftoken},
-        )
-        self.client.get('/api/v0/dashboard/')
-        self.client.get('/api/v0/course_prices/')
-
+        Call(reset_profile),
+        PATCH_PROFILE,
+        Request(
+            "POST", '/api/v0/enrolledprograms/',
+            json={'program_id': settings.MICROMASTERS_PROGRAM_ID}, headers=MICROMASTERS_HEADERS,
+        ),
+        Page(
+            '/dashboard/ [enrolled]',
+            Request("GET", '/api/v0/dashboard/'),
+            Request("GET", '/api/v0/course_prices/'),
+        ),
         # education
-        # add the high school
-        profile['education'].append(
-            {
-                "degree_name": "hs",
-                "graduation_date": "1998-02-01",
-                "field_of_study": None,
-                "online_degree": False,
-                "school_name": "School User",
-                "school_city": "Lexington",
-                "school_state_or_territory": "US-MA",
-                "school_country": "US"
-            }
-        )
-        self.client.patch(
-            '/api/v0/profiles/{}/'.format(self.username),
-            json=profile,
-            headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                     'X-CSRFToken': self.mm_csrftoken},
-            name="'/api/v0/profiles/[username]/",
-        )
-        # add college
-        profile['education'].append(
-            {
-                "degree_name": "m",
-                "graduation_date": "2008-12-01",
-                "field_of_study": "14.0903",
-                "online_degree": False,
-                "school_name": "University of Here",
-                "school_city": "Bologna",
-                "school_state_or_territory": "IT-BO",
-                "school_country": "IT",
-                "graduation_date_edit": {"year": "2008", "month": "12"}
-            }
-        )
-        self.client.patch(
-            '/api/v0/profiles/{}/'.format(self.username),
-            json=profile,
-            headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                     'X-CSRFToken': self.mm_csrftoken},
-            name="'/api/v0/profiles/[username]/",
-        )
-
+        Call(add_high_school),
+        PATCH_PROFILE,
+        Call(add_college),
+        PATCH_PROFILE,
         # professional
-        profile['work_history'].append(
-            {
-                "position": "Senior Software Engineer",
-                "industry": "Computer Software",
-                "company_name": "MIT",
-                "start_date": "2000-01-01",
-                "end_date": None,
-                "city": "Cambridge",
-                "country": "US",
-                "state_or_territory": "US-MA",
-                "start_date_edit": {"year": "2000", "month": "1"}
-            }
-        )
-        self.client.patch(
-            '/api/v0/profiles/{}/'.format(self.username),
-            json=profile,
-            headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                     'X-CSRFToken': self.mm_csrftoken},
-            name="'/api/v0/profiles/[username]/",
-        )
-
-        # I am done!
-        if not filled_out:
-            profile.update({
-                'filled_out': True,
-            })
-            self.client.patch(
-                '/api/v0/profiles/{}/'.format(self.username),
-                json=profile,
-                headers={'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
-                         'X-CSRFToken': self.mm_csrftoken},
-                name="'/api/v0/profiles/[username]/",
-            )
-
-        self.profile_filled_out = True
-
-
-class UserLogIn(TaskSet):
-    """
-    Section for login
-    """
-    tasks = {UserTab1: 10}
-
-    def on_start(self):
-        """on_start is called before any task is scheduled """
-        self.username = self.parent.username
-        self.mm_csrftoken = self.parent.mm_csrftoken
-
-    @task
-    def stop(self):
-        """Return to the parent task"""
-        self.interrupt()
-
-    @task(5)
-    def login(self):
-        """
-        Function to login an user on MicroMasters assuming she has an account on edX
-        """
-        # load the login form to get the token
-        login_form = self.client.get(
-            urljoin(settings.EDXORG_BASE_URL, '/login'),
-            name='/login[edx login page]',
-        )
-        cookies = login_form.cookies.get_dict()
-        # login edx
-        self.client.post(
-            urljoin(settings.EDXORG_BASE_URL, '/user_api/v1/account/login_session/'),
-            data={
-                "email": "{}@example.com".format(self.username),
-                "password": "test",
-                'remember': 'false'
-            },
-            headers={'Referer': urljoin(settings.EDXORG_BASE_URL, '/login'),
-                     'X-CSRFToken': cookies.get('csrftoken')},
-            name='/user_api/v1/account/login_session/[edx login form]'
-        )
-        # login micromasters
-        self.client.get(
-            '/login/edxorg/',
-            name='/login/edxorg/[micromasters]'
-        )
-        # get the csrftoken
-        parsed_url = urlparse(settings.MICROMASTERS_BASE_URL)
-        domain = parsed_url.netloc
-        if ':' in domain:
-            domain = domain.split(':')[0]
-        self.mm_csrftoken = self.client.cookies.get('csrftoken', domain=domain)
-
-    @task
-    def logout(self):
-        """
-        Logout from edx and micromasters
-        """
-        # logout edX
-        self.client.get(
-            urljoin(settings.EDXORG_BASE_URL, '/logout'),
-            name='/logout[edx]'
-        )
-        # logout micromasters
-        self.client.get(
-            '/logout',
-            name='/logout[micromasters]'
-        )
-        self.mm_csrftoken = None
-
-
-class UserBehavior(TaskSet):
-
-    tasks = {UserLogIn: 10}
-    username = None
-    mm_csrftoken = None
-
-    def on_start(self):
-        """on_start is called before any task is scheduled """
-        self.username = random.choice(settings.USERNAMES_IN_EDX)
-
-    @task(2)
-    def index_no_login(self):
-        """Load index page without being logged in"""
-        self.client.get("/")
-
-
-class WebsiteUser(HttpLocust):
+        Call(add_work_history),
+        PATCH_PROFILE,
+        Call(finish_profile),
+        Set(profile_filled_out=True),
+        weight=2,
+        requires=("mm_csrftoken",),
+        transaction="profile completion",
+    ),
+    weight=10,
+    stop=1,
+    setup=[Set(profile_filled_out=False)],
+)
+
+LOG_IN = log_in(TAB_1)
+
+UserBehavior = user_behavior("UserBehavior", LOG_IN).task_set()
+UserLogIn = LOG_IN.task_set()
+UserTab1 = TAB_1.task_set()
+UserDashboardRefresh = DASHBOARD_REFRESH.task_set()
+
+
+class WebsiteUser(BaseUser):
     host = settings.MICROMASTERS_BASE_URL
-    task_set = UserBehavior
-    min_wait = settings.LOCUST_TASK_MIN_WAIT
-    max_wait = settings.LOCUST_TASK_MAX_WAIT
+    tasks = [UserBehavior]
+    wait_time = wait_between(settings.LOCUST_TASK_MIN_WAIT, settings.LOCUST_TASK_MAX_WAIT)
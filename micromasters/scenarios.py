@@ -0,0 +1,121 @@
+"""
+Scenario steps shared by the micromasters locustfiles
+"""
+import random
+from urllib.parse import urljoin
+
+from common.logins import login_pool
+from common.page import Page
+from common.scenario import Call, Request, Scenario, Set, Step, cookie, response_cookie, standalone
+from micromasters import settings
+
+MICROMASTERS_HEADERS = {
+    'Referer': urljoin(settings.MICROMASTERS_BASE_URL, '/'),
+    'X-CSRFToken': '{mm_csrftoken}',
+}
+
+
+def choose_username(variables):  # pylint: disable=unused-argument
+    """Pick a user who has an edX account"""
+    return random.choice(settings.USERNAMES_IN_EDX)
+
+
+# login an user on MicroMasters assuming she has an account on edX
+LOGIN = Step(
+    "login",
+    # load the login form to get the token
+    Request(
+        "GET", urljoin(settings.EDXORG_BASE_URL, '/login'),
+        name='/login[edx login page]',
+        extract={"edx_csrftoken": response_cookie('csrftoken')},
+    ),
+    Request(
+        "POST", urljoin(settings.EDXORG_BASE_URL, '/user_api/v1/account/login_session/'),
+        name='/user_api/v1/account/login_session/[edx login form]',
+        data={
+            "email": "{username}@example.com",
+            "password": "test",
+            'remember': 'false'
+        },
+        headers={'Referer': urljoin(settings.EDXORG_BASE_URL, '/login'),
+                 'X-CSRFToken': '{edx_csrftoken}'},
+    ),
+    Request(
+        "GET", '/login/edxorg/',
+        name='/login/edxorg/[micromasters]',
+        extract={"mm_csrftoken": cookie('csrftoken', settings.MICROMASTERS_BASE_URL)},
+    ),
+    weight=5,
+    transaction="login",
+)
+
+_log_in = standalone(*LOGIN.items)
+
+
+def log_in_before_test(client, username):
+    """Log a user in before the test starts, see logins.py"""
+    variables = {"username": username}
+    _log_in(client, variables)
+    return variables if variables.get("mm_csrftoken") else None
+
+
+# sessions of users logged in before the test, if LOCUST_PRELOGIN is set
+LOGINS = login_pool("MicroMasters", settings.MICROMASTERS_BASE_URL, settings.USERNAMES_IN_EDX, log_in_before_test)
+
+
+def take_login(task_set, variables):
+    """Start with a session logged in before the test, or log in now if nobody could be"""
+    login = LOGINS.hand_out(task_set.client)
+    if login is not None:
+        variables.update(login.variables)
+        return
+    variables["username"] = choose_username(variables)
+    _log_in(task_set.client, variables)
+
+
+# logout from edx and micromasters
+LOGOUT = Step(
+    "logout",
+    Request("GET", urljoin(settings.EDXORG_BASE_URL, '/logout'), name='/logout[edx]'),
+    Request("GET", '/logout', name='/logout[micromasters]'),
+    Set(mm_csrftoken=None),
+)
+
+# the requests made when the dashboard page loads
+DASHBOARD_PAGE = Page(
+    '/dashboard/',
+    Request("GET", '/dashboard/'),
+    Request("GET", '/api/v0/profiles/{username}/'),
+    Request("GET", '/api/v0/dashboard/'),
+    Request("GET", '/api/v0/course_prices/'),
+    Request("GET", '/api/v0/programs/'),
+)
+
+
+def log_in(*scenarios):
+    """
+    The section of a test for a logged in user
+
+    Args:
+        scenarios (Scenario): what the user does once logged in
+    """
+    # logged in before the test, sharing sessions which mustn't be logged out of
+    if LOGINS is not None:
+        return Scenario("UserLogIn", *scenarios, weight=10, stop=1)
+    return Scenario("UserLogIn", *scenarios, LOGIN, LOGOUT, weight=10, stop=1)
+
+
+def user_behavior(name, log_in_scenario):
+    """
+    A user who logs in, or loads the index page without logging in
+
+    Args:
+        name (str): the name of the TaskSet
+        log_in_scenario (Scenario): what the user does once logged in
+    """
+    return Scenario(
+        name,
+        log_in_scenario,
+        Step("index_no_login", Request("GET", "/"), weight=2),
+        setup=[Call(take_login) if LOGINS is not None else Set(username=choose_username)],
+    )
@@ -0,0 +1,13 @@
+"""
+locust file for a mixed workload
+Runs the users of several locustfiles in one test, so the apps share infrastructure the way they do in production
+
+The suites and their share of the users are set with MIXED_SUITES, see suites.py. Each suite's users are sent
+to the host from its own settings, so don't pass --host. Requests are summarized by app and host when the test
+stops, see stats.py.
+"""
+from mixed import settings
+from mixed import stats  # pylint: disable=unused-import
+from mixed.suites import user_classes
+
+globals().update(user_classes(settings.MIXED_SUITES, settings.MIXED_CONNECTIONS))
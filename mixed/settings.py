@@ -0,0 +1,12 @@
+"""
+Settings for the mixed workload
+"""
+from common.settings import get_var
+
+# the suites to run together and the share of the users each gets, SUITE:WEIGHT,... see suites.py
+MIXED_SUITES = get_var('MIXED_SUITES', 'rapid_response:1,micromasters_dashboard:1,learn_search:1')
+# connections per host shared by each suite's users, SUITE:CONNECTIONS,...
+# suites which aren't listed use LOCUST_CONNECTIONS_PER_HOST
+MIXED_CONNECTIONS = get_var('MIXED_CONNECTIONS', '')
+# the open-discussions url, for suites whose locustfiles expect it to be given with --host
+OPEN_DISCUSSIONS_BASE_URL = get_var('OPEN_DISCUSSIONS_BASE_URL', 'http://mit-open.mit.local:8063')
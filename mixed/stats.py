@@ -0,0 +1,159 @@
+"""
+Per-application stats for a mixed workload
+
+Locust's stats are per endpoint, and with several apps under test at once what matters is how each app's
+users fared while the others were loading the shared infrastructure. Every HTTP request tagged with an app
+by suites.AppUserMixin is recorded in an HDR histogram per app and host, since an app's users can hit more
+than one host, e.g. MicroMasters users logging into edX. Workers send theirs to the master with their
+stats and when they stop.
+
+When the test stops the requests, failures, requests per second and percentiles are logged for each app on
+each host, for each app on all its hosts, and for each host from all the apps using it.
+"""
+import logging
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from hdrh.histogram import HdrHistogram
+from locust import events
+
+from common import settings
+from common.latency import HIGHEST_US, LOWEST_US, HdrLatencyRecorder
+from common.reporting import PSEUDO_REQUEST_TYPES, Collector
+
+log = logging.getLogger(__name__)
+
+STATS_KEY = "application_stats"
+ALL = "(all)"
+PERCENTILES = (50, 95, 99)
+
+
+class ApplicationStats:
+    """The HTTP requests sent by each app's users, by host"""
+    def __init__(self):
+        # keyed by (app, host) rather than request type and endpoint
+        self.latency = HdrLatencyRecorder(settings.LOCUST_HDR_SIGNIFICANT_FIGURES)
+        self.failures = Counter()
+
+    def record(self, app, host, response_time, failed):
+        """
+        Record a request
+
+        Args:
+            app (str): the app whose user sent it
+            host (str): the host it was sent to
+            response_time (float): milliseconds
+            failed (bool): whether it failed
+        """
+        self.latency.record(app, host, response_time)
+        if failed:
+            self.failures[(app, host)] += 1
+
+    def report(self):
+        """
+        Take what was recorded since the last report
+
+        Returns:
+            dict: the histograms and the failures of each app and host, or None if nothing was recorded
+        """
+        histograms = self.latency.report()
+        if histograms is None:
+            return None
+        failures = [[app, host, count] for (app, host), count in self.failures.items()]
+        self.failures = Counter()
+        return {"histograms": histograms, "failures": failures}
+
+    def merge(self, report):
+        """Add a report from this or another process"""
+        self.latency.merge(report["histograms"])
+        for app, host, failures in report["failures"]:
+            self.failures[(app, host)] += failures
+
+    def totals(self):
+        """
+        The stats of each app on each host, each app on all its hosts, and each host from all its apps
+
+        Returns:
+            list: (app, host, histogram, failures), sorted by app then host, with the host totals last
+        """
+        histograms = self.latency.totals()
+        rows = []
+        by_app = {}
+        by_host = {}
+        for app, host in histograms:
+            by_app.setdefault(app, []).append(host)
+            by_host.setdefault(host, []).append(app)
+        for app, hosts in sorted(by_app.items()):
+            keys = [(app, host) for host in sorted(hosts)]
+            rows.extend(self._row(histograms, *key, [key]) for key in keys)
+            if len(keys) > 1:
+                rows.append(self._row(histograms, app, ALL, keys))
+        for host, apps in sorted(by_host.items()):
+            if len(apps) > 1:
+                rows.append(self._row(histograms, ALL, host, [(app, host) for app in sorted(apps)]))
+        return rows
+
+    def _row(self, histograms, app, host, keys):
+        """The combined stats of some apps on some hosts"""
+        histogram = HdrHistogram(LOWEST_US, HIGHEST_US, settings.LOCUST_HDR_SIGNIFICANT_FIGURES)
+        for key in keys:
+            histogram.add(histograms[key])
+        return app, host, histogram, sum(self.failures[key] for key in keys)
+
+
+class Summary:
+    """Every process's requests during a test"""
+    def __init__(self):
+        self.stats = ApplicationStats()
+        self.start = time.monotonic()
+        self.stop = None
+
+    def log(self):
+        """Log the stats, over the time until they were first logged"""
+        self.stop = self.stop or time.monotonic()
+        elapsed = self.stop - self.start
+        lines = ["{:<24} {:<32} {:>10} {:>9} {:>9} {}".format(
+            "app", "host", "requests", "failures", "req/s",
+            " ".join("{:>9}".format("p{} ms".format(percentile)) for percentile in PERCENTILES),
+        )]
+        for app, host, histogram, failures in self.stats.totals():
+            count = histogram.get_total_count()
+            lines.append("{:<24} {:<32} {:>10} {:>9} {:>9.1f} {}".format(
+                app, host[:32], count, failures, count / elapsed if elapsed > 0 else 0,
+                " ".join(
+                    "{:>9.1f}".format(histogram.get_value_at_percentile(percentile) / 1000)
+                    for percentile in PERCENTILES
+                ),
+            ))
+        log.info("Requests by application over %.0fs:\n%s", elapsed, "\n".join(lines))
+
+
+# what this process recorded since it last reported
+RECORDED = ApplicationStats()
+SUMMARY = Summary()
+
+
+@events.request.add_listener
+def _record(request_type, response_time, context=None, url=None, exception=None, **kwargs):
+    """Record the HTTP requests sent by an app's users"""
+    app = (context or {}).get("app")
+    if app is None or response_time is None or request_type in PSEUDO_REQUEST_TYPES:
+        return
+    RECORDED.record(app, urlparse(url).netloc if url else "", response_time, exception is not None)
+
+
+def _reset():
+    """Count each test separately"""
+    global SUMMARY  # pylint: disable=global-statement
+    RECORDED.report()
+    SUMMARY = Summary()
+
+
+COLLECTOR = Collector(
+    STATS_KEY,
+    report=RECORDED.report,
+    merge=lambda report: SUMMARY.stats.merge(report),  # pylint: disable=unnecessary-lambda
+    log=lambda: SUMMARY.log(),  # pylint: disable=unnecessary-lambda
+    reset=_reset,
+)
@@ -0,0 +1,116 @@
+"""
+The locustfiles a mixed workload is made of
+
+Each suite is the user class of one of our locustfiles. For a mixed workload it's subclassed with the weight
+given in MIXED_SUITES, so locust spawns users of each suite in those proportions, and optionally with its own
+connections from MIXED_CONNECTIONS, so one suite's users can't starve another's. Each suite's users add
+{"app": SUITE} to the context of their requests, which stats.py sorts the requests by.
+"""
+import importlib
+from collections import namedtuple
+
+from common.user import shared_connections
+from mixed import settings
+
+Suite = namedtuple("Suite", [
+    # dotted path of the locustfile module
+    "module",
+    # name of the user class in the module
+    "user_class",
+    # the host to send requests to, for user classes without one
+    "host",
+])
+
+SUITES = {
+    "learn_search": Suite("open_discussions.learn.search", "AnonymousUser", settings.OPEN_DISCUSSIONS_BASE_URL),
+    "learn_ocw_search": Suite(
+        "open_discussions.learn.ocw_search", "AnonymousUser", settings.OPEN_DISCUSSIONS_BASE_URL
+    ),
+    "od_read_only": Suite("open_discussions.channels.loadtest_read_only", "WebsiteUser", None),
+    "od_reddit": Suite("open_discussions.channels.loadtest_reddit", "WebsiteUser", None),
+    "od_users": Suite("open_discussions.channels.loadtest_od_users", "WebsiteUser", None),
+    "od_users_creation": Suite("open_discussions.channels.loadtest_users_creation", "WebsiteUser", None),
+    "micromasters_login": Suite("micromasters.loadtest_first_login", "WebsiteUser", None),
+    "micromasters_dashboard": Suite("micromasters.loadtest_only_get", "WebsiteUser", None),
+    "rapid_response": Suite("rapid_response.loadtest_rapid_response", "WebsiteUser", None),
+}
+
+
+def parse_suite_values(value):
+    """
+    Parse SUITE:NUMBER,... into a dict
+
+    Args:
+        value (str): the setting
+
+    Returns:
+        dict: numbers by suite name, in the order given
+    """
+    values = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, number = item.partition(":")
+        name = name.strip()
+        if name not in SUITES:
+            raise ValueError("Unknown suite {!r}, expected one of {}".format(name, ", ".join(SUITES)))
+        values[name] = int(number) if number.strip() else 1
+    return values
+
+
+class AppUserMixin:
+    """Tags a user's requests with the suite it belongs to"""
+    app = None
+
+    def context(self):
+        return dict(super().context(), app=self.app)
+
+
+def user_class(name, weight, connections_per_host=0):
+    """
+    Make the user class for a suite
+
+    Only the suites which are used are imported, since importing a locustfile adds its event listeners.
+
+    Args:
+        name (str): the suite
+        weight (int): its share of the users
+        connections_per_host (int): connections for its users to share, or 0 to keep those of BaseUser
+
+    Returns:
+        type: the user class
+    """
+    suite = SUITES[name]
+    base = getattr(importlib.import_module(suite.module), suite.user_class)
+    attributes = {
+        "app": name,
+        "weight": weight,
+        "host": base.host or suite.host,
+        "__module__": __name__,
+    }
+    if connections_per_host:
+        attributes.update(shared_connections(connections_per_host))
+    class_name = "".join(part.capitalize() for part in name.split("_")) + "User"
+    return type(class_name, (AppUserMixin, base), attributes)
+
+
+def user_classes(suites, connections):
+    """
+    Make the user classes for a mixed workload
+
+    Args:
+        suites (str): SUITE:WEIGHT,... as in MIXED_SUITES
+        connections (str): SUITE:CONNECTIONS,... as in MIXED_CONNECTIONS
+
+    Returns:
+        dict: the user classes by class name
+    """
+    weights = parse_suite_values(suites)
+    connections_per_host = parse_suite_values(connections)
+    unused = set(connections_per_host) - set(weights)
+    if unused:
+        raise ValueError("MIXED_CONNECTIONS has suites which aren't in MIXED_SUITES: {}".format(", ".join(unused)))
+    classes = [
+        user_class(name, weight, connections_per_host.get(name, 0)) for name, weight in weights.items() if weight
+    ]
+    return {cls.__name__: cls for cls in classes}
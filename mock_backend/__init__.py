@@ -0,0 +1,5 @@
+"""
+A local stand-in for open-discussions, reddit, MicroMasters, edX and the LMS
+
+Use it to calibrate load generator throughput and to validate scenarios offline.
+"""
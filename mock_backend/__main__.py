@@ -0,0 +1,81 @@
+"""
+Run the mock backend
+
+    python -m mock_backend --port 8099 --latency lognormal:20:0.5 --error-rate 0.01
+
+Per-route behaviour can be given in a JSON config file, keyed by route name or prefix:
+
+    {
+        "default": {"latency": "constant:5"},
+        "routes": {
+            "od.search": {"latency": "lognormal:80:0.8", "error_rate": 0.02, "error_status": 504},
+            "reddit": {"latency": "exponential:30"}
+        }
+    }
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+
+from mock_backend.latency import Behaviour, parse_behaviour, parse_latency
+from mock_backend.server import MockBackend, serve
+
+
+def build_backend(args):
+    """Build the backend from the command line arguments"""
+    default = Behaviour(parse_latency(args.latency), args.error_rate, args.error_status)
+    behaviours = {}
+    if args.config:
+        with open(args.config) as config_file:
+            config = json.load(config_file)
+        default = parse_behaviour(config.get("default", {}), default)
+        behaviours = {
+            name: parse_behaviour(route_config, default)
+            for name, route_config in config.get("routes", {}).items()
+        }
+    return MockBackend(default, behaviours)
+
+
+def run(args, reuse_port):
+    """Serve in this process until interrupted"""
+    try:
+        asyncio.run(serve(build_backend(args), args.host, args.port, reuse_port=reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    """Parse the command line and serve"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the port")
+    parser.add_argument("--latency", default="none", help="default latency distribution, see latency.parse_latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="default fraction of injected errors")
+    parser.add_argument("--error-status", type=int, default=503, help="default status of injected errors")
+    parser.add_argument("--config", help="JSON file with per-route behaviour")
+    args = parser.parse_args()
+
+    # fail on a bad configuration before starting any workers
+    build_backend(args)
+
+    if args.workers == 1:
+        run(args, False)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run, args=(args, True), daemon=True)
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Latency distributions and error injection for mock backend routes
+"""
+import random
+from collections import namedtuple
+
+# latency is a callable returning a delay in seconds,
+# error_rate is the fraction of requests answered with error_status instead
+Behaviour = namedtuple("Behaviour", ["latency", "error_rate", "error_status"])
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution, all values are in milliseconds
+
+        none
+        constant:MS
+        uniform:LOW_MS:HIGH_MS
+        exponential:MEAN_MS
+        lognormal:MEDIAN_MS:SIGMA
+        pareto:MIN_MS:ALPHA
+
+    Args:
+        spec (str): the distribution
+
+    Returns:
+        callable: a function returning a delay in seconds, or None for no delay
+    """
+    kind, *args = spec.split(":")
+    try:
+        args = [float(arg) for arg in args]
+    except ValueError as ex:
+        raise ValueError("Invalid latency {!r}".format(spec)) from ex
+
+    if kind == "none" and not args:
+        return None
+    if kind == "constant" and len(args) == 1:
+        delay = args[0] / 1000
+        return lambda: delay
+    if kind == "uniform" and len(args) == 2:
+        low, high = args[0] / 1000, args[1] / 1000
+        return lambda: random.uniform(low, high)
+    if kind == "exponential" and len(args) == 1:
+        rate = 1000 / args[0]
+        return lambda: random.expovariate(rate)
+    if kind == "lognormal" and len(args) == 2:
+        median, sigma = args[0] / 1000, args[1]
+        return lambda: median * random.lognormvariate(0, sigma)
+    if kind == "pareto" and len(args) == 2:
+        minimum, alpha = args[0] / 1000, args[1]
+        return lambda: minimum * random.paretovariate(alpha)
+    raise ValueError("Invalid latency {!r}".format(spec))
+
+
+def parse_behaviour(config, default=None):
+    """
+    Parse the behaviour of a route from its configuration
+
+    Args:
+        config (dict): keys latency, error_rate and error_status, all optional
+        default (Behaviour): the behaviour to take missing keys from
+
+    Returns:
+        Behaviour: the route behaviour
+    """
+    behaviour = default or Behaviour(None, 0.0, 503)
+    if "latency" in config:
+        behaviour = behaviour._replace(latency=parse_latency(config["latency"]))
+    if "error_rate" in config:
+        behaviour = behaviour._replace(error_rate=float(config["error_rate"]))
+    if "error_status" in config:
+        behaviour = behaviour._replace(error_status=int(config["error_status"]))
+    return behaviour
@@ -0,0 +1,338 @@
+"""
+Endpoints of the services our locustfiles test, answered with canned data
+
+Responses only contain the fields our locustfiles, open_discussions_api and praw read.
+"""
+import json
+import re
+import time
+import uuid
+from collections import namedtuple
+
+Response = namedtuple("Response", ["status", "body", "headers"])
+
+JSON_CONTENT_TYPE = ("Content-Type", "application/json")
+HTML_CONTENT_TYPE = ("Content-Type", "text/html; charset=utf-8")
+
+SEARCH_HITS = 6
+SEARCH_TOTAL = 1000
+SEARCH_TOPICS = 200
+LISTING_SIZE = 5
+
+
+def _new_id():
+    return uuid.uuid4().hex[:8]
+
+
+def json_response(data, status=200, headers=()):
+    """A JSON response"""
+    return Response(status, json.dumps(data).encode("utf-8"), (JSON_CONTENT_TYPE,) + tuple(headers))
+
+
+def _constant(data, status=200, headers=()):
+    """A handler which always returns the same, pre-serialized response"""
+    response = json_response(data, status=status, headers=headers)
+    return lambda request, match: response
+
+
+def _html(request, match):  # pylint: disable=unused-argument
+    return Response(200, b"<html><body>mock</body></html>", (HTML_CONTENT_TYPE,))
+
+
+def _csrf_cookie():
+    return ("Set-Cookie", "csrftoken={}; Path=/".format(uuid.uuid4().hex))
+
+
+# open-discussions
+
+def _search_body():
+    return {
+        "took": 3,
+        "timed_out": False,
+        "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+        "hits": {
+            "total": {"value": SEARCH_TOTAL, "relation": "eq"},
+            "max_score": 1.0,
+            "hits": [{
+                "_index": "discussions_local_all_default",
+                "_id": "course_{}".format(index),
+                "_score": 1.0,
+                "_source": {
+                    "object_type": "course",
+                    "title": "Course {}".format(index),
+                    "short_description": "A course about things " * 10,
+                    "topics": ["Science", "Engineering"],
+                    "offered_by": ["OCW"],
+                },
+            } for index in range(SEARCH_HITS)],
+        },
+        "aggregations": {
+            "availability": {"doc_count": SEARCH_TOTAL, "runs": {"buckets": [
+                {"key": key, "doc_count": 10, "courses": {"doc_count": 10}}
+                for key in ("availableNow", "nextWeek", "nextMonth", "next3Months", "next6Months", "nextYear")
+            ]}},
+            "cost": {"doc_count": SEARCH_TOTAL, "prices": {"buckets": [
+                {"key": key, "doc_count": 10, "courses": {"doc_count": 10}} for key in ("free", "paid")
+            ]}},
+            "offered_by": {"buckets": [{"key": "OCW", "doc_count": 800}, {"key": "MITx", "doc_count": 200}]},
+            "topics": {"buckets": [
+                {"key": "Topic {}".format(index), "doc_count": index} for index in range(SEARCH_TOPICS)
+            ]},
+            "type": {"buckets": [{"key": "course", "doc_count": SEARCH_TOTAL}]},
+        },
+    }
+
+
+def _od_post(post_id, channel_name="mock_channel"):
+    return {
+        "id": post_id,
+        "title": "Mock post",
+        "text": "Mock text",
+        "channel_name": channel_name,
+        "upvoted": False,
+        "score": 1,
+        "num_comments": 0,
+    }
+
+
+def _od_create_user(request, match):  # pylint: disable=unused-argument
+    return json_response({"username": uuid.uuid4().hex[:20], "profile": {}}, status=201)
+
+
+def _od_create_channel(request, match):  # pylint: disable=unused-argument
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        payload = {}
+    return json_response(payload, status=201)
+
+
+def _od_create_post(request, match):
+    return json_response(_od_post(_new_id(), match.group("channel")), status=201)
+
+
+def _od_create_comment(request, match):
+    return json_response({"id": _new_id(), "post_id": match.group("post"), "text": "Mock comment"}, status=201)
+
+
+# reddit, as used by praw
+
+def _thing(kind, data):
+    return {"kind": kind, "data": data}
+
+
+def _listing(children):
+    return _thing("Listing", {"children": children, "after": None, "before": None})
+
+
+def _submission(post_id, subreddit="mock_channel"):
+    return _thing("t3", {
+        "id": post_id,
+        "name": "t3_{}".format(post_id),
+        "title": "Mock post",
+        "selftext": "Mock text",
+        "is_self": True,
+        "likes": None,
+        "score": 1,
+        "num_comments": 0,
+        "subreddit": subreddit,
+        "author": "mock_user",
+        "created_utc": time.time(),
+        "permalink": "/r/{}/comments/{}/".format(subreddit, post_id),
+        "url": "/r/{}/comments/{}/".format(subreddit, post_id),
+    })
+
+
+def _comment(comment_id, post_id="mock"):
+    return _thing("t1", {
+        "id": comment_id,
+        "name": "t1_{}".format(comment_id),
+        "body": "Mock comment",
+        "likes": None,
+        "score": 1,
+        "author": "mock_user",
+        "link_id": "t3_{}".format(post_id),
+        "parent_id": "t3_{}".format(post_id),
+        "subreddit": "mock_channel",
+        "created_utc": time.time(),
+        "replies": "",
+    })
+
+
+def _reddit_access_token(request, match):  # pylint: disable=unused-argument
+    return json_response({
+        "access_token": uuid.uuid4().hex,
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "scope": "*",
+    })
+
+
+def _reddit_subreddit(request, match):
+    return json_response(_thing("t5", {
+        "id": _new_id(),
+        "display_name": match.group("subreddit"),
+        "title": "Mock channel",
+        "public_description": "Mock channel",
+        "subreddit_type": "private",
+    }))
+
+
+def _reddit_hot(request, match):  # pylint: disable=unused-argument
+    return json_response(_listing([_submission(_new_id()) for _ in range(LISTING_SIZE)]))
+
+
+def _reddit_submit(request, match):  # pylint: disable=unused-argument
+    post_id = _new_id()
+    return json_response({"json": {"errors": [], "data": {
+        "id": post_id,
+        "name": "t3_{}".format(post_id),
+        "url": "/r/mock_channel/comments/{}/".format(post_id),
+    }}})
+
+
+def _reddit_submission(request, match):
+    return json_response([_listing([_submission(match.group("post"))]), _listing([])])
+
+
+def _reddit_info(request, match):  # pylint: disable=unused-argument
+    fullname = request.query.get("id", "t1_{}".format(_new_id()))
+    kind, _, thing_id = fullname.partition("_")
+    thing = _submission(thing_id) if kind == "t3" else _comment(thing_id)
+    return json_response(_listing([thing]))
+
+
+def _reddit_comment(request, match):  # pylint: disable=unused-argument
+    return json_response({"json": {"errors": [], "data": {"things": [_comment(_new_id())]}}})
+
+
+def _reddit_subscriptions(request, match):  # pylint: disable=unused-argument
+    return json_response(_listing([_thing("t5", {"id": _new_id(), "display_name": "mock_channel"})]))
+
+
+EMPTY_REDDIT_RESULT = {"json": {"errors": []}}
+
+# edX
+
+def _edx_login_page(request, match):  # pylint: disable=unused-argument
+    return Response(200, b"<html><body>login</body></html>", (HTML_CONTENT_TYPE, _csrf_cookie()))
+
+
+def _edx_login_session(request, match):  # pylint: disable=unused-argument
+    return json_response({"success": True}, headers=(
+        ("Set-Cookie", "edxloggedin=true; Path=/"),
+        ("Set-Cookie", "sessionid={}; Path=/".format(uuid.uuid4().hex)),
+        _csrf_cookie(),
+    ))
+
+
+def _edx_logout(request, match):  # pylint: disable=unused-argument
+    return Response(200, b"<html><body>logged out</body></html>", (
+        HTML_CONTENT_TYPE,
+        ("Set-Cookie", "edxloggedin=false; Path=/"),
+    ))
+
+
+# MicroMasters
+
+def _mm_login(request, match):  # pylint: disable=unused-argument
+    return Response(200, b"<html><body>dashboard</body></html>", (HTML_CONTENT_TYPE, _csrf_cookie()))
+
+
+def _mm_profile(request, match):
+    return json_response({
+        "username": match.group("username"),
+        "first_name": match.group("username"),
+        "last_name": "Mock",
+        "filled_out": False,
+        "agreed_to_terms_of_service": True,
+        "email_optin": False,
+        "image": None,
+        "education": [],
+        "work_history": [],
+    })
+
+
+# (name, method, path pattern, handler)
+# route names are used to configure latency and errors per route
+ROUTES = [
+    # open-discussions
+    ("od.index", "GET", r"/", _html),
+    ("od.search", "POST", r"/api/v0/search/", _constant(_search_body())),
+    ("od.frontpage", "GET", r"/api/v0/frontpage/", _constant({
+        "posts": [_od_post(str(index)) for index in range(LISTING_SIZE)], "pagination": {},
+    })),
+    ("od.users.create", "POST", r"/api/v0/users/", _od_create_user),
+    ("od.users.update", "PATCH", r"/api/v0/users/[^/]+/", _constant({"profile": {}})),
+    ("od.channels.list", "GET", r"/api/v0/channels/", _constant([])),
+    ("od.channels.create", "POST", r"/api/v0/channels/", _od_create_channel),
+    ("od.posts.list", "GET", r"/api/v0/channels/(?P<channel>[^/]+)/posts/", _constant({
+        "posts": [_od_post(str(index)) for index in range(LISTING_SIZE)], "pagination": {},
+    })),
+    ("od.posts.create", "POST", r"/api/v0/channels/(?P<channel>[^/]+)/posts/", _od_create_post),
+    ("od.posts.update", "PATCH", r"/api/v0/posts/[^/]+/", _constant(_od_post("mock"))),
+    ("od.comments.list", "GET", r"/api/v0/posts/(?P<post>[^/]+)/comments/", _constant([])),
+    ("od.comments.create", "POST", r"/api/v0/posts/(?P<post>[^/]+)/comments/", _od_create_comment),
+    ("od.comments.update", "PATCH", r"/api/v0/comments/[^/]+/", _constant({"id": "mock"})),
+    ("od.members.add", "POST", r"/api/v0/channels/[^/]+/(contributors|moderators|subscribers)/",
+     _constant({}, status=201)),
+    ("od.members.remove", "DELETE", r"/api/v0/channels/[^/]+/(contributors|moderators|subscribers)/[^/]+/",
+     lambda request, match: Response(204, b"", ())),
+
+    # reddit
+    ("reddit.refresh_token", "GET", r"/api/v1/generate_refresh_token", lambda request, match: json_response({
+        "refresh_token": uuid.uuid4().hex,
+    })),
+    ("reddit.access_token", "POST", r"/api/v1/access_token", _reddit_access_token),
+    ("reddit.subscriptions", "GET", r"/subreddits/mine/subscriber/?", _reddit_subscriptions),
+    ("reddit.subreddit.create", "POST", r"/api/site_admin/?", _constant(EMPTY_REDDIT_RESULT)),
+    ("reddit.subreddit", "GET", r"/r/(?P<subreddit>[^/]+)/about/?", _reddit_subreddit),
+    ("reddit.moderators", "GET", r"/r/[^/]+/about/moderators/?", _constant(_thing("UserList", {"children": []}))),
+    ("reddit.members", "POST", r"/r/[^/]+/api/(friend|unfriend|accept_moderator_invite)/?",
+     _constant(EMPTY_REDDIT_RESULT)),
+    ("reddit.hot", "GET", r"(/r/[^/]+)?/hot/?", _reddit_hot),
+    ("reddit.submit", "POST", r"/api/submit/?", _reddit_submit),
+    ("reddit.submission", "GET", r"/comments/(?P<post>[^/]+)/?", _reddit_submission),
+    ("reddit.info", "GET", r"/api/info/?", _reddit_info),
+    ("reddit.comment", "POST", r"/api/(comment|editusertext)/?", _reddit_comment),
+    ("reddit.actions", "POST", r"/api/(vote|del|subscribe)/?", _constant({})),
+
+    # edX and the LMS
+    ("edx.login_page", "GET", r"/login", _edx_login_page),
+    ("edx.login_session", "POST", r"/user_api/v1/account/login_session/", _edx_login_session),
+    ("edx.logout", "GET", r"/logout", _edx_logout),
+    ("edx.change_enrollment", "POST", r"/change_enrollment", _constant({})),
+    ("edx.problem_check", "POST", r"/courses/[^/]+/xblock/[^/]+/handler/xmodule_handler/problem_check",
+     _constant({"success": "correct", "contents": "<div>correct</div>", "progress_changed": True})),
+
+    # MicroMasters
+    ("mm.pages", "GET", r"/(dashboard|profile|learner/[^/]+)/?", _html),
+    ("mm.login", "GET", r"/login/edxorg/", _mm_login),
+    ("mm.profile", "GET", r"/api/v0/profiles/(?P<username>[^/]+)/", _mm_profile),
+    ("mm.profile.update", "PATCH", r"/api/v0/profiles/[^/]+/", _constant({})),
+    ("mm.dashboard", "GET", r"/api/v0/dashboard/", _constant({"programs": [], "is_edx_data_fresh": True})),
+    ("mm.course_prices", "GET", r"/api/v0/course_prices/", _constant([])),
+    ("mm.programs", "GET", r"/api/v0/programs/", _constant([])),
+    ("mm.enrolled_programs", "POST", r"/api/v0/enrolledprograms/", _constant({}, status=201)),
+]
+
+
+def compile_routes(routes=None):
+    """
+    Compile the route patterns
+
+    Args:
+        routes (list): routes to compile, defaults to ROUTES
+
+    Returns:
+        dict: lists of (name, compiled pattern, handler) keyed by method
+    """
+    compiled = {}
+    for name, method, pattern, handler in routes or ROUTES:
+        compiled.setdefault(method, []).append((name, re.compile(pattern + "$"), handler))
+    return compiled
+
+
+def not_found(request, match):  # pylint: disable=unused-argument
+    """The response for requests no route matches"""
+    return json_response({"detail": "Not found."}, status=404)
@@ -0,0 +1,165 @@
+"""
+A minimal asyncio HTTP/1.1 server for the mock backend
+
+It supports keep-alive and Content-Length bodies, which is all our load generators send.
+"""
+import asyncio
+import random
+from collections import namedtuple
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+from mock_backend.latency import Behaviour
+from mock_backend.routes import compile_routes, json_response, not_found
+
+Request = namedtuple("Request", ["method", "path", "query", "headers", "body"])
+
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class MockBackend:
+    """
+    Route requests and apply the configured latency and errors
+
+    Args:
+        default (Behaviour): the behaviour for routes without their own
+        behaviours (dict): Behaviour keyed by route name or route name prefix, e.g. "od" or "od.search"
+        routes (list): routes to serve, defaults to routes.ROUTES
+    """
+    def __init__(self, default=None, behaviours=None, routes=None):
+        self.default = default or Behaviour(None, 0.0, 503)
+        self.behaviours = behaviours or {}
+        self.routes = compile_routes(routes)
+        self._route_behaviours = {}
+
+    def behaviour_for(self, name):
+        """
+        Get the behaviour for a route, the most specific configured prefix wins
+
+        Args:
+            name (str): the route name
+
+        Returns:
+            Behaviour: the route behaviour
+        """
+        behaviour = self._route_behaviours.get(name)
+        if behaviour is None:
+            behaviour = self.default
+            parts = name.split(".")
+            for length in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:length])
+                if prefix in self.behaviours:
+                    behaviour = self.behaviours[prefix]
+                    break
+            self._route_behaviours[name] = behaviour
+        return behaviour
+
+    def route(self, request):
+        """
+        Find the handler for a request
+
+        Returns:
+            tuple: the route name, the pattern match and the handler
+        """
+        for name, pattern, handler in self.routes.get(request.method, ()):
+            match = pattern.match(request.path)
+            if match:
+                return name, match, handler
+        return None, None, not_found
+
+    async def respond(self, request):
+        """
+        Answer a request
+
+        Args:
+            request (Request): the request
+
+        Returns:
+            routes.Response: the response
+        """
+        name, match, handler = self.route(request)
+        if name is None:
+            return handler(request, match)
+        behaviour = self.behaviour_for(name)
+        if behaviour.latency is not None:
+            await asyncio.sleep(behaviour.latency())
+        if behaviour.error_rate and random.random() < behaviour.error_rate:
+            return json_response({"detail": "Injected error"}, status=behaviour.error_status)
+        return handler(request, match)
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on a connection until the client closes it"""
+        try:
+            while True:
+                request, keep_alive = await _read_request(reader)
+                if request is None:
+                    break
+                response = await self.respond(request)
+                _write_response(writer, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader):
+    """
+    Read a request from a connection
+
+    Returns:
+        tuple: the Request, or None if the connection was closed, and whether to keep the connection alive
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as ex:
+        if not ex.partial:
+            return None, False
+        raise
+    if len(head) > MAX_HEADER_BYTES:
+        raise ValueError("Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+
+    path, _, query_string = target.partition("?")
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return Request(method, path, dict(parse_qsl(query_string)), headers, body), keep_alive
+
+
+def _write_response(writer, response, keep_alive):
+    """Write a response to a connection"""
+    status = HTTPStatus(response.status)
+    head = ["HTTP/1.1 {} {}".format(status.value, status.phrase)]
+    head.extend("{}: {}".format(key, value) for key, value in response.headers)
+    head.append("Content-Length: {}".format(len(response.body)))
+    head.append("Connection: {}".format("keep-alive" if keep_alive else "close"))
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+
+
+async def serve(backend, host, port, reuse_port=False):
+    """
+    Serve the mock backend until cancelled
+
+    Args:
+        backend (MockBackend): the backend to serve
+        host (str): the interface to listen on
+        port (int): the port to listen on
+        reuse_port (bool): allow several processes to listen on the same port
+    """
+    server = await asyncio.start_server(
+        backend.handle_connection, host, port, reuse_port=reuse_port, backlog=4096,
+    )
+    async with server:
+        await server.serve_forever()
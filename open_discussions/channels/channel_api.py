@@ -1,11 +1,15 @@
 """Channels APIs copied from open-discussions/channels/api.py, edited to fit"""
 # pylint: disable=too-many-public-methods
+import signal
+import time
 from threading import local
 from urllib.parse import urljoin
 
 from contextlib import contextmanager
+import gevent
 import requests
 import praw
+from locust import events
 from praw.models.reddit import more
 from praw.models.reddit.redditor import Redditor
 from prawcore.exceptions import (
@@ -13,7 +17,9 @@ from prawcore.exceptions import (
     NotFound as PrawNotFound,
 )
 
-import .settings
+from open_discussions.channels import settings
+from open_discussions.util.cache import ExpiringLRUCache
+from open_discussions.util.trace import RequestTrace
 
 CHANNEL_TYPE_PUBLIC = 'public'
 CHANNEL_TYPE_PRIVATE = 'private'
@@ -46,25 +52,69 @@ COUNTER = 0
 LOCAL = local()
 LOCUST_SESSION = None
 
+# per-process caches keyed by username, so constructing an Api doesn't cost a refresh token
+# request and an OAuth token exchange before the request we actually want to measure
+CREDENTIALS_CACHE = ExpiringLRUCache(
+    settings.OPEN_DISCUSSIONS_REDDIT_CLIENT_CACHE_SIZE,
+    settings.OPEN_DISCUSSIONS_REDDIT_REFRESH_TOKEN_TTL_SECONDS,
+)
+CLIENT_CACHE = ExpiringLRUCache(
+    settings.OPEN_DISCUSSIONS_REDDIT_CLIENT_CACHE_SIZE,
+    settings.OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN_TTL_SECONDS,
+)
+
+
+# opt-in trace of the requests praw makes, see dump_trace()
+TRACE = RequestTrace(
+    settings.OPEN_DISCUSSIONS_TRACE_SAMPLE_RATE,
+    settings.OPEN_DISCUSSIONS_TRACE_BUFFER_SIZE,
+)
+
 
 def patch_locust_request():
     old_request = LOCUST_SESSION.request
 
     def altered_request(method, url, name=None, **kwargs):
-        global LOCAL
         method = method.upper()
+        name = getattr(LOCAL, 'patched_name', None) or name
 
+        if not TRACE.sampled():
+            return old_request(method, url, name=name, **kwargs)
+
+        start = time.perf_counter()
         try:
-            print("Set name to {}".format(name))
-            name = LOCAL.patched_name
-        except AttributeError:
-            print("No name, using {}".format(name))
-            pass
-        return old_request(method, url, name=name, **kwargs)
+            return old_request(method, url, name=name, **kwargs)
+        finally:
+            TRACE.record(method, url, name, (time.perf_counter() - start) * 1000)
 
     LOCUST_SESSION.request = altered_request
 
 
+def dump_trace(path=None):
+    """
+    Write the traced requests to a file
+
+    Args:
+        path (str): the file to write to, defaults to settings.OPEN_DISCUSSIONS_TRACE_FILE
+
+    Returns:
+        int: the number of records written
+    """
+    return TRACE.dump(path or settings.OPEN_DISCUSSIONS_TRACE_FILE)
+
+
+@events.test_stop.add_listener
+def _dump_trace_on_test_stop(**kwargs):
+    """Dump the trace when the test stops"""
+    if TRACE.enabled:
+        dump_trace()
+
+
+if TRACE.enabled and hasattr(signal, 'SIGUSR1'):
+    # kill -USR1 <pid> dumps the trace on demand
+    gevent.signal_handler(signal.SIGUSR1, dump_trace)
+
+
 @contextmanager
 def request_name(name):
     LOCAL.patched_name = name
@@ -91,7 +141,9 @@ def get_or_create_user(username):
     session = _get_session()
     with request_name("/api/v1/generate_refresh_token"):
         resp = session.get(refresh_token_url, params={'username': username}, name='/api/v1/generate_refresh_token').json()
-    return resp['refresh_token']
+    refresh_token = resp['refresh_token']
+    CREDENTIALS_CACHE.set(username, refresh_token)
+    return refresh_token
 
 
 def _get_user_credentials(user):
@@ -104,7 +156,9 @@ def _get_user_credentials(user):
     Returns:
         dict: set of configuration credentials for the user
     """
-    refresh_token = get_or_create_user(user.username)
+    refresh_token = CREDENTIALS_CACHE.get(user.username)
+    if refresh_token is None:
+        refresh_token = get_or_create_user(user.username)
 
     return {
         'client_id': settings.OPEN_DISCUSSIONS_REDDIT_CLIENT_ID,
@@ -144,7 +198,7 @@ def _get_requester_kwargs():
 
 def _get_client(user):
     """
-    Get a configured Reddit client_id
+    Get a configured Reddit client_id, reusing a cached client for the user if there is one
 
     Args:
         user (User): the authenticated user
@@ -152,9 +206,13 @@ def _get_client(user):
     Returns:
         praw.Reddit: configured reddit client
     """
+    client = CLIENT_CACHE.get(user.username)
+    if client is not None:
+        return client
+
     credentials = _get_user_credentials(user=user)
 
-    return praw.Reddit(
+    client = praw.Reddit(
         reddit_url=settings.OPEN_DISCUSSIONS_REDDIT_URL,
         oauth_url=settings.OPEN_DISCUSSIONS_REDDIT_URL,
         short_url=settings.OPEN_DISCUSSIONS_REDDIT_URL,
@@ -163,6 +221,8 @@ def _get_client(user):
         check_for_updates=False,
         **credentials
     )
+    CLIENT_CACHE.set(user.username, client)
+    return client
 
 
 def _get_user_agent():
@@ -305,8 +365,7 @@ class Api:
             count (int): number of posts seen so far
 
         Returns:
-            praw.models.listing.generator.ListingGenerator:
-                A generator of posts for a subreddit
+            list of praw.models.Submission: the posts
         """
         params = {}
         if before is not None:
@@ -316,10 +375,11 @@ class Api:
         if count is not None:
             params['count'] = count
 
+        # listings are lazy, list it here so the request is sent under this name
         with request_name('/r/[channel_name]/hot?count=0&limit=25&raw_json=1'):
-            return self.get_channel(channel_name).hot(
+            return list(self.get_channel(channel_name).hot(
                 limit=settings.OPEN_DISCUSSIONS_CHANNEL_POST_LIMIT, params=params
-            )
+            ))
 
     def get_post(self, post_id):
         """
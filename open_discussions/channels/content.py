@@ -0,0 +1,217 @@
+"""
+Synthetic text for the discussions tests, generated once at startup instead of calling Faker for every write
+
+Faker takes tens of microseconds for each paragraph or name, which adds up when every post, comment and
+channel needs several. A ContentPool generates a few thousand of each up front, from Faker's names and
+word list, and picking one is a random index into a list.
+
+Post and comment lengths in words follow distributions set with OPEN_DISCUSSIONS_CONTENT_POST_WORDS,
+OPEN_DISCUSSIONS_CONTENT_COMMENT_WORDS and OPEN_DISCUSSIONS_CONTENT_TITLE_WORDS, one of
+
+    constant:WORDS
+    uniform:LOW:HIGH
+    lognormal:MEDIAN:SIGMA
+
+Real post and comment lengths are roughly lognormal, mostly short with a long tail.
+
+To send exactly the same text on every run, generate the pool once and load it from a file:
+
+    python -m open_discussions.channels.content content.json
+    OPEN_DISCUSSIONS_CONTENT_FILE=content.json locust -f ...
+"""
+import json
+import logging
+import random
+import sys
+
+from faker import Faker
+from locust import events
+from locust.runners import MasterRunner
+
+from open_discussions.channels import settings
+
+log = logging.getLogger(__name__)
+
+# words per sentence of generated text
+SENTENCE_WORDS = (5, 15)
+
+
+def parse_length(spec):
+    """
+    Parse a length distribution, see the module docstring for the format
+
+    Args:
+        spec (str): the distribution
+
+    Returns:
+        callable: a function of a random.Random returning a length of at least 1
+    """
+    kind, *args = spec.split(":")
+    try:
+        args = [float(arg) for arg in args]
+    except ValueError as ex:
+        raise ValueError("Invalid length {!r}".format(spec)) from ex
+
+    if kind == "constant" and len(args) == 1:
+        length = max(int(args[0]), 1)
+        return lambda rng: length
+    if kind == "uniform" and len(args) == 2:
+        low, high = int(args[0]), int(args[1])
+        return lambda rng: max(rng.randint(low, high), 1)
+    if kind == "lognormal" and len(args) == 2:
+        median, sigma = args
+        return lambda rng: max(int(round(median * rng.lognormvariate(0, sigma))), 1)
+    raise ValueError("Invalid length {!r}".format(spec))
+
+
+def make_text(words, length, rng):
+    """
+    Make text of sentences from a vocabulary
+
+    Args:
+        words (list of str): the vocabulary
+        length (int): the number of words
+        rng (random.Random): the random number generator
+
+    Returns:
+        str: the text
+    """
+    chosen = rng.choices(words, k=length)
+    sentences = []
+    start = 0
+    while start < length:
+        end = min(start + rng.randint(*SENTENCE_WORDS), length)
+        sentence = " ".join(chosen[start:end])
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        start = end
+    return " ".join(sentences)
+
+
+class ContentPool:
+    """
+    Pre-generated titles, post and comment text, and names
+
+    Args:
+        pools (dict): lists of "titles", "posts", "comments", "names" and "words"
+    """
+    KINDS = ("titles", "posts", "comments", "names", "words")
+
+    def __init__(self, pools):
+        missing = [kind for kind in self.KINDS if not pools.get(kind)]
+        if missing:
+            raise ValueError("Content pool has no {}".format(", ".join(missing)))
+        self.titles = pools["titles"]
+        self.posts = pools["posts"]
+        self.comments = pools["comments"]
+        self.names = pools["names"]
+        self.words = pools["words"]
+
+    @classmethod
+    def generate(cls, size, title_words, post_words, comment_words, seed=None):
+        """
+        Generate a pool
+
+        Args:
+            size (int): how many of each kind of content to make
+            title_words (callable): the title length distribution, from parse_length
+            post_words (callable): the post length distribution
+            comment_words (callable): the comment length distribution
+            seed (int): seed for the same content every time, or None
+
+        Returns:
+            ContentPool: the pool
+        """
+        rng = random.Random(seed)
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
+        words = list(fake.get_words_list())
+
+        def titles():
+            for _ in range(size):
+                title = " ".join(rng.choices(words, k=title_words(rng)))
+                yield title[0].upper() + title[1:]
+
+        return cls({
+            "titles": list(titles()),
+            "posts": [make_text(words, post_words(rng), rng) for _ in range(size)],
+            "comments": [make_text(words, comment_words(rng), rng) for _ in range(size)],
+            "names": [fake.name() for _ in range(size)],
+            "words": words,
+        })
+
+    @classmethod
+    def load(cls, path):
+        """Load a pool saved with save()"""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        """Save the pool to a JSON file"""
+        with open(path, "w") as f:
+            json.dump({kind: getattr(self, kind) for kind in self.KINDS}, f)
+
+    def title(self):
+        """A post or channel title"""
+        return random.choice(self.titles)
+
+    def post_text(self):
+        """The text of a post, or a channel description"""
+        return random.choice(self.posts)
+
+    def comment_text(self):
+        """The text of a comment"""
+        return random.choice(self.comments)
+
+    def name(self):
+        """A person's name"""
+        return random.choice(self.names)
+
+    def channel_name(self):
+        """A channel name, two lowercase words joined by an underscore"""
+        return "{}_{}".format(random.choice(self.words), random.choice(self.words))
+
+
+_CONTENT = None
+
+
+def get_content():
+    """
+    Get the content pool from the settings, generated or loaded on first use
+
+    Returns:
+        ContentPool: the pool
+    """
+    global _CONTENT  # pylint: disable=global-statement
+    if _CONTENT is None:
+        if settings.CONTENT_FILE:
+            _CONTENT = ContentPool.load(settings.CONTENT_FILE)
+        else:
+            _CONTENT = _generate()
+    return _CONTENT
+
+
+@events.init.add_listener
+def _prepare_content(environment, **kwargs):
+    """Make the pool before users start, rather than in the first user's first write"""
+    if not isinstance(environment.runner, MasterRunner):
+        get_content()
+
+
+def _generate():
+    """Generate a pool as set in the settings"""
+    pool = ContentPool.generate(
+        settings.CONTENT_POOL_SIZE,
+        parse_length(settings.CONTENT_TITLE_WORDS),
+        parse_length(settings.CONTENT_POST_WORDS),
+        parse_length(settings.CONTENT_COMMENT_WORDS),
+        seed=int(settings.CONTENT_SEED) if settings.CONTENT_SEED else None,
+    )
+    log.info("Generated %d of each kind of content", settings.CONTENT_POOL_SIZE)
+    return pool
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m open_discussions.channels.content OUTPUT")
+    _generate().save(sys.argv[1])
@@ -3,106 +3,90 @@ locust file for open discussions
 This test the full usage flow of open discussion
 """
 
-import random
-
-from faker import Faker
-from locust import HttpLocust, TaskSet, task
+from locust import TaskSet
+from common.scenario import weighted
+from common.user import BaseUser, wait_between
 from open_discussions_api.client import OpenDiscussionsApi
 from open_discussions_api.users.client import UsersApi
 from open_discussions_api.channels.client import ChannelsApi
 
-import .settings
-import .utils
-
-
-fake = Faker()
+from open_discussions.channels import sessions, settings, utils
+from open_discussions.channels.content import get_content
+from open_discussions.channels.mixes import CHANNEL_MIX, USER_MIX
+from open_discussions.channels.registry import REGISTRY
 
 
+@weighted(CHANNEL_MIX)
 class UsersChannel(TaskSet):
 
-    tasks = {}
-
     def on_start(self):
         """on_start is called before any task is scheduled """
-        self.moderators = set()
-        self.contributors = set()
-        self.posts = []
-        self.comments = []
-        self.channel = random.choice(self.parent.discussion_channels)
+        self.channel = REGISTRY.sample('channels')
         self.api = self.parent.api
+        if self.channel is None:
+            # no channels have been created yet
+            self.interrupt(reschedule=False)
 
     def get_client_for(self, username):
         """
-        Creates an autenticated client
+        Gets an authenticated client from the session pool
         """
-        api = OpenDiscussionsApi(
-            settings.OPEN_DISCUSSIONS_JWT_SECRET,
-            settings.OPEN_DISCUSSIONS_BASE_URL,
-            username,
-        )
-        return api._get_authenticated_session()
+        return sessions.SESSION_POOL.get_session(self.client, username)
 
-    @task
     def stop(self):
         """Return to the parent task"""
         self.interrupt()
 
-    @task
     def add_moderator(self):
         """Adds a moderator to the channel"""
-        username = random.choice(self.parent.discussion_usernames)
+        username = REGISTRY.sample('usernames')
+        if username is None:
+            return
         self.api.channels.add_moderator(self.channel, username)
         self.api.channels.add_subscriber(self.channel, username)
-        self.moderators.add(username)
+        REGISTRY.add('moderators', username, self.channel)
 
-    @task(10)
     def add_contributor(self):
         """Adds a contributor to the channel"""
-        username = random.choice(self.parent.discussion_usernames)
+        username = REGISTRY.sample('usernames')
+        if username is None:
+            return
         self.api.channels.add_contributor(self.channel, username)
         self.api.channels.add_subscriber(self.channel, username)
-        self.contributors.add(username)
+        REGISTRY.add('contributors', username, self.channel)
 
-    @task(6)
     def remove_contributor(self):
         """Removes a contributor from the channel"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # no contributors
             return
+        REGISTRY.discard('contributors', username, self.channel)
         self.api.channels.remove_subscriber(self.channel, username)
         self.api.channels.remove_contributor(self.channel, username)
-        self.contributors.remove(username)
 
-    @task(20)
     def load_frontpage(self):
         """Hits the frontpage api"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         client = self.get_client_for(username)
         client.get('/api/v0/frontpage/')
 
-    @task(20)
     def load_channels(self):
         """Hits the channel api"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         client = self.get_client_for(username)
         client.get('/api/v0/channels/')
 
-    @task(20)
     def load_channel_posts(self):
         """Hits the channel posts api"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         client = self.get_client_for(username)
@@ -111,13 +95,11 @@ class UsersChannel(TaskSet):
             name='/api/v0/channels/[channel_name]/posts/',
         )
 
-    @task(20)
     def load_post_comments(self):
         """Loads the post comments"""
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -126,56 +108,50 @@ class UsersChannel(TaskSet):
             name='/api/v0/posts/[post_id]/comments/',
         )
 
-    @task(6)
     def create_post(self):
         """
         creates a post for an user
         """
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         client = self.get_client_for(username)
         res = client.post(
             '/api/v0/channels/{}/posts/'.format(self.channel),
             json={
-                'title': ' '.join(fake.paragraph().split(' ')[:2]),
-                'text': fake.paragraph(),
+                'title': get_content().title(),
+                'text': get_content().post_text(),
                 'upvoted': False,
             },
             name='/api/v0/channels/[channel_name]/posts/'
         )
-        self.posts.append(res.json()['id'])
+        REGISTRY.add('posts', res.json()['id'], self.channel)
 
-    @task(10)
     def create_comment(self):
         """
         Creates a comment for a post
         """
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
         res = client.post(
             '/api/v0/posts/{}/comments/'.format(post_id),
-            json={"text": fake.paragraph()},
+            json={"text": get_content().comment_text()},
             name='/api/v0/posts/[post_id]/comments/'
         )
-        self.comments.append(res.json()['id'])
+        REGISTRY.add('comments', res.json()['id'], self.channel)
 
-    @task(20)
     def upvote_post(self):
         """
         Upvotes a post
         """
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -185,15 +161,13 @@ class UsersChannel(TaskSet):
             name='/api/v0/posts/[post_id]/'
         )
 
-    @task(5)
     def clear_vote_post(self):
         """
         Clear vote for a post
         """
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -203,15 +177,13 @@ class UsersChannel(TaskSet):
             name='/api/v0/posts/[post_id]/'
         )
 
-    @task(20)
     def upvote_comment(self):
         """
         Upvotes a comment
         """
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -221,15 +193,13 @@ class UsersChannel(TaskSet):
             name='/api/v0/comments/[comment_id]/'
         )
 
-    @task(20)
     def downvote_comment(self):
         """
         Downvotes a comment
         """
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -239,12 +209,10 @@ class UsersChannel(TaskSet):
             name='/api/v0/comments/[comment_id]/'
         )
 
-    @task(5)
     def clear_vote_comment(self):
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
         client = self.get_client_for(username)
@@ -258,17 +226,15 @@ class UsersChannel(TaskSet):
         )
 
 
+@weighted(USER_MIX, UsersChannel=UsersChannel)
 class UserBehavior(TaskSet):
 
-    tasks = {UsersChannel: 10}
-
     discussion_usernames_number = 100
     username = None
 
     def on_start(self):
         """on_start is called before any task is scheduled """
-        self.discussion_usernames = []
-        self.discussion_channels = []
+        self.created_usernames = 0
 
         # monkey patch the library client
         OpenDiscussionsApi._get_session = utils.patch_get_session(self.client)
@@ -297,55 +263,54 @@ class UserBehavior(TaskSet):
     def create_user(self):
         """creates an user in the system"""
         # limit the number of users
-        if len(self.discussion_usernames) >= self.discussion_usernames_number:
+        if self.created_usernames >= self.discussion_usernames_number:
             return
-        res = self.api.users.create(name=fake.name(), image=None, image_small=None, image_medium=None)
+        res = self.api.users.create(name=get_content().name(), image=None, image_small=None, image_medium=None)
         if res.status_code != 201:
             return
-        self.discussion_usernames.append(res.json()['username'])
+        self.created_usernames += 1
+        REGISTRY.add('usernames', res.json()['username'])
 
     def create_channel(self):
         """Create a channel"""
-        name = '_'.join(fake.paragraph().split(' ')[:2]).lower()
+        name = get_content().channel_name()
         res = self.api.channels.create(
-            title=' '.join(fake.paragraph().split(' ')[:2]),
+            title=get_content().title(),
             name=name,
-            public_description=fake.paragraph(),
+            public_description=get_content().post_text(),
             channel_type='private',
         )
         if res.status_code != 201:
             return
-        self.discussion_channels.append(name)
+        REGISTRY.add('channels', name)
 
-    @task
     def create_additional_channel(self):
         """New channels are occational"""
         self.create_channel()
 
-    @task
     def create_additional_user(self):
         """New users are occational"""
         self.create_user()
 
-    @task(5)
     def update_user(self):
         """updates an user in the system"""
+        username = REGISTRY.sample('usernames')
+        if username is None:
+            return
         self.api.users.update(
-            username=random.choice(self.discussion_usernames),
-            name=fake.name(),
+            username=username,
+            name=get_content().name(),
             image=None,
             image_small=None,
             image_medium=None
         )
 
-    @task(10)
     def index(self):
         """Load index page"""
         self.client.get("/")
 
 
-class WebsiteUser(HttpLocust):
+class WebsiteUser(BaseUser):
     host = settings.OPEN_DISCUSSIONS_BASE_URL
-    task_set = UserBehavior
-    min_wait = settings.LOCUST_TASK_MIN_WAIT
-    max_wait = settings.LOCUST_TASK_MAX_WAIT
+    tasks = [UserBehavior]
+    wait_time = wait_between(settings.LOCUST_TASK_MIN_WAIT, settings.LOCUST_TASK_MAX_WAIT)
@@ -1,17 +1,17 @@
 """
 Locust tests for PRAW
 """
-import random
 import uuid
 
-from faker import Faker
-from locust import HttpLocust, TaskSet, task
+from locust import TaskSet
 
-import .settings
-import .channel_api
-
-
-fake = Faker()
+from common.scenario import weighted
+from common.transactions import transaction
+from common.user import BaseUser, wait_between
+from open_discussions.channels import channel_api, settings
+from open_discussions.channels.content import get_content
+from open_discussions.channels.mixes import CHANNEL_MIX, USER_MIX
+from open_discussions.channels.registry import REGISTRY
 
 
 def make_api_client(username):
@@ -24,85 +24,76 @@ def recurse_comments(comment_tree):
         recurse_comments(comment.replies)
 
 
+@weighted(CHANNEL_MIX)
 class UsersChannel(TaskSet):
     """Tasks for a user interacting with a subreddit"""
-    tasks = {}
-
     def on_start(self):
         """on_start is called before any task is scheduled """
-        self.moderators = set()
-        self.contributors = set()
-        self.posts = []
-        self.comments = []
-        self.channel = random.choice(self.parent.discussion_channels)
+        self.channel = REGISTRY.sample('channels')
+        if self.channel is None:
+            # no channels have been created yet
+            self.interrupt(reschedule=False)
 
-    @task
     def stop(self):
         """Return to the parent task"""
         self.interrupt()
 
-    @task
     def add_moderator(self):
         """Adds a moderator to the channel"""
-        username = random.choice(self.parent.discussion_usernames)
+        username = REGISTRY.sample('usernames')
+        if username is None:
+            return
         api = make_api_client(settings.OPEN_DISCUSSIONS_API_USERNAME)
         api.add_moderator(username, self.channel)
         api.add_subscriber(username, self.channel)
 
-        self.moderators.add(username)
+        REGISTRY.add('moderators', username, self.channel)
 
-    @task(10)
     def add_contributor(self):
         """Adds a contributor to the channel"""
-        username = random.choice(self.parent.discussion_usernames)
+        username = REGISTRY.sample('usernames')
+        if username is None:
+            return
         api = make_api_client(settings.OPEN_DISCUSSIONS_API_USERNAME)
         api.add_contributor(username, self.channel)
         api.add_subscriber(username, self.channel)
 
-        self.contributors.add(username)
+        REGISTRY.add('contributors', username, self.channel)
 
-    @task(6)
     def remove_contributor(self):
         """Removes a contributor from the channel"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # no contributors
             return
+        REGISTRY.discard('contributors', username, self.channel)
         api = make_api_client(settings.OPEN_DISCUSSIONS_API_USERNAME)
         api.remove_subscriber(username, self.channel)
         api.remove_contributor(username, self.channel)
-        self.contributors.remove(username)
 
-    @task(20)
     def load_frontpage(self):
         """Hits the frontpage api"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         api = make_api_client(username)
         api.front_page()
 
-    @task(20)
     def load_channel_posts(self):
         """Hits the channel posts api"""
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         api = make_api_client(username)
         api.list_posts(self.channel)
 
-    @task(20)
     def load_post_comments(self):
         """Loads the post comments"""
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         api = make_api_client(username)
@@ -112,54 +103,49 @@ class UsersChannel(TaskSet):
         comment_tree.replace_more(limit=0)
         recurse_comments(comment_tree)
 
-    @task(6)
     def create_post(self):
         """
         creates a post for an user
         """
-        try:
-            username = random.choice(list(self.contributors))
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        if username is None:
             # this means that this started before creating contributors
             return
         api = make_api_client(username)
         post = api.create_post(
             channel_name=self.channel,
-            title=' '.join(fake.paragraph().split(' ')[:2]),
-            text=fake.paragraph(),
+            title=get_content().title(),
+            text=get_content().post_text(),
         )
         # Force HTTP GET request
         with channel_api.request_name("/comments/[post_id]/?limit=2048&sort=best&raw_json=1"):
             _ = post.title
-        self.posts.append(post.id)
+        REGISTRY.add('posts', post.id, self.channel)
 
-    @task(10)
     def create_comment(self):
         """
         Creates a comment for a post
         """
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         api = make_api_client(username)
         comment = api.create_comment(
-            text=fake.paragraph(),
+            text=get_content().comment_text(),
             post_id=post_id,
         )
-        self.comments.append(comment.id)
+        REGISTRY.add('comments', comment.id, self.channel)
 
-    @task(20)
+    @transaction("upvote post")
     def upvote_post(self):
         """
         Upvotes a post
         """
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         api = make_api_client(username)
@@ -179,13 +165,12 @@ class UsersChannel(TaskSet):
             # Force HTTP get request
             _ = post.title
 
-    @task(5)
+    @transaction("clear vote post")
     def clear_vote_post(self):
         """Clear the vote on a post"""
-        try:
-            username = random.choice(list(self.contributors))
-            post_id = random.choice(self.posts)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        post_id = REGISTRY.sample('posts', self.channel)
+        if username is None or post_id is None:
             # this means that this started before creating contributors or posts
             return
         api = make_api_client(username)
@@ -206,15 +191,14 @@ class UsersChannel(TaskSet):
             # Force HTTP get request
             _ = post.title
 
-    @task(20)
+    @transaction("upvote comment")
     def upvote_comment(self):
         """
         Upvotes a comment
         """
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
 
@@ -235,15 +219,14 @@ class UsersChannel(TaskSet):
             # Force HTTP get request
             _ = comment.likes
 
-    @task(20)
+    @transaction("downvote comment")
     def downvote_comment(self):
         """
         Downvotes a comment
         """
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
 
@@ -264,13 +247,12 @@ class UsersChannel(TaskSet):
             # Force HTTP get request
             _ = comment.likes
 
-    @task(5)
+    @transaction("clear vote comment")
     def clear_vote_comment(self):
         """Clear the vote of a comment"""
-        try:
-            username = random.choice(list(self.contributors))
-            comment_id = random.choice(self.comments)
-        except IndexError:
+        username = REGISTRY.sample('contributors', self.channel)
+        comment_id = REGISTRY.sample('comments', self.channel)
+        if username is None or comment_id is None:
             # this means that this started before creating contributors or posts
             return
 
@@ -292,16 +274,14 @@ class UsersChannel(TaskSet):
             _ = comment.likes
 
 
+@weighted(USER_MIX, UsersChannel=UsersChannel)
 class UserBehavior(TaskSet):
     """Tasks for testing reddit PRAW client"""
-    tasks = {UsersChannel: 10}
-
     discussion_usernames_number = 100
 
     def on_start(self):
         """on_start is called before any task is scheduled """
-        self.discussion_usernames = []
-        self.discussion_channels = []
+        self.created_usernames = 0
 
         channel_api.LOCUST_SESSION = self.client
         channel_api.patch_locust_request()
@@ -316,12 +296,13 @@ class UserBehavior(TaskSet):
     def create_user(self):
         """creates an user in the system"""
         # limit the number of users
-        if len(self.discussion_usernames) >= self.discussion_usernames_number:
+        if self.created_usernames >= self.discussion_usernames_number:
             return
 
         username = uuid.uuid4().hex
         channel_api.get_or_create_user(username)
-        self.discussion_usernames.append(username)
+        self.created_usernames += 1
+        REGISTRY.add('usernames', username)
 
     def create_channel(self):
         """Create a channel"""
@@ -330,34 +311,32 @@ class UserBehavior(TaskSet):
         name = "channel_{}".format(uuid.uuid4().hex)[:20]
 
         api.create_channel(
-            title=' '.join(fake.paragraph().split(' ')[:2]),
+            title=get_content().title(),
             name=name,
-            public_description=fake.paragraph(),
+            public_description=get_content().post_text(),
             channel_type='private',
         )
         with channel_api.request_name("/r/[channel_name]/about/?raw_json=1"):
             # access title to force an HTTP request
             _ = api.get_channel(name).title
-        self.discussion_channels.append(name)
+        REGISTRY.add('channels', name)
 
-    @task
     def create_additional_channel(self):
         """New channels are occasional"""
         self.create_channel()
 
-    @task
     def create_additional_user(self):
         """New users are occasional"""
         self.create_user()
 
-    @task(5)
     def update_user(self):
         """updates an user in the system"""
-        channel_api.get_or_create_user(random.choice(self.discussion_usernames))
+        username = REGISTRY.sample('usernames')
+        if username is not None:
+            channel_api.get_or_create_user(username)
 
 
-class WebsiteUser(HttpLocust):
+class WebsiteUser(BaseUser):
     host = settings.OPEN_DISCUSSIONS_BASE_URL
-    task_set = UserBehavior
-    min_wait = settings.LOCUST_TASK_MIN_WAIT
-    max_wait = settings.LOCUST_TASK_MAX_WAIT
+    tasks = [UserBehavior]
+    wait_time = wait_between(settings.LOCUST_TASK_MIN_WAIT, settings.LOCUST_TASK_MAX_WAIT)
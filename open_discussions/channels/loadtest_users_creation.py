@@ -2,34 +2,28 @@
 locust file for open discussions
 This tests the user addition to open_discussions
 
-This needs to be run with maximum 10 locust users
-we are simulating the micromasters dynos batch creating users on OD, not real uses using the system
+We are simulating the micromasters celery workers batch creating users on OD, not real users using the system.
+The rate, batch size and concurrency are set with the OPEN_DISCUSSIONS_PROVISIONING_* settings, see provisioning.py,
+and the number of locust users is the number of batches worked on at once.
 """
-import random
-
-from faker import Faker
-from locust import HttpLocust, TaskSet, task
+from locust import TaskSet, constant, task
+from common.user import BaseUser
 from open_discussions_api.client import OpenDiscussionsApi
 from open_discussions_api.users.client import UsersApi
 
-import .settings
-from .utils import patch_get_session, patched_user_update
-
-fake = Faker()
+from open_discussions.channels import settings, utils
+from open_discussions.channels.content import get_content
+from open_discussions.channels.provisioning import CREATE, PROVISIONER, UPDATE
+from open_discussions.channels.registry import REGISTRY
 
 
 class UserCreation(TaskSet):
 
-    tasks = {}
-    discussion_usernames_number = 100
-
     def on_start(self):
         """on_start is called before any task is scheduled """
-        self.discussion_usernames = []
-
         # monkey patch the library client
-        OpenDiscussionsApi._get_session = patch_get_session(self.client)
-        UsersApi.update = patched_user_update
+        OpenDiscussionsApi._get_session = utils.patch_get_session(self.client)
+        UsersApi.update = utils.patched_user_update
 
         self.api = OpenDiscussionsApi(
             settings.OPEN_DISCUSSIONS_JWT_SECRET,
@@ -38,34 +32,46 @@ class UserCreation(TaskSet):
             roles=['staff']
         )
 
+    def create_user(self):
+        """creates an user in the system"""
+        res = self.api.users.create(name=get_content().name(), image=None, image_small=None, image_medium=None)
+        if res.status_code != 201:
+            return None
+        username = res.json()['username']
+        REGISTRY.add('usernames', username)
+        return username
+
+    def update_user(self, username):
+        """updates an user in the system"""
+        res = self.api.users.update(
+            username=username,
+            name=get_content().name(),
+            image=None,
+            image_small=None,
+            image_medium=None
+        )
+        if res.status_code != 200:
+            return None
+        return username
+
     @task
     def create_users(self):
-        """creates the users in the system"""
-        # limit the number of users
-        if len(self.discussion_usernames) >= self.discussion_usernames_number:
-            return
-        res = self.api.users.create(name=fake.name(), image=None, image_small=None, image_medium=None)
-        if res.status_code == 201:
-            self.discussion_usernames.append(res.json()['username'])
+        """creates a batch of users in the system"""
+        PROVISIONER.run_batch(CREATE, self.create_user, [()] * settings.PROVISIONING_BATCH_SIZE)
 
     @task
     def update_users(self):
-        """updates the users in the system"""
-        # try to get the user
-        if not len(self.discussion_usernames):
+        """updates a batch of users in the system"""
+        usernames = [REGISTRY.sample('usernames') for _ in range(settings.PROVISIONING_BATCH_SIZE)]
+        if None in usernames:
+            # no users to update yet
+            self.create_users()
             return
-        self.api.users.update(
-            username=random.choice(self.discussion_usernames),
-            name=fake.name(),
-            image=None,
-            image_small=None,
-            image_medium=None
-        )
+        PROVISIONER.run_batch(UPDATE, self.update_user, [(username,) for username in usernames])
 
 
-class WebsiteUser(HttpLocust):
+class WebsiteUser(BaseUser):
     host = settings.OPEN_DISCUSSIONS_BASE_URL
-    task_set = UserCreation
-    # this is simulating requests from celery tasks, so very low wait between the different requests
-    min_wait = 1
-    max_wait = 100
+    tasks = [UserCreation]
+    # the provisioner paces the calls, so like a celery worker a user takes its next batch straight away
+    wait_time = constant(0)
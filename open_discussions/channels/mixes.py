@@ -0,0 +1,31 @@
+"""
+Task weights shared by loadtest_od_users.py and loadtest_reddit.py, so both test the same mix
+"""
+
+# tasks of a user interacting with a channel
+CHANNEL_MIX = {
+    'stop': 1,
+    'add_moderator': 1,
+    'add_contributor': 10,
+    'remove_contributor': 6,
+    'load_frontpage': 20,
+    'load_channels': 20,
+    'load_channel_posts': 20,
+    'load_post_comments': 20,
+    'create_post': 6,
+    'create_comment': 10,
+    'upvote_post': 20,
+    'clear_vote_post': 5,
+    'upvote_comment': 20,
+    'downvote_comment': 20,
+    'clear_vote_comment': 5,
+}
+
+# tasks of a user, including entering a channel
+USER_MIX = {
+    'UsersChannel': 10,
+    'create_additional_channel': 1,
+    'create_additional_user': 1,
+    'update_user': 5,
+    'index': 10,
+}
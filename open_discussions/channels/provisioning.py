@@ -0,0 +1,193 @@
+"""
+Rate-controlled user provisioning, the way MicroMasters' celery workers create and update open-discussions users
+
+MicroMasters doesn't create discussion users as people sign up, it syncs them from celery tasks in batches.
+Here each locust user stands for a celery worker taking a batch of OPEN_DISCUSSIONS_PROVISIONING_BATCH_SIZE
+users to create or update, and sending the calls concurrently. Calls from every worker are paced by a token
+bucket to OPEN_DISCUSSIONS_PROVISIONING_RATE per second in total, in bursts of up to
+OPEN_DISCUSSIONS_PROVISIONING_BURST, and each process has at most OPEN_DISCUSSIONS_PROVISIONING_CONCURRENCY
+calls in flight. The number of locust users only decides how many batches are worked on at once.
+
+Calls which had to wait for the bucket report the wait as a PROVISIONING request named "rate limit wait".
+When the test stops the achieved rate is logged next to the target. Raise the rate until the achieved rate stops
+following it: if many calls had to wait for a free slot, raise the concurrency too, otherwise that's as
+fast as open-discussions can provision users.
+"""
+import logging
+import math
+import time
+from collections import Counter
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from common.reporting import Collector, pseudo_request_type, send_shares
+from open_discussions.channels import settings
+from open_discussions.util.ratelimit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+SHARE_MESSAGE = "provisioning_share"
+COUNTS_KEY = "provisioning_counts"
+WAIT_REQUEST_TYPE = pseudo_request_type("PROVISIONING")
+WAIT_NAME = "rate limit wait"
+
+CREATE = "create"
+UPDATE = "update"
+
+
+class Provisioner:
+    """
+    Paces and bounds this process's provisioning calls
+
+    Args:
+        rate (float): calls per second across all processes, 0 for no limit
+        burst (int): the most calls that can be sent at once after a quiet spell, across all processes
+        concurrency (int): the maximum number of calls in flight in this process
+    """
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = BoundedSemaphore(concurrency)
+        self.counts = Counter()
+
+    def set_share(self, worker_count):
+        """Take one worker's share of the rate and burst"""
+        worker_count = max(worker_count, 1)
+        self.bucket.rate = self.rate / worker_count
+        self.bucket.burst = max(math.ceil(self.burst / worker_count), 1)
+        self.bucket.tokens = min(self.bucket.tokens, self.bucket.burst)
+
+    def call(self, kind, func, *args):
+        """
+        Make a provisioning call once the rate and concurrency allow it
+
+        Args:
+            kind (str): CREATE or UPDATE
+            func (callable): makes the call, returning None if it failed
+            args: the arguments to func
+
+        Returns:
+            the result of func
+        """
+        waited = self.bucket.acquire()
+        if waited > 0:
+            events.request.fire(
+                request_type=WAIT_REQUEST_TYPE,
+                name=WAIT_NAME,
+                response_time=waited * 1000,
+                response_length=0,
+                exception=None,
+                context={},
+            )
+        if self.slots.locked():
+            self.counts["slot_waits"] += 1
+        with self.slots:
+            result = func(*args)
+        self.counts[kind if result is not None else "failed"] += 1
+        return result
+
+    def run_batch(self, kind, func, jobs):
+        """
+        Make a call for each job concurrently, as allowed by the rate and concurrency
+
+        Args:
+            kind (str): CREATE or UPDATE
+            func (callable): makes the call, returning None if it failed
+            jobs (list of tuple): the arguments of each call
+
+        Returns:
+            list: the results of the calls which succeeded
+        """
+        greenlets = [gevent.spawn(self.call, kind, func, *job) for job in jobs]
+        gevent.joinall(greenlets)
+        return [greenlet.value for greenlet in greenlets if greenlet.successful() and greenlet.value is not None]
+
+    def report(self):
+        """
+        Take the counts since the last report
+
+        Returns:
+            dict: the counts, or None if there were no calls
+        """
+        if not self.counts:
+            return None
+        counts = dict(self.counts)
+        self.counts.clear()
+        return counts
+
+
+PROVISIONER = Provisioner(
+    settings.PROVISIONING_RATE,
+    settings.PROVISIONING_BURST,
+    settings.PROVISIONING_CONCURRENCY,
+)
+
+
+class ThroughputReport:
+    """The calls made by every process during a test, compared to the target rate"""
+    def __init__(self):
+        self.counts = Counter()
+        self.start = time.monotonic()
+        self.stop = None
+
+    def merge(self, counts):
+        """Add a process's counts"""
+        self.counts.update(counts)
+
+    def log(self):
+        """Log the achieved rate, over the time until it was first logged"""
+        self.stop = self.stop or time.monotonic()
+        elapsed = self.stop - self.start
+        calls = self.counts[CREATE] + self.counts[UPDATE] + self.counts["failed"]
+        log.info(
+            "Provisioning achieved %.1f calls/s against a target of %s over %.0fs: "
+            "%d users created, %d updated, %d calls failed, %d calls waited for one of the %d slots per worker",
+            calls / elapsed if elapsed > 0 else 0,
+            "{:g}/s".format(settings.PROVISIONING_RATE) if settings.PROVISIONING_RATE > 0 else "no limit",
+            elapsed,
+            self.counts[CREATE], self.counts[UPDATE], self.counts["failed"], self.counts["slot_waits"],
+            settings.PROVISIONING_CONCURRENCY,
+        )
+
+
+REPORT = ThroughputReport()
+
+
+def _reset():
+    """Count each test separately"""
+    global REPORT  # pylint: disable=global-statement
+    PROVISIONER.report()
+    REPORT = ThroughputReport()
+
+
+COLLECTOR = Collector(
+    COUNTS_KEY,
+    report=PROVISIONER.report,
+    merge=lambda counts: REPORT.merge(counts),  # pylint: disable=unnecessary-lambda
+    log=lambda: REPORT.log(),  # pylint: disable=unnecessary-lambda
+    reset=_reset,
+)
+
+
+def _on_share(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, take the share of the rate the master gave us"""
+    PROVISIONER.set_share(msg.data["worker_count"])
+
+
+@events.init.add_listener
+def _attach(environment, **kwargs):
+    """Listen for the master's share of the rate"""
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(SHARE_MESSAGE, _on_share)
+
+
+@events.test_start.add_listener
+def _share(environment, **kwargs):
+    """On the master, tell the workers their share of the rate"""
+    if isinstance(environment.runner, MasterRunner):
+        send_shares(environment.runner, SHARE_MESSAGE)
@@ -0,0 +1,199 @@
+"""
+A registry of the users, channels, posts and comments created during a test
+
+In distributed mode workers publish what they create to the master, which keeps its own sample
+and relays the changes to every worker, so each worker reads from the whole dataset rather than
+just the entities its own users created. Each key holds a bounded reservoir sample.
+"""
+import random
+
+import gevent
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from open_discussions.channels import settings
+from open_discussions.util.sampling import IndexedSet
+
+PUBLISH_MESSAGE = "registry_publish"
+UPDATE_MESSAGE = "registry_update"
+SYNC_MESSAGE = "registry_sync"
+SNAPSHOT_MESSAGE = "registry_snapshot"
+
+ADD = "add"
+DISCARD = "discard"
+
+
+class Reservoir:
+    """
+    A uniform sample of at most max_size of the values added to it
+
+    Args:
+        max_size (int): the maximum number of values kept
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.seen = 0
+        self.values = IndexedSet()
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.values
+
+    def add(self, value):
+        """Offer a value to the sample"""
+        if value in self.values:
+            return
+        self.seen += 1
+        if len(self.values) < self.max_size:
+            self.values.add(value)
+            return
+        position = random.randrange(self.seen)
+        if position < self.max_size:
+            self.values.replace(position, value)
+
+    def discard(self, value):
+        """Remove a value from the sample if it's there"""
+        self.values.discard(value)
+
+    def sample(self):
+        """Pick a random value, or None if the sample is empty"""
+        return self.values.choice()
+
+
+class EntityRegistry:
+    """
+    Reservoirs of entities keyed by kind and optional scope, shared across workers
+
+    Args:
+        max_size (int): the maximum number of values kept per key
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.reservoirs = {}
+        self.pending = []
+        self.runner = None
+
+    @staticmethod
+    def key(kind, scope=None):
+        """The key of a kind of entity, e.g. the posts of a channel"""
+        return kind if scope is None else "{}:{}".format(kind, scope)
+
+    def _reservoir(self, key):
+        reservoir = self.reservoirs.get(key)
+        if reservoir is None:
+            reservoir = self.reservoirs[key] = Reservoir(self.max_size)
+        return reservoir
+
+    def _apply(self, ops):
+        """Apply published changes"""
+        for op, key, value in ops:
+            if op == ADD:
+                self._reservoir(key).add(value)
+            elif key in self.reservoirs:
+                self.reservoirs[key].discard(value)
+
+    def _publish(self, op, key, value):
+        self._apply([(op, key, value)])
+        if isinstance(self.runner, WorkerRunner):
+            self.pending.append((op, key, value))
+        elif isinstance(self.runner, MasterRunner):
+            self.runner.send_message(UPDATE_MESSAGE, {"origin": None, "ops": [(op, key, value)]})
+
+    def add(self, kind, value, scope=None):
+        """
+        Register an entity
+
+        Args:
+            kind (str): the kind of entity, e.g. posts
+            value (str): the entity id
+            scope (str): what the entity belongs to, e.g. the channel of a post
+        """
+        self._publish(ADD, self.key(kind, scope), value)
+
+    def discard(self, kind, value, scope=None):
+        """Unregister an entity, e.g. a contributor who was removed"""
+        self._publish(DISCARD, self.key(kind, scope), value)
+
+    def sample(self, kind, scope=None):
+        """
+        Pick a random registered entity
+
+        Returns:
+            str: the entity id, or None if there aren't any
+        """
+        reservoir = self.reservoirs.get(self.key(kind, scope))
+        return reservoir.sample() if reservoir is not None else None
+
+    def count(self, kind, scope=None):
+        """The number of entities of a kind in the sample"""
+        reservoir = self.reservoirs.get(self.key(kind, scope))
+        return len(reservoir) if reservoir is not None else 0
+
+    def flush(self):
+        """Send pending changes to the master"""
+        if self.pending and isinstance(self.runner, WorkerRunner):
+            ops, self.pending = self.pending, []
+            self.runner.send_message(PUBLISH_MESSAGE, {"origin": self.runner.client_id, "ops": ops})
+
+    def _flush_forever(self, interval):
+        while True:
+            gevent.sleep(interval)
+            self.flush()
+
+    def _on_publish(self, environment, msg, **kwargs):  # pylint: disable=unused-argument
+        """On the master, keep the changes and relay them to the workers"""
+        self._apply(msg.data["ops"])
+        self.runner.send_message(UPDATE_MESSAGE, msg.data)
+
+    def _on_update(self, environment, msg, **kwargs):  # pylint: disable=unused-argument
+        """On a worker, apply changes published by the master or other workers"""
+        if msg.data["origin"] != self.runner.client_id:
+            self._apply(msg.data["ops"])
+
+    def _on_sync(self, environment, msg, **kwargs):  # pylint: disable=unused-argument
+        """On the master, send a joining worker everything seen so far"""
+        ops = [
+            (ADD, key, value)
+            for key, reservoir in self.reservoirs.items()
+            for value in reservoir.values
+        ]
+        self.runner.send_message(SNAPSHOT_MESSAGE, {"origin": None, "ops": ops}, client_id=msg.node_id)
+
+    def attach(self, runner, flush_interval):
+        """
+        Share entities through a runner, this does nothing for a local runner
+
+        Args:
+            runner (locust.runners.Runner): the runner of this process
+            flush_interval (float): seconds between publishing batches of changes from a worker
+        """
+        self.runner = runner
+        if isinstance(runner, MasterRunner):
+            runner.register_message(PUBLISH_MESSAGE, self._on_publish)
+            runner.register_message(SYNC_MESSAGE, self._on_sync)
+        elif isinstance(runner, WorkerRunner):
+            runner.register_message(UPDATE_MESSAGE, self._on_update)
+            runner.register_message(SNAPSHOT_MESSAGE, self._on_update)
+            gevent.spawn(self._flush_forever, flush_interval)
+
+    def sync(self):
+        """Ask the master for the entities published before this worker joined"""
+        if isinstance(self.runner, WorkerRunner):
+            self.runner.send_message(SYNC_MESSAGE)
+
+
+REGISTRY = EntityRegistry(settings.OPEN_DISCUSSIONS_REGISTRY_SIZE)
+
+
+@events.init.add_listener
+def _attach_registry(environment, **kwargs):
+    """Share the registry between the master and workers"""
+    REGISTRY.attach(environment.runner, settings.OPEN_DISCUSSIONS_REGISTRY_FLUSH_SECONDS)
+
+
+@events.test_start.add_listener
+def _sync_registry(**kwargs):
+    """Catch up with what other workers have published"""
+    REGISTRY.sync()
@@ -0,0 +1,329 @@
+"""
+Seed open-discussions with the users, channels, posts and comments a read-only test reads
+
+Seeding happens once per test rather than once per locust user, on the master when running distributed,
+which sends the dataset to the workers. Writes are issued concurrently from a bounded gevent pool and paced
+by a rate limiter, with a client of their own so they aren't reported in locust's stats.
+
+The dataset is saved to OPEN_DISCUSSIONS_SAVE_DATASET_FILE if it's set, and can be reused by later runs
+against the same environment, which then skip seeding entirely and read exactly the same data. Only the
+process which seeds reads and writes the file, so when running distributed it has to be on the master, and
+the workers don't need it.
+"""
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, namedtuple
+
+import gevent
+from gevent.event import AsyncResult
+from gevent.pool import Pool
+from locust import events
+from locust.clients import HttpSession
+from locust.event import EventHook
+from locust.runners import MasterRunner, WorkerRunner
+from open_discussions_api.client import OpenDiscussionsApi
+
+from open_discussions.channels import sessions, settings
+from open_discussions.channels.content import get_content
+from open_discussions.util.ratelimit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+DATASET_MESSAGE = "seeding_dataset"
+SYNC_MESSAGE = "seeding_sync"
+
+Dataset = namedtuple("Dataset", [
+    "usernames",
+    "channels",
+    "posts",
+    "comments",
+])
+
+
+class Seeder:
+    """
+    Creates a dataset
+
+    Args:
+        api (open_discussions_api.client.OpenDiscussionsApi): a staff api client
+        client (locust.clients.HttpSession): the client to make user requests with
+        concurrency (int): the maximum number of writes in flight
+        rate (float): the maximum number of writes per second, 0 for no limit
+        settle_seconds (float): time to let reddit digest each phase before the next one
+    """
+    def __init__(self, api, client, concurrency, rate, settle_seconds):
+        self.api = api
+        self.client = client
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(rate, burst=concurrency)
+        self.settle_seconds = settle_seconds
+
+    def _run_concurrently(self, func, jobs):
+        """
+        Run func for each job from a bounded pool
+
+        Returns:
+            list: the results which weren't None
+        """
+        def run_job(job):
+            self.rate_limiter.acquire()
+            return func(*job)
+
+        pool = Pool(self.concurrency)
+        return [result for result in pool.imap_unordered(run_job, jobs) if result is not None]
+
+    def _settle(self):
+        """Let reddit digest the last phase"""
+        if self.settle_seconds:
+            time.sleep(self.settle_seconds)
+
+    def create_user(self):
+        """Create a user"""
+        res = self.api.users.create(name=get_content().name(), image=None, image_small=None, image_medium=None)
+        if res.status_code != 201:
+            return None
+        return res.json()['username']
+
+    def create_channel(self):
+        """Create a channel"""
+        name = get_content().channel_name()
+        res = self.api.channels.create(
+            title=get_content().title(),
+            name=name,
+            public_description=get_content().post_text(),
+            channel_type='private',
+        )
+        if res.status_code != 201:
+            return None
+        return name
+
+    def add_contributor(self, channel, username):
+        """Add a user as a contributor and subscriber of a channel"""
+        self.api.channels.add_contributor(channel, username)
+        self.api.channels.add_subscriber(channel, username)
+
+    def create_post(self, channel, username):
+        """Create a post in a channel"""
+        res = sessions.SESSION_POOL.get_session(self.client, username).post(
+            '/api/v0/channels/{}/posts/'.format(channel),
+            json={
+                'title': get_content().title(),
+                'text': get_content().post_text(),
+                'upvoted': False,
+            },
+            name='/api/v0/channels/[channel_name]/posts/'
+        )
+        if res.status_code != 201:
+            return None
+        return res.json()['id']
+
+    def create_comment(self, post_id, username):
+        """Create a comment on a post"""
+        res = sessions.SESSION_POOL.get_session(self.client, username).post(
+            '/api/v0/posts/{}/comments/'.format(post_id),
+            json={"text": get_content().comment_text()},
+            name='/api/v0/posts/[post_id]/comments/'
+        )
+        if res.status_code != 201:
+            return None
+        return res.json()['id']
+
+    def run(self):
+        """
+        Create the dataset
+
+        Returns:
+            Dataset: the created entities
+        """
+        usernames = self._run_concurrently(self.create_user, [()] * settings.USERS_TO_CREATE)
+        channels = self._run_concurrently(self.create_channel, [()] * settings.CHANNELS_TO_CREATE)
+        self._settle()
+
+        self._run_concurrently(self.add_contributor, [
+            (channel, username) for channel in channels for username in usernames
+        ])
+        self._settle()
+
+        posts = []
+        comments = []
+        if usernames:
+            posts = self._run_concurrently(self.create_post, [
+                (channel, random.choice(usernames))
+                for channel in channels for _ in range(settings.POSTS_PER_CHANNEL)
+            ])
+            self._settle()
+
+            comments = self._run_concurrently(self.create_comment, [
+                (post_id, random.choice(usernames))
+                for post_id in posts for _ in range(settings.COMMENTS_PER_POST)
+            ])
+            self._settle()
+
+        return Dataset(usernames, channels, posts, comments)
+
+
+def save_dataset(dataset, path):
+    """
+    Write a dataset to a file, one JSON line per entity after a header line
+
+    Args:
+        dataset (Dataset): the dataset to save
+        path (str): the file to write to
+    """
+    with open(path, "w") as dataset_file:
+        dataset_file.write(json.dumps({
+            "base_url": settings.OPEN_DISCUSSIONS_BASE_URL,
+            "created": time.time(),
+        }))
+        dataset_file.write("\n")
+        for kind, values in dataset._asdict().items():
+            for value in values:
+                dataset_file.write(json.dumps([kind, value]))
+                dataset_file.write("\n")
+
+
+def load_dataset(path):
+    """
+    Read a dataset written by save_dataset
+
+    Args:
+        path (str): the file to read
+
+    Returns:
+        Dataset: the saved entities
+    """
+    entities = {kind: [] for kind in Dataset._fields}
+    with open(path) as dataset_file:
+        header = json.loads(next(dataset_file))
+        for line in dataset_file:
+            kind, value = json.loads(line)
+            entities[kind].append(value)
+    if header["base_url"] != settings.OPEN_DISCUSSIONS_BASE_URL:
+        log.warning(
+            "Dataset %s was seeded against %s, not %s", path, header["base_url"], settings.OPEN_DISCUSSIONS_BASE_URL
+        )
+    return Dataset(**entities)
+
+
+def seed():
+    """
+    Create a dataset with a client of its own, so the writes aren't reported in locust's stats
+
+    Returns:
+        Dataset: the created entities
+    """
+    requests = Counter()
+
+    def count(exception=None, **kwargs):  # pylint: disable=unused-argument
+        requests["sent"] += 1
+        if exception is not None:
+            requests["failed"] += 1
+
+    request_event = EventHook()
+    request_event.add_listener(count)
+    client = HttpSession(settings.OPEN_DISCUSSIONS_BASE_URL, request_event, None)
+    api = OpenDiscussionsApi(
+        settings.OPEN_DISCUSSIONS_JWT_SECRET,
+        settings.OPEN_DISCUSSIONS_BASE_URL,
+        settings.OPEN_DISCUSSIONS_API_USERNAME,
+        roles=['staff']
+    )
+    api._get_session = lambda: client  # pylint: disable=protected-access
+
+    start = time.monotonic()
+    dataset = Seeder(
+        api,
+        client,
+        settings.SEED_CONCURRENCY,
+        settings.SEED_RATE,
+        settings.SEED_SETTLE_SECONDS,
+    ).run()
+    log.info(
+        "Seeded %d users, %d channels, %d posts and %d comments in %.1fs, with %d requests of which %d failed",
+        len(dataset.usernames), len(dataset.channels), len(dataset.posts), len(dataset.comments),
+        time.monotonic() - start, requests["sent"], requests["failed"],
+    )
+    return dataset
+
+
+def _load_or_seed():
+    """
+    Load the saved dataset if OPEN_DISCUSSIONS_REUSE_DATASET is set and there is one, or seed a new one
+
+    Returns:
+        Dataset: the dataset for this test
+    """
+    if settings.REUSE_DATASET and os.path.exists(settings.DATASET_FILE):
+        dataset = load_dataset(settings.DATASET_FILE)
+        log.info("Loaded dataset from %s", settings.DATASET_FILE)
+        return dataset
+    dataset = seed()
+    if settings.SAVE_DATASET_FILE:
+        save_dataset(dataset, settings.SAVE_DATASET_FILE)
+        log.info("Saved dataset to %s", settings.SAVE_DATASET_FILE)
+    time.sleep(settings.WAIT_BEFORE_LOAD_TEST_SECONDS)
+    return dataset
+
+
+# the dataset of the current test, set once it's been seeded here or sent by the master
+_dataset = AsyncResult()
+# the runner of this process
+_runner = None
+
+
+def _share(result):
+    """Seed, then hand the dataset to this process's users and send it to the workers"""
+    try:
+        dataset = _load_or_seed()
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Seeding failed, the users will have nothing to read")
+        dataset = Dataset([], [], [], [])
+    result.set(dataset)
+    if isinstance(_runner, MasterRunner) and result is _dataset:
+        _runner.send_message(DATASET_MESSAGE, dataset._asdict())
+
+
+def get_dataset():
+    """
+    Wait for the dataset of this test
+
+    Returns:
+        Dataset: the dataset shared by every user
+    """
+    return _dataset.get()
+
+
+def _on_dataset(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, take the dataset the master seeded"""
+    _dataset.set(Dataset(**msg.data))
+
+
+def _on_sync(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On the master, send the dataset to a worker which started after it was seeded"""
+    if _dataset.ready():
+        _runner.send_message(DATASET_MESSAGE, _dataset.get()._asdict(), client_id=msg.node_id)
+
+
+@events.init.add_listener
+def _attach(environment, **kwargs):
+    """Listen for the master's dataset, or for workers asking for it"""
+    global _runner  # pylint: disable=global-statement
+    _runner = environment.runner
+    if isinstance(_runner, MasterRunner):
+        _runner.register_message(SYNC_MESSAGE, _on_sync)
+    elif isinstance(_runner, WorkerRunner):
+        _runner.register_message(DATASET_MESSAGE, _on_dataset)
+
+
+@events.test_start.add_listener
+def _start(environment, **kwargs):  # pylint: disable=unused-argument
+    """Seed a new dataset for each test on the master, or ask the master for it on a worker"""
+    global _dataset  # pylint: disable=global-statement
+    _dataset = AsyncResult()
+    if isinstance(_runner, WorkerRunner):
+        _runner.send_message(SYNC_MESSAGE)
+    else:
+        gevent.spawn(_share, _dataset)
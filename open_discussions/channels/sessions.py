@@ -0,0 +1,106 @@
+"""
+Pooled authenticated sessions for open-discussions users
+"""
+from open_discussions_api.utils import EXPIRATION_DELTA_SECONDS, get_token
+
+from open_discussions.channels import settings
+from open_discussions.util.cache import ExpiringLRUCache
+
+
+class AuthenticatedSession:
+    """
+    A view over a locust client which sends a user's JWT with every request
+
+    The underlying client is shared, so requests reuse its kept-alive connections
+    and are reported to locust as usual.
+
+    Args:
+        client (locust.clients.HttpSession): the locust client
+        authorization (str): the Authorization header value for the user
+    """
+    def __init__(self, client, authorization):
+        self.client = client
+        self.headers = {'Authorization': authorization}
+
+    def request(self, method, url, headers=None, **kwargs):
+        """Make a request as the user"""
+        if headers:
+            headers = dict(self.headers, **headers)
+        else:
+            headers = self.headers
+        return self.client.request(method, url, headers=headers, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Make a GET request as the user"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Make a POST request as the user"""
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        """Make a PATCH request as the user"""
+        return self.request('PATCH', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        """Make a PUT request as the user"""
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Make a DELETE request as the user"""
+        return self.request('DELETE', url, **kwargs)
+
+
+class SessionPool:
+    """
+    Authenticated sessions keyed by username
+
+    A JWT is signed once per user and re-signed shortly before it expires,
+    instead of on every task.
+
+    Args:
+        secret (str): the JWT secret
+        max_size (int): the maximum number of users to keep tokens for
+        refresh_margin (int): seconds before a token expires that it gets re-signed
+    """
+    def __init__(self, secret, max_size, refresh_margin):
+        if refresh_margin >= EXPIRATION_DELTA_SECONDS:
+            raise ValueError('refresh_margin must be shorter than the token lifetime')
+        self.secret = secret
+        self._authorizations = ExpiringLRUCache(max_size, EXPIRATION_DELTA_SECONDS - refresh_margin)
+
+    def get_authorization(self, username):
+        """
+        Get the Authorization header value for a user, signing a new token if needed
+
+        Args:
+            username (str): the open-discussions username
+
+        Returns:
+            str: the Authorization header value
+        """
+        authorization = self._authorizations.get(username)
+        if authorization is None:
+            authorization = 'Bearer {}'.format(get_token(self.secret, username, []))
+            self._authorizations.set(username, authorization)
+        return authorization
+
+    def get_session(self, client, username):
+        """
+        Get a session which makes requests as the user
+
+        Args:
+            client (locust.clients.HttpSession): the locust client
+            username (str): the open-discussions username
+
+        Returns:
+            AuthenticatedSession: the authenticated session
+        """
+        return AuthenticatedSession(client, self.get_authorization(username))
+
+
+SESSION_POOL = SessionPool(
+    settings.OPEN_DISCUSSIONS_JWT_SECRET,
+    settings.OPEN_DISCUSSIONS_SESSION_POOL_SIZE,
+    settings.OPEN_DISCUSSIONS_JWT_REFRESH_MARGIN_SECONDS,
+)
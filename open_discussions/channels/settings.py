@@ -1,16 +1,7 @@
 """
 Settings for the open_discussions locust tests
 """
-import os
-
-
-def get_var(name, default=None):
-    """Return the settings in a the environment"""
-    value = os.environ.get(name, default)
-    if value is None:
-        raise Exception("Missing value for {}".format(name))
-    return value
-
+from common.settings import get_var
 
 # locust settings
 LOCUST_TASK_MIN_WAIT = int(get_var('LOCUST_TASK_MIN_WAIT', 500))
@@ -19,14 +10,44 @@ LOCUST_TASK_MAX_WAIT = int(get_var('LOCUST_TASK_MAX_WAIT', 1500))
 OPEN_DISCUSSIONS_JWT_SECRET = get_var('OPEN_DISCUSSIONS_JWT_SECRET', 'terribly_unsafe_default_jwt_secret_key')
 OPEN_DISCUSSIONS_BASE_URL = get_var('OPEN_DISCUSSIONS_BASE_URL', 'http://mit-open.mit.local:8063')
 OPEN_DISCUSSIONS_API_USERNAME = get_var('OPEN_DISCUSSIONS_API_USERNAME', 'mitodl')
+# per-process pool of signed JWTs, keyed by username
+OPEN_DISCUSSIONS_SESSION_POOL_SIZE = int(get_var('OPEN_DISCUSSIONS_SESSION_POOL_SIZE', 1000))
+OPEN_DISCUSSIONS_JWT_REFRESH_MARGIN_SECONDS = int(get_var('OPEN_DISCUSSIONS_JWT_REFRESH_MARGIN_SECONDS', 60))
+# entities created during a test are sampled into reservoirs of this size and shared between workers
+OPEN_DISCUSSIONS_REGISTRY_SIZE = int(get_var('OPEN_DISCUSSIONS_REGISTRY_SIZE', 10000))
+OPEN_DISCUSSIONS_REGISTRY_FLUSH_SECONDS = float(get_var('OPEN_DISCUSSIONS_REGISTRY_FLUSH_SECONDS', 1))
 
-POST_WAIT_SECONDS = int(get_var('OPEN_DISCUSSIONS_POST_WAIT_SECONDS', 0.5))
 WAIT_BEFORE_LOAD_TEST_SECONDS = int(get_var('OPEN_DISCUSSIONS_WAIT_BEFORE_LOAD_TEST_SECONDS', 10))
+# the read-only test seeds its data once per test, with this many writes in flight at this many per second
+SEED_CONCURRENCY = int(get_var('OPEN_DISCUSSIONS_SEED_CONCURRENCY', 10))
+SEED_RATE = float(get_var('OPEN_DISCUSSIONS_SEED_RATE', 20))
+# time to let reddit digest each seeding phase before the next one
+SEED_SETTLE_SECONDS = float(get_var('OPEN_DISCUSSIONS_SEED_SETTLE_SECONDS', 5))
+# set SAVE_DATASET_FILE to save the seeded dataset, and REUSE_DATASET to load DATASET_FILE instead of seeding again
+SAVE_DATASET_FILE = get_var('OPEN_DISCUSSIONS_SAVE_DATASET_FILE', '')
+DATASET_FILE = get_var('OPEN_DISCUSSIONS_DATASET_FILE', 'read_only_dataset.jsonl')
+REUSE_DATASET = get_var('OPEN_DISCUSSIONS_REUSE_DATASET', 'false').lower() == 'true'
 USERS_TO_CREATE = int(get_var('OPEN_DISCUSSIONS_USERS_TO_CREATE', 15))
 CHANNELS_TO_CREATE = int(get_var('OPEN_DISCUSSIONS_CHANNELS_TO_CREATE', 4))
 POSTS_PER_CHANNEL = int(get_var('OPEN_DISCUSSIONS_POSTS_PER_CHANNEL', 10))
 COMMENTS_PER_POST = int(get_var('OPEN_DISCUSSIONS_POSTS_PER_CHANNEL', 20))
 
+# the users creation test creates and updates users in batches like MicroMasters' celery workers, at this many
+# calls per second across all workers with at most this many in flight per worker, see provisioning.py
+PROVISIONING_RATE = float(get_var('OPEN_DISCUSSIONS_PROVISIONING_RATE', 10))
+PROVISIONING_BURST = int(get_var('OPEN_DISCUSSIONS_PROVISIONING_BURST', 10))
+PROVISIONING_CONCURRENCY = int(get_var('OPEN_DISCUSSIONS_PROVISIONING_CONCURRENCY', 10))
+PROVISIONING_BATCH_SIZE = int(get_var('OPEN_DISCUSSIONS_PROVISIONING_BATCH_SIZE', 20))
+
+# titles, text and names are generated up front, this many of each, or loaded from CONTENT_FILE, see content.py
+CONTENT_POOL_SIZE = int(get_var('OPEN_DISCUSSIONS_CONTENT_POOL_SIZE', 2000))
+CONTENT_FILE = get_var('OPEN_DISCUSSIONS_CONTENT_FILE', '')
+CONTENT_SEED = get_var('OPEN_DISCUSSIONS_CONTENT_SEED', '')
+# distributions of words per title, post and comment
+CONTENT_TITLE_WORDS = get_var('OPEN_DISCUSSIONS_CONTENT_TITLE_WORDS', 'uniform:2:8')
+CONTENT_POST_WORDS = get_var('OPEN_DISCUSSIONS_CONTENT_POST_WORDS', 'lognormal:60:0.9')
+CONTENT_COMMENT_WORDS = get_var('OPEN_DISCUSSIONS_CONTENT_COMMENT_WORDS', 'lognormal:25:0.9')
+
 OPEN_DISCUSSIONS_REDDIT_CLIENT_ID = get_var('OPEN_DISCUSSIONS_REDDIT_CLIENT_ID')
 OPEN_DISCUSSIONS_REDDIT_SECRET = get_var('OPEN_DISCUSSIONS_REDDIT_SECRET')
 OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN = get_var('OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN')
@@ -34,6 +55,21 @@ OPEN_DISCUSSIONS_REDDIT_URL = get_var('OPEN_DISCUSSIONS_REDDIT_URL')
 
 OPEN_DISCUSSIONS_CHANNEL_POST_LIMIT = int(get_var('OPEN_DISCUSSIONS_CHANNEL_POST_LIMIT', 25))
 
+# per-process cache of refresh tokens and praw clients, keyed by username
+OPEN_DISCUSSIONS_REDDIT_CLIENT_CACHE_SIZE = int(get_var('OPEN_DISCUSSIONS_REDDIT_CLIENT_CACHE_SIZE', 1000))
+# reddit access tokens are valid for an hour, refresh tokens until they are revoked
+OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN_TTL_SECONDS = int(
+    get_var('OPEN_DISCUSSIONS_REDDIT_ACCESS_TOKEN_TTL_SECONDS', 55 * 60)
+)
+OPEN_DISCUSSIONS_REDDIT_REFRESH_TOKEN_TTL_SECONDS = int(
+    get_var('OPEN_DISCUSSIONS_REDDIT_REFRESH_TOKEN_TTL_SECONDS', 24 * 60 * 60)
+)
+
+# sampled trace of the requests made through praw, dumped at test stop or on SIGUSR1
+OPEN_DISCUSSIONS_TRACE_SAMPLE_RATE = float(get_var('OPEN_DISCUSSIONS_TRACE_SAMPLE_RATE', 0))
+OPEN_DISCUSSIONS_TRACE_BUFFER_SIZE = int(get_var('OPEN_DISCUSSIONS_TRACE_BUFFER_SIZE', 10000))
+OPEN_DISCUSSIONS_TRACE_FILE = get_var('OPEN_DISCUSSIONS_TRACE_FILE', 'praw_trace.jsonl')
+
 
 # base settings to start a base django app
 SECRET_KEY = 'fake'
@@ -1,17 +1,28 @@
 """Tests for discussions learn search"""
 import random
-import requests 
 
-from locust import HttpUser, TaskSet, task, between
+from locust import TaskSet, events, task
+from locust.runners import MasterRunner
 
-from open_discussions.util.es import generate_learn_query, ResourceType, OfferedByType, QueryParams, PriceType
+from common.user import BaseUser, wait_between
+from open_discussions.learn.results import check_search_response
+from open_discussions.learn.words import get_word_source
+from open_discussions.util.es import generate_learn_query_body, ResourceType, OfferedByType, QueryParams, PriceType
 
 LIMIT = 6
 SEARCH_URL = "/api/v0/search/"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+WORDS = None
+
+
+@events.init.add_listener
+def _load_words(environment, **kwargs):
+    """Open the word list before any users start, it's only downloaded the first time"""
+    global WORDS  # pylint: disable=global-statement
+    if not isinstance(environment.runner, MasterRunner):
+        WORDS = get_word_source()
 
-word_list_url = 'https://raw.githubusercontent.com/dwyl/english-words/master/words_alpha.txt'
-r = requests.get(word_list_url)
-word_list = r.text.splitlines()
 
 class SearchPage(TaskSet):
     """
@@ -31,25 +42,28 @@ class SearchPage(TaskSet):
     def _execute_search(self):
         """Execute a search request"""
         offset = self.page * LIMIT
-        query = generate_learn_query(
+        body = generate_learn_query_body(
             self.params,
             offset=offset,
             limit=LIMIT
         )
-        # for now we ignore the response
-        results = self.client.post(
+        name = (
+            f"{SEARCH_URL}"
+            f"?q={self.params.text}"
+            f"&type={','.join([rt.value for rt in self.params.types])}"
+            f"&o={','.join([o.value for o in self.params.offered_by])}"
+            f"&p={self.page}"
+        )
+        with self.client.post(
             SEARCH_URL,
-            json=query,
-            name=(
-                f"{SEARCH_URL}"
-                f"?q={self.params.text}"
-                f"&type={','.join([rt.value for rt in self.params.types])}"
-                f"&o={','.join([o.value for o in self.params.offered_by])}"
-                f"&p={self.page}"
-            )
-        ).json()
-        # if we've run out of pages, queue a new search next
-        if len(results["hits"]["hits"]) < LIMIT:
+            data=body,
+            headers=JSON_HEADERS,
+            name=name,
+            catch_response=True,
+        ) as response:
+            summary = check_search_response(response, LIMIT)
+        # if we've run out of pages, or the search failed, queue a new search next
+        if summary is None or summary.hits < LIMIT:
             self.schedule_task(self.new_search, first=True)
 
     @task(1)
@@ -57,7 +71,7 @@ class SearchPage(TaskSet):
         """Start a new search"""
         self.page = 0
         search_term_count = random.choice(range(1,5))
-        search_term_choices = random.choices(word_list, k=search_term_count)
+        search_term_choices = WORDS.sample(search_term_count)
         self.params = QueryParams(
            ' '.join(search_term_choices),
             random.sample(
@@ -77,6 +91,6 @@ class SearchPage(TaskSet):
         self._execute_search()
 
 
-class AnonymousUser(HttpUser):
+class AnonymousUser(BaseUser):
     tasks = [SearchPage]
-    wait_time = between(1, 10)
+    wait_time = wait_between(1000, 10000)
@@ -0,0 +1,197 @@
+"""
+Search queries from an anonymized query log
+
+The log has one JSON object per line:
+
+    {"timestamp": 1589212800.5, "text": "machine learning", "types": ["course"], "offered_by": ["OCW"],
+     "price": ["free"], "pages": 3}
+
+Every key is optional. timestamp is in seconds, types defaults to every resource type,
+offered_by and price default to no filter, and pages, how many result pages the user looked at,
+defaults to 1.
+
+Queries are either replayed in order with their original spacing, or sampled so that the
+popularity of the distinct queries in the log follows a Zipf distribution.
+"""
+import itertools
+import json
+import logging
+import random
+import time
+from collections import Counter, namedtuple
+
+import gevent
+
+from open_discussions.learn import settings
+from open_discussions.util.es import OfferedByType, PriceType, QueryParams, ResourceType
+
+log = logging.getLogger(__name__)
+
+LoggedQuery = namedtuple("LoggedQuery", ["timestamp", "params", "pages"])
+
+REPLAY = "replay"
+ZIPF = "zipf"
+
+
+def parse_query(line):
+    """
+    Parse a line of a query log
+
+    Args:
+        line (str): a JSON object
+
+    Returns:
+        LoggedQuery: the query
+    """
+    entry = json.loads(line)
+    timestamp = entry.get("timestamp")
+    return LoggedQuery(
+        float(timestamp) if timestamp is not None else None,
+        QueryParams(
+            entry.get("text", ""),
+            tuple(ResourceType(value) for value in entry.get("types") or [rt.value for rt in ResourceType]),
+            tuple(OfferedByType(value) for value in entry.get("offered_by") or []),
+            tuple(PriceType(value) for value in entry.get("price") or []),
+        ),
+        max(int(entry.get("pages", 1)), 1),
+    )
+
+
+def read_queries(path):
+    """
+    Lazily read the queries in a log, skipping lines which can't be parsed
+
+    Args:
+        path (str): the query log
+
+    Yields:
+        LoggedQuery: each query in order
+    """
+    with open(path) as log_file:
+        for number, line in enumerate(log_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield parse_query(line)
+            except (ValueError, TypeError, AttributeError) as ex:
+                log.warning("Skipping line %d of %s: %s", number, path, ex)
+
+
+class ReplayQuerySource:
+    """
+    Queries in the order they were logged, each one held back until its original offset from the first
+
+    The log is streamed, only the next query is held in memory. When running distributed each worker replays
+    every worker_count'th query, see set_share, so the workers together replay the log once.
+
+    Args:
+        path (str): the query log
+        speed (float): how much faster than real time to replay, 0 to ignore the timestamps
+        loop (bool): start again from the beginning at the end of the log
+    """
+    def __init__(self, path, speed=1.0, loop=True):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.worker_index = 0
+        self.worker_count = 1
+        self._queries = None
+        self._log_start = None
+        self._replay_start = None
+
+    def set_share(self, worker_index, worker_count):
+        """Take every worker_count'th query, starting from the worker_index'th"""
+        self.worker_index = worker_index
+        self.worker_count = max(worker_count, 1)
+
+    def _read_share(self):
+        """Read this process's share of the log, noting when the log starts"""
+        for number, query in enumerate(read_queries(self.path)):
+            if self._log_start is None:
+                self._log_start = query.timestamp
+            if number % self.worker_count == self.worker_index:
+                yield query
+
+    def start(self):
+        """Replay from the beginning of the log, starting now"""
+        self._queries = self._read_share()
+        self._log_start = None
+        self._replay_start = time.monotonic()
+
+    def _next_logged(self):
+        """Read the next query, starting over at the end of the log if looping"""
+        if self._queries is None:
+            self.start()
+        query = next(self._queries, None)
+        if query is None and self.loop:
+            self.start()
+            query = next(self._queries, None)
+        return query
+
+    def next_query(self):
+        """
+        Get the next query, waiting until it's due
+
+        Returns:
+            LoggedQuery: the query, or None at the end of the log
+        """
+        query = self._next_logged()
+        if query is None or query.timestamp is None or self._log_start is None or not self.speed:
+            return query
+        delay = self._replay_start + (query.timestamp - self._log_start) / self.speed - time.monotonic()
+        if delay > 0:
+            gevent.sleep(delay)
+        return query
+
+
+class ZipfQuerySource:
+    """
+    Distinct queries from a log, sampled so the nth most frequent is picked in proportion to 1 / n ** exponent
+
+    Args:
+        path (str): the query log
+        exponent (float): the Zipf exponent, larger values skew the traffic towards the popular queries
+        max_queries (int): the maximum number of distinct queries to keep, later new ones are ignored
+    """
+    def __init__(self, path, exponent=1.0, max_queries=100000):
+        counts = Counter()
+        for query in read_queries(path):
+            key = query._replace(timestamp=None)
+            if key in counts or len(counts) < max_queries:
+                counts[key] += 1
+        if not counts:
+            raise ValueError("No queries in {}".format(path))
+
+        self.queries = [query for query, _ in counts.most_common()]
+        self.cum_weights = list(itertools.accumulate(
+            1 / rank ** exponent for rank in range(1, len(self.queries) + 1)
+        ))
+
+    def next_query(self):
+        """
+        Pick a query
+
+        Returns:
+            LoggedQuery: the query
+        """
+        return random.choices(self.queries, cum_weights=self.cum_weights)[0]
+
+
+def get_query_source():
+    """
+    Get the query source configured in settings
+
+    Returns:
+        ReplayQuerySource or ZipfQuerySource: the queries, or None if there's no query log
+    """
+    if not settings.SEARCH_QUERY_LOG:
+        return None
+    if settings.SEARCH_QUERY_LOG_MODE == REPLAY:
+        return ReplayQuerySource(settings.SEARCH_QUERY_LOG, speed=settings.SEARCH_QUERY_LOG_SPEED)
+    if settings.SEARCH_QUERY_LOG_MODE == ZIPF:
+        return ZipfQuerySource(
+            settings.SEARCH_QUERY_LOG,
+            exponent=settings.SEARCH_QUERY_LOG_ZIPF_EXPONENT,
+            max_queries=settings.SEARCH_QUERY_LOG_MAX_QUERIES,
+        )
+    raise Exception("Unknown query log mode {}".format(settings.SEARCH_QUERY_LOG_MODE))
@@ -0,0 +1,162 @@
+"""
+Checking learn search responses and reporting what elasticsearch did
+
+Each response is summarized, with a partial parse unless OPEN_DISCUSSIONS_SEARCH_RESPONSE_PARSING is "full",
+and checked. Hit, total and bucket counts and the percentiles of elasticsearch's own took time, to compare with
+the latency the client saw, are collected from every worker and logged when the test stops.
+"""
+import json
+import logging
+from collections import Counter
+
+from common import settings as common_settings
+from common.latency import HdrLatencyRecorder
+from common.reporting import Collector
+from open_discussions.learn import settings
+from open_discussions.util.es import parse_search_summary, summarize_search_results
+
+log = logging.getLogger(__name__)
+
+STATS_KEY = "search_result_stats"
+TOOK_KEY = ("ES", "took")
+PERCENTILES = (50, 95, 99)
+
+
+class SearchResultStats:
+    """Totals of the search summaries seen during a test"""
+    def __init__(self):
+        self.searches = 0
+        self.empty = 0
+        self.hits = 0
+        self.total = 0
+        self.buckets = Counter()
+        self.took = HdrLatencyRecorder(common_settings.LOCUST_HDR_SIGNIFICANT_FIGURES)
+
+    def record(self, summary):
+        """Add a search summary"""
+        self.searches += 1
+        self.empty += not summary.hits
+        self.hits += summary.hits
+        self.total += summary.total or 0
+        self.buckets.update(summary.buckets)
+        if summary.took is not None:
+            self.took.record(*TOOK_KEY, summary.took)
+
+    def report(self):
+        """
+        Take the totals since the last report
+
+        Returns:
+            dict: the totals, or None if there were no searches
+        """
+        if not self.searches:
+            return None
+        report = {
+            "searches": self.searches,
+            "empty": self.empty,
+            "hits": self.hits,
+            "total": self.total,
+            "buckets": dict(self.buckets),
+            "took": self.took.report(),
+        }
+        self.searches = self.empty = self.hits = self.total = 0
+        self.buckets = Counter()
+        return report
+
+    def merge(self, report):
+        """Add a report from this or another process"""
+        self.searches += report["searches"]
+        self.empty += report["empty"]
+        self.hits += report["hits"]
+        self.total += report["total"]
+        self.buckets.update(report["buckets"])
+        if report["took"] is not None:
+            self.took.merge(report["took"])
+
+    def log(self):
+        """Log the averages, and the percentiles of the took time"""
+        if not self.searches:
+            return
+        log.info(
+            "%d searches, %d with no hits, %.1f hits and %.0f matches on average, buckets per aggregation: %s",
+            self.searches, self.empty, self.hits / self.searches, self.total / self.searches,
+            ", ".join(
+                "{} {:.1f}".format(name, count / self.searches) for name, count in sorted(self.buckets.items())
+            ),
+        )
+        took = self.took.totals().get(TOOK_KEY)
+        if took is not None:
+            log.info(
+                "Elasticsearch took %s, max %.0fms",
+                ", ".join(
+                    "p{} {:.0f}ms".format(percentile, took.get_value_at_percentile(percentile) / 1000)
+                    for percentile in PERCENTILES
+                ),
+                took.get_max_value() / 1000,
+            )
+
+
+# what this process recorded since it last reported
+RECORDED = SearchResultStats()
+# every process's searches during the test
+STATS = SearchResultStats()
+
+
+def _reset():
+    """Start counting again for each test"""
+    global STATS  # pylint: disable=global-statement
+    RECORDED.report()
+    STATS = SearchResultStats()
+
+
+COLLECTOR = Collector(
+    STATS_KEY,
+    report=RECORDED.report,
+    merge=lambda report: STATS.merge(report),  # pylint: disable=unnecessary-lambda
+    log=lambda: STATS.log(),  # pylint: disable=unnecessary-lambda
+    reset=_reset,
+)
+
+
+def summarize(response):
+    """
+    Summarize a search response
+
+    Args:
+        response (requests.Response): the response
+
+    Returns:
+        SearchSummary: the summary, or None if the response isn't search results
+    """
+    if settings.SEARCH_RESPONSE_PARSING == "full":
+        try:
+            return summarize_search_results(json.loads(response.content))
+        except ValueError:
+            return None
+    return parse_search_summary(response.content)
+
+
+def check_search_response(response, limit):
+    """
+    Check a search response, which must have been requested with catch_response=True, and record its summary
+
+    Args:
+        response (locust.clients.ResponseContextManager): the response
+        limit (int): the number of hits requested
+
+    Returns:
+        SearchSummary: the summary, or None if the search failed
+    """
+    if not response.ok:
+        response.failure("HTTP {}".format(response.status_code))
+        return None
+    summary = summarize(response)
+    if summary is None:
+        response.failure("Response isn't search results")
+        return None
+    if summary.hits > limit:
+        response.failure("Got {} hits, asked for {}".format(summary.hits, limit))
+        return None
+    response.success()
+    RECORDED.record(summary)
+    return summary
@@ -1,9 +1,16 @@
 """Tests for discussions learn search"""
 import random
 
-from locust import HttpUser, TaskSet, task, between
+from locust import TaskSet, constant, events, task
+from locust.exception import StopUser
+from locust.runners import MasterRunner, WorkerRunner
 
-from open_discussions.util.es import generate_learn_query, ResourceType, OfferedByType, QueryParams, PriceType
+from common.reporting import send_shares
+from common.user import BaseUser, wait_between
+from open_discussions.learn import settings
+from open_discussions.learn.query_log import REPLAY, get_query_source
+from open_discussions.learn.results import check_search_response
+from open_discussions.util.es import generate_learn_query_body, ResourceType, OfferedByType, QueryParams, PriceType
 
 TEXTS = [
     "",  # no text, search all items
@@ -15,6 +22,39 @@ TEXTS = [
 
 LIMIT = 6
 SEARCH_URL = "/api/v0/search/"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# queries from OPEN_DISCUSSIONS_SEARCH_QUERY_LOG, if set
+QUERIES = None
+# whether the log is replayed, in which case it paces the searches and each worker replays a share of it
+REPLAYING = bool(settings.SEARCH_QUERY_LOG) and settings.SEARCH_QUERY_LOG_MODE == REPLAY
+SHARE_MESSAGE = "query_log_share"
+
+
+@events.init.add_listener
+def _load_queries(environment, **kwargs):
+    """Load the query log before any users start"""
+    global QUERIES  # pylint: disable=global-statement
+    if not isinstance(environment.runner, MasterRunner):
+        QUERIES = get_query_source()
+    if REPLAYING and isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(SHARE_MESSAGE, _on_share)
+
+
+def _on_share(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, take the share of the query log the master gave us"""
+    QUERIES.set_share(msg.data["worker_index"], msg.data["worker_count"])
+
+
+@events.test_start.add_listener
+def _start_replay(environment, **kwargs):
+    """Replay the log from the start, or on the master tell each worker which share of it to replay"""
+    if not REPLAYING:
+        return
+    if isinstance(environment.runner, MasterRunner):
+        send_shares(environment.runner, SHARE_MESSAGE)
+    else:
+        QUERIES.start()
 
 
 class SearchPage(TaskSet):
@@ -24,7 +64,8 @@ class SearchPage(TaskSet):
     This operates by generating random tasks for a new search and subsequent
     search pages at a 1-to-10 ratio. If the pages are exhausted we initiate a new search.
 
-    Search criteria (text and resource type) are randomly selected at the start of a new search.
+    Search criteria (text and resource type) are randomly selected at the start of a new search,
+    or taken from the query log along with the number of pages to look at if there is one.
     """
 
     def on_start(self):
@@ -35,31 +76,46 @@ class SearchPage(TaskSet):
     def _execute_search(self):
         """Execute a search request"""
         offset = self.page * LIMIT
-        query = generate_learn_query(
+        body = generate_learn_query_body(
             self.params,
             offset=offset,
             limit=LIMIT
         )
-        # for now we ignore the response
-        results = self.client.post(
+        name = (
+            f"{SEARCH_URL}"
+            # logged queries are too many to report separately
+            f"?q={'[text]' if QUERIES else self.params.text}"
+            f"&type={','.join([rt.value for rt in self.params.types])}"
+            f"&o={','.join([o.value for o in self.params.offered_by])}"
+            f"&p={self.page}"
+        )
+        with self.client.post(
             SEARCH_URL,
-            json=query,
-            name=(
-                f"{SEARCH_URL}"
-                f"?q={self.params.text}"
-                f"&type={','.join([rt.value for rt in self.params.types])}"
-                f"&o={','.join([o.value for o in self.params.offered_by])}"
-                f"&p={self.page}"
-            )
-        ).json()
-        # if we've run out of pages, queue a new search next
-        if len(results["hits"]["hits"]) < LIMIT:
+            data=body,
+            headers=JSON_HEADERS,
+            name=name,
+            catch_response=True,
+        ) as response:
+            summary = check_search_response(response, LIMIT)
+        # if we've run out of pages, or the search failed, queue a new search next
+        if summary is None or summary.hits < LIMIT:
             self.schedule_task(self.new_search, first=True)
 
     @task(1)
     def new_search(self):
         """Start a new search"""
         self.page = 0
+        if QUERIES:
+            query = QUERIES.next_query()
+            if query is None:
+                # the whole log has been replayed
+                raise StopUser()
+            self.params = query.params
+            self.pages = query.pages
+            self._execute_search()
+            return
+
+        self.pages = None
         # NOTE: sometimes the permutation generated here will return zero results
         #       because the facet combinations don't make sense
         #       that's a bit too complicated to codify so we don't worry about it for now
@@ -88,10 +144,15 @@ class SearchPage(TaskSet):
     @task(10)
     def next_page(self):
         """Load the next page of search results"""
+        if self.pages and self.page + 1 >= self.pages:
+            # the logged user didn't look any further
+            self.new_search()
+            return
         self.page += 1
         self._execute_search()
 
 
-class AnonymousUser(HttpUser):
+class AnonymousUser(BaseUser):
     tasks = [SearchPage]
-    wait_time = between(1, 10)
+    # a replayed log's timestamps are the only wait
+    wait_time = constant(0) if REPLAYING else wait_between(1000, 10000)
@@ -0,0 +1,24 @@
+"""
+Settings for the open_discussions learn locust tests
+"""
+import os
+
+from common.settings import get_var
+
+# the words random search text is made of, the name of a corpus in words.CORPORA, a url or a local file
+WORDS_CORPUS = get_var('OPEN_DISCUSSIONS_WORDS_CORPUS', 'english')
+# downloaded corpora and their indexes are cached here
+WORDS_CACHE_DIR = get_var(
+    'OPEN_DISCUSSIONS_WORDS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'open-learning-load-testing')
+)
+
+# replay an anonymized query log instead of searching for random text, see query_log.py
+SEARCH_QUERY_LOG = get_var('OPEN_DISCUSSIONS_SEARCH_QUERY_LOG', '')
+# replay the log in order with its original timing, or sample it with a Zipf distribution
+SEARCH_QUERY_LOG_MODE = get_var('OPEN_DISCUSSIONS_SEARCH_QUERY_LOG_MODE', 'zipf')
+SEARCH_QUERY_LOG_SPEED = float(get_var('OPEN_DISCUSSIONS_SEARCH_QUERY_LOG_SPEED', 1))
+SEARCH_QUERY_LOG_ZIPF_EXPONENT = float(get_var('OPEN_DISCUSSIONS_SEARCH_QUERY_LOG_ZIPF_EXPONENT', 1))
+SEARCH_QUERY_LOG_MAX_QUERIES = int(get_var('OPEN_DISCUSSIONS_SEARCH_QUERY_LOG_MAX_QUERIES', 100000))
+
+# "partial" reads only the hits, total, took and bucket counts from search responses, "full" decodes them
+SEARCH_RESPONSE_PARSING = get_var('OPEN_DISCUSSIONS_SEARCH_RESPONSE_PARSING', 'partial')
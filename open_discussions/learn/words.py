@@ -0,0 +1,200 @@
+"""
+Random words for search text, read from a memory-mapped word list
+
+A corpus is a file with one word per line. It's downloaded once into a local cache and then
+memory-mapped, so workers on the same machine share the page cache instead of each holding
+a list of every word. The offsets of the words are indexed once and the index is cached next
+to the file, so opening a corpus is nearly instant after the first time.
+"""
+import mmap
+import os
+import random
+from array import array
+from urllib.parse import urlparse
+
+import requests
+
+from open_discussions.learn import settings
+
+# corpora which can be referred to by name
+CORPORA = {
+    "english": "https://raw.githubusercontent.com/dwyl/english-words/master/words_alpha.txt",
+}
+
+INDEX_SUFFIX = ".idx"
+INDEX_TYPECODE = "Q"
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def register_corpus(name, url):
+    """
+    Make a corpus available by name
+
+    Args:
+        name (str): the corpus name
+        url (str): where to download the word list from
+    """
+    CORPORA[name] = url
+
+
+def _download(url, path):
+    """Stream a url to a file, which only appears once it's complete"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = "{}.{}.partial".format(path, os.getpid())
+    with requests.get(url, stream=True) as response:
+        response.raise_for_status()
+        with open(partial_path, "wb") as partial_file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                partial_file.write(chunk)
+    os.replace(partial_path, path)
+
+
+def corpus_path(corpus, cache_dir=None):
+    """
+    Get the local file for a corpus, downloading it if it isn't cached yet
+
+    Args:
+        corpus (str): the name of a corpus in CORPORA, a url, or the path of a local file
+        cache_dir (str): where downloaded corpora are kept, defaults to settings.WORDS_CACHE_DIR
+
+    Returns:
+        str: the path of the word list
+    """
+    url = CORPORA.get(corpus, corpus)
+    if urlparse(url).scheme not in ("http", "https"):
+        return url
+    cache_dir = cache_dir or settings.WORDS_CACHE_DIR
+    filename = corpus if corpus in CORPORA else os.path.basename(urlparse(url).path) or "words"
+    path = os.path.join(cache_dir, filename)
+    if not os.path.exists(path):
+        _download(url, path)
+    return path
+
+
+def _build_index(data):
+    """
+    Find the offset of every non-empty line
+
+    Args:
+        data (mmap.mmap): the word list
+
+    Returns:
+        array: the offsets
+    """
+    offsets = array(INDEX_TYPECODE)
+    size = len(data)
+    start = 0
+    while start < size:
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = size
+        if data[start:end].strip():
+            offsets.append(start)
+        start = end + 1
+    return offsets
+
+
+class WordSource:
+    """
+    Random access to the words of a word list without loading them into memory
+
+    Args:
+        path (str): the word list, one word per line
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._data = None
+        self._offsets = None
+
+    def __len__(self):
+        self.open()
+        return len(self._offsets)
+
+    def _load_index(self):
+        """Load the cached index, or build and cache it if it's missing or older than the word list"""
+        index_path = self.path + INDEX_SUFFIX
+        try:
+            if os.path.getmtime(index_path) >= os.path.getmtime(self.path):
+                offsets = array(INDEX_TYPECODE)
+                with open(index_path, "rb") as index_file:
+                    offsets.frombytes(index_file.read())
+                return offsets
+        except (OSError, ValueError):
+            # missing or truncated, so rebuild it
+            pass
+
+        offsets = _build_index(self._data)
+        partial_path = "{}.{}.partial".format(index_path, os.getpid())
+        try:
+            with open(partial_path, "wb") as index_file:
+                offsets.tofile(index_file)
+            os.replace(partial_path, index_path)
+        except OSError:
+            # the index is only a cache, a read-only location just means it's rebuilt next time
+            pass
+        return offsets
+
+    def open(self):
+        """Map the word list and load its index, this only does anything the first time"""
+        if self._data is not None:
+            return
+        self._file = open(self.path, "rb")  # pylint: disable=consider-using-with
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = self._load_index()
+        if not self._offsets:
+            self.close()
+            raise ValueError("No words in {}".format(self.path))
+
+    def close(self):
+        """Unmap the word list"""
+        if self._data is not None:
+            self._data.close()
+            self._file.close()
+        self._file = self._data = self._offsets = None
+
+    def word(self, index):
+        """
+        Get a word
+
+        Args:
+            index (int): the position of the word in the list
+
+        Returns:
+            str: the word
+        """
+        self.open()
+        start = self._offsets[index]
+        end = self._data.find(b"\n", start)
+        if end == -1:
+            end = len(self._data)
+        return self._data[start:end].strip().decode("utf-8")
+
+    def sample(self, count):
+        """
+        Pick random words, possibly with repeats
+
+        Args:
+            count (int): the number of words
+
+        Returns:
+            list of str: the words
+        """
+        self.open()
+        size = len(self._offsets)
+        return [self.word(random.randrange(size)) for _ in range(count)]
+
+
+def get_word_source(corpus=None):
+    """
+    Get the words of a corpus, downloading it if necessary
+
+    Args:
+        corpus (str): a corpus name, url or path, defaults to settings.WORDS_CORPUS
+
+    Returns:
+        WordSource: the opened words
+    """
+    source = WordSource(corpus_path(corpus or settings.WORDS_CORPUS))
+    source.open()
+    return source
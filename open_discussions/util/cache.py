@@ -0,0 +1,87 @@
+"""Caching utils"""
+import time
+from collections import OrderedDict
+
+
+class ExpiringLRUCache:
+    """
+    A bounded mapping whose entries expire after a time to live
+
+    When the cache is full the least recently used entry is evicted to make room.
+    This is not thread safe, but locust runs every user in greenlets on a single thread.
+
+    Args:
+        max_size (int): the maximum number of entries to keep
+        ttl (float): the default number of seconds an entry is valid for
+    """
+    def __init__(self, max_size, ttl):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """
+        Get a value from the cache
+
+        Args:
+            key (hashable): the cache key
+            default (any): the value to return if the key is missing or expired
+
+        Returns:
+            any: the cached value or the default
+        """
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            return default
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Put a value in the cache, evicting the least recently used entry if the cache is full
+
+        Args:
+            key (hashable): the cache key
+            value (any): the value to cache
+            ttl (float): seconds until the entry expires, defaults to the cache ttl
+        """
+        if key in self._entries:
+            del self._entries[key]
+        elif len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def pop(self, key, default=None):
+        """
+        Remove a value from the cache
+
+        Args:
+            key (hashable): the cache key
+            default (any): the value to return if the key is missing
+
+        Returns:
+            any: the removed value or the default
+        """
+        try:
+            return self._entries.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        self._entries.clear()
+
+
+_MISSING = object()
@@ -1,6 +1,9 @@
 """Elasticsearch utils"""
+import json
+import re
 from collections import namedtuple
 from enum import Enum
+from functools import lru_cache
 
 AGGREGATIONS = {
     "availability": {
@@ -292,3 +295,178 @@ def generate_learn_query(params, offset, limit):
         "from": offset,
         "size": limit,
     }
+
+
+# the number of serialized query templates to keep, each is a few kilobytes
+QUERY_TEMPLATE_CACHE_SIZE = 1024
+
+# stands in for the search text while a template is serialized, the text is spliced in afterwards
+TEXT_PLACEHOLDER = "\x00text\x00"
+# the text query type depends on whether the text contains a quote, so there's a placeholder for each
+PHRASE_TEXT_PLACEHOLDER = "\"" + TEXT_PLACEHOLDER
+
+# should clauses don't depend on order, so facets are sorted to keep the number of templates small
+_FACET_ORDER = {
+    facet: index
+    for enum in (ResourceType, OfferedByType, PriceType)
+    for index, facet in enumerate(enum)
+}
+
+
+def _freeze_facets(facets):
+    """Convert a facet list into a hashable, canonically ordered tuple"""
+    if isinstance(facets, Enum):
+        return facets
+    return tuple(sorted(facets, key=_FACET_ORDER.__getitem__))
+
+
+@lru_cache(maxsize=QUERY_TEMPLATE_CACHE_SIZE)
+def _generate_learn_query_template(types, offered_by, price, is_phrase):
+    """
+    Serialize the learn query for a combination of facets
+
+    Returns:
+        tuple(bytes): the JSON fragments around each occurrence of the search text,
+            the last one is missing the trailing `"from": offset, "size": limit}`
+    """
+    placeholder = PHRASE_TEXT_PLACEHOLDER if is_phrase else TEXT_PLACEHOLDER
+    query = generate_learn_query(QueryParams(placeholder, types, offered_by, price), offset=0, limit=0)
+    del query["from"]
+    del query["size"]
+    serialized = json.dumps(query)[:-1] + ", "
+    return tuple(fragment.encode("ascii") for fragment in serialized.split(json.dumps(placeholder)))
+
+
+def generate_learn_query_body(params, offset, limit):
+    """
+    Generate the serialized learn query
+
+    This produces the same query as generate_learn_query() with facets in a canonical order,
+    but serializes each facet combination only once.
+
+    Args:
+        params (QueryParams): the search parameters
+        offset (int): the offset of the first result
+        limit (int): the number of results
+
+    Returns:
+        bytes: the JSON request body
+    """
+    fragments = _generate_learn_query_template(
+        _freeze_facets(params.types),
+        _freeze_facets(params.offered_by),
+        _freeze_facets(params.price),
+        "\"" in params.text,
+    )
+    return b"".join((
+        json.dumps(params.text).encode("ascii").join(fragments),
+        b'"from": %d, "size": %d}' % (offset, limit),
+    ))
+
+
+# the parts of a search response the load tests look at
+SearchSummary = namedtuple("SearchSummary", [
+    # the number of hits returned
+    "hits",
+    # the total number of matching documents
+    "total",
+    # the milliseconds elasticsearch spent on the search
+    "took",
+    # the number of buckets in each aggregation
+    "buckets",
+])
+
+_TOOK_PATTERN = re.compile(rb'"took"\s*:\s*(\d+)')
+_HITS_OBJECT_PATTERN = re.compile(rb'"hits"\s*:\s*\{')
+_TOTAL_PATTERN = re.compile(rb'"total"\s*:\s*(?:\{\s*"value"\s*:\s*)?(\d+)')
+_HITS_ARRAY_PATTERN = re.compile(rb'"hits"\s*:\s*\[')
+_AGGREGATIONS_PATTERN = re.compile(rb'"aggregations"\s*:\s*\{')
+_AGGREGATION_NAME_PATTERNS = {
+    name: re.compile(rb'"%s"\s*:\s*\{' % name.encode("ascii")) for name in AGGREGATIONS
+}
+_DECODER = json.JSONDecoder()
+
+
+def parse_search_summary(content):
+    """
+    Read the hits, total, took and aggregation bucket counts of a search response without decoding all of it
+
+    Elasticsearch writes took, then hits, then aggregations, so each is found by searching from
+    where the last one was. Only the hits array is decoded. Buckets are counted by their "key" fields
+    between the start of each aggregation and the next one.
+
+    Args:
+        content (bytes): the response body
+
+    Returns:
+        SearchSummary: the summary, or None if the response doesn't look like search results
+    """
+    hits_object = _HITS_OBJECT_PATTERN.search(content)
+    if hits_object is None:
+        return None
+    took = _TOOK_PATTERN.search(content, 0, hits_object.start())
+    hits_array = _HITS_ARRAY_PATTERN.search(content, hits_object.end())
+    if hits_array is None:
+        return None
+    total = _TOTAL_PATTERN.search(content, hits_object.end(), hits_array.start())
+
+    aggregations = _AGGREGATIONS_PATTERN.search(content, hits_array.end())
+    hits_end = aggregations.start() if aggregations else len(content)
+    try:
+        hits, _ = _DECODER.raw_decode(content[hits_array.end() - 1:hits_end].decode("utf-8"))
+    except ValueError:
+        return None
+
+    buckets = {}
+    if aggregations:
+        starts = []
+        for name, pattern in _AGGREGATION_NAME_PATTERNS.items():
+            match = pattern.search(content, aggregations.end())
+            if match:
+                starts.append((match.start(), name))
+        starts.sort()
+        for (start, name), (end, _) in zip(starts, starts[1:] + [(len(content), None)]):
+            buckets[name] = content.count(b'"key"', start, end)
+
+    return SearchSummary(
+        len(hits),
+        int(total.group(1)) if total else None,
+        int(took.group(1)) if took else None,
+        buckets,
+    )
+
+
+def summarize_search_results(results):
+    """
+    Summarize decoded search results the same way as parse_search_summary()
+
+    Args:
+        results (dict): the decoded response body
+
+    Returns:
+        SearchSummary: the summary, or None if the response doesn't look like search results
+    """
+    try:
+        hits = results["hits"]
+        total = hits.get("total")
+        return SearchSummary(
+            len(hits["hits"]),
+            total.get("value") if isinstance(total, dict) else total,
+            results.get("took"),
+            {
+                name: _count_buckets(aggregation)
+                for name, aggregation in results.get("aggregations", {}).items()
+                if name in AGGREGATIONS
+            },
+        )
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def _count_buckets(aggregation):
+    """Count the buckets in an aggregation, including those of nested aggregations"""
+    if isinstance(aggregation, dict):
+        return ("key" in aggregation) + sum(_count_buckets(value) for value in aggregation.values())
+    if isinstance(aggregation, list):
+        return sum(_count_buckets(value) for value in aggregation)
+    return 0
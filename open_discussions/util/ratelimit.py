@@ -0,0 +1,62 @@
+"""Rate limiting utils"""
+import time
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter
+
+    Tokens are added at a constant rate up to the burst size, and each operation takes one.
+    Waiting uses time.sleep, which gevent patches to yield to other greenlets.
+
+    Args:
+        rate (float): tokens added per second, 0 or less disables limiting
+        burst (int): the maximum number of tokens that can accumulate
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available
+
+        Args:
+            tokens (int): the number of tokens to take
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def acquire(self, tokens=1):
+        """
+        Wait until tokens are available and take them
+
+        Args:
+            tokens (int): the number of tokens to take
+
+        Returns:
+            float: the number of seconds spent waiting, 0 if the tokens were available straight away
+        """
+        if tokens > self.burst:
+            raise ValueError("Can't take more tokens than the burst size")
+        if self.try_acquire(tokens):
+            return 0.0
+        start = time.monotonic()
+        while not self.try_acquire(tokens):
+            time.sleep((tokens - self.tokens) / self.rate)
+        return time.monotonic() - start
@@ -0,0 +1,84 @@
+"""Random sampling utils"""
+import random
+
+
+class IndexedSet:
+    """
+    A set which can also pick a random member in constant time
+
+    Members are kept in a list alongside a map of each member to its position in the list.
+    Removing a member moves the last member into its place, so add, discard and choice
+    are all O(1) and none of them copy the members.
+
+    Args:
+        values (iterable): initial members
+    """
+    def __init__(self, values=()):
+        self._values = []
+        self._positions = {}
+        for value in values:
+            self.add(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._positions
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, position):
+        return self._values[position]
+
+    def add(self, value):
+        """
+        Add a member
+
+        Returns:
+            bool: True if the value wasn't already a member
+        """
+        if value in self._positions:
+            return False
+        self._positions[value] = len(self._values)
+        self._values.append(value)
+        return True
+
+    def discard(self, value):
+        """
+        Remove a member if present
+
+        Returns:
+            bool: True if the value was a member
+        """
+        position = self._positions.pop(value, None)
+        if position is None:
+            return False
+        last = self._values.pop()
+        if position < len(self._values):
+            self._values[position] = last
+            self._positions[last] = position
+        return True
+
+    def replace(self, position, value):
+        """
+        Replace the member at a position with a new one
+
+        Args:
+            position (int): the position of the member to replace
+            value: the new member, which must not already be a member
+        """
+        del self._positions[self._values[position]]
+        self._values[position] = value
+        self._positions[value] = position
+
+    def choice(self):
+        """
+        Pick a random member
+
+        Returns:
+            a random member, or None if the set is empty
+        """
+        if not self._values:
+            return None
+        return self._values[random.randrange(len(self._values))]
@@ -0,0 +1,69 @@
+"""Sampled request tracing"""
+import json
+import random
+import time
+from collections import deque
+
+
+class RequestTrace:
+    """
+    A ring buffer of recent requests, sampled so tracing stays off the hot path
+
+    Nothing is written until dump() is called, so tracing adds no I/O to requests.
+
+    Args:
+        sample_rate (float): fraction of requests to record, 0 disables tracing
+        max_records (int): the number of most recent records to keep
+    """
+    def __init__(self, sample_rate, max_records):
+        self.sample_rate = sample_rate
+        self.records = deque(maxlen=max_records)
+
+    @property
+    def enabled(self):
+        """True if any requests are being recorded"""
+        return self.sample_rate > 0
+
+    def sampled(self):
+        """
+        Decide whether the next request should be recorded
+
+        Returns:
+            bool: True if the request should be recorded
+        """
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, method, url, name, latency):
+        """
+        Record a request
+
+        Args:
+            method (str): the HTTP method
+            url (str): the requested url
+            name (str): the name the request was reported to locust under
+            latency (float): the request duration in milliseconds
+        """
+        self.records.append((time.time(), method, url, name, latency))
+
+    def dump(self, path):
+        """
+        Write the recorded requests to a file as JSON lines
+
+        Args:
+            path (str): the file to write to
+
+        Returns:
+            int: the number of records written
+        """
+        records = list(self.records)
+        with open(path, "w") as trace_file:
+            for timestamp, method, url, name, latency in records:
+                trace_file.write(json.dumps({
+                    "timestamp": timestamp,
+                    "method": method,
+                    "url": url,
+                    "name": name,
+                    "latency": latency,
+                }))
+                trace_file.write("\n")
+        return len(records)
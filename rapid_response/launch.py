@@ -0,0 +1,187 @@
+"""
+A course launch, the whole class submitting to a problem within seconds of the instructor opening it
+
+Each user logs in and enrolls, then tells the launch it's ready, or that it couldn't and sits the launch out.
+Once every user of the test has, the master, or the only process when not distributed, logs how many are
+ready, picks a start time a moment ahead and sends it to the workers. The users of every process then submit
+to the same problem at a random time within RAPID_RESPONSE_LAUNCH_SPREAD seconds of the start of each of
+RAPID_RESPONSE_LAUNCH_BURSTS bursts, RAPID_RESPONSE_LAUNCH_INTERVAL seconds apart. The start time is wall
+clock time, so the workers' clocks have to be in sync.
+
+Each burst's submissions are reported under their own name, see burst_name, so locust merges their
+percentiles across workers. When the test stops, the count, success rate and percentiles of each burst
+are logged.
+"""
+import logging
+import time
+
+import gevent.event
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from common.reporting import Collector
+from rapid_response import settings
+
+log = logging.getLogger(__name__)
+
+READY_MESSAGE = "launch_ready"
+START_MESSAGE = "launch_start"
+SUBMISSION_METHOD = "POST"
+# seconds between picking the start time and the first burst, for it to reach the workers
+LEAD = 1
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def burst_name(burst):
+    """The name a burst's submissions are reported under"""
+    return "Launch Submission [burst {}]".format(burst)
+
+
+def launch_block():
+    """
+    The problem everyone submits to
+
+    Returns:
+        tuple: the course id and the block from RAPID_RESPONSE_COURSE_DATA
+    """
+    for course in settings.RAPID_RESPONSE_COURSE_DATA:
+        for block in course['blocks']:
+            if settings.RAPID_RESPONSE_LAUNCH_BLOCK in ('', block['id']):
+                return course['course_id'], block
+    raise ValueError("No block {!r} in the course data".format(settings.RAPID_RESPONSE_LAUNCH_BLOCK))
+
+
+class Launch:
+    """The barrier users wait on, and the bursts they submit in once it opens"""
+    def __init__(self):
+        self.started = gevent.event.Event()
+        self.start = None
+        # on the master, or when not distributed, how many users are ready, and how many couldn't get ready
+        self.ready_users = 0
+        self.not_ready_users = 0
+
+    def open(self, start):
+        """
+        Let the users go
+
+        Args:
+            start (float): when the first burst starts, seconds since the epoch
+        """
+        self.start = start
+        self.started.set()
+
+    def bursts(self):
+        """
+        Wait for the launch, then yield each burst which hasn't finished yet
+
+        Yields:
+            tuple: the burst number counting from 1, and when it starts in seconds since the epoch
+        """
+        self.started.wait()
+        for burst in range(settings.RAPID_RESPONSE_LAUNCH_BURSTS):
+            start = self.start + burst * settings.RAPID_RESPONSE_LAUNCH_INTERVAL
+            if time.time() < start + settings.RAPID_RESPONSE_LAUNCH_SPREAD:
+                yield burst + 1, start
+
+
+LAUNCH = Launch()
+# the runner of this process
+_runner = None
+
+
+def _count_ready(ready_users, not_ready_users):
+    """On the master, or when not distributed, open the launch once every user is ready or couldn't be"""
+    LAUNCH.ready_users += ready_users
+    LAUNCH.not_ready_users += not_ready_users
+    if LAUNCH.started.is_set() or LAUNCH.ready_users + LAUNCH.not_ready_users < _runner.target_user_count:
+        return
+    start = time.time() + LEAD
+    log.info(
+        "%d users ready, launching without %d who couldn't log in or enroll",
+        LAUNCH.ready_users, LAUNCH.not_ready_users,
+    )
+    if isinstance(_runner, MasterRunner):
+        _runner.send_message(START_MESSAGE, {"start": start})
+    LAUNCH.open(start)
+
+
+def ready(is_ready=True):
+    """
+    Tell the launch a user has logged in and enrolled, or couldn't and won't take part
+
+    Args:
+        is_ready (bool): whether the user is ready
+    """
+    counts = {"ready_users": 1, "not_ready_users": 0} if is_ready else {"ready_users": 0, "not_ready_users": 1}
+    if isinstance(_runner, WorkerRunner):
+        _runner.send_message(READY_MESSAGE, counts)
+    else:
+        _count_ready(**counts)
+
+
+def _on_ready(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On the master, count a worker's ready and not ready users"""
+    _count_ready(**msg.data)
+
+
+def _on_start(environment, msg, **kwargs):  # pylint: disable=unused-argument
+    """On a worker, open the launch when the master does"""
+    LAUNCH.open(msg.data["start"])
+
+
+@events.init.add_listener
+def _attach(environment, **kwargs):
+    """Listen for the workers' ready users, or for the master's start time"""
+    global _runner  # pylint: disable=global-statement
+    _runner = environment.runner
+    if isinstance(_runner, MasterRunner):
+        _runner.register_message(READY_MESSAGE, _on_ready)
+    elif isinstance(_runner, WorkerRunner):
+        _runner.register_message(START_MESSAGE, _on_start)
+
+
+class BurstReport:
+    """Each burst's submissions, from locust's stats, which on the master are merged across workers"""
+    def __init__(self):
+        self.logged_requests = 0
+
+    def log(self, stats):
+        """Log each burst if any submissions came in since it was last logged"""
+        entries = [
+            (burst, stats.entries[(burst_name(burst), SUBMISSION_METHOD)])
+            for burst in range(1, settings.RAPID_RESPONSE_LAUNCH_BURSTS + 1)
+            if (burst_name(burst), SUBMISSION_METHOD) in stats.entries
+        ]
+        requests = sum(entry.num_requests for _, entry in entries)
+        if requests == self.logged_requests:
+            return
+        self.logged_requests = requests
+        for burst, entry in entries:
+            log.info(
+                "Burst %d: %d submissions over %gs, %.1f%% succeeded, %s, max %dms",
+                burst, entry.num_requests, settings.RAPID_RESPONSE_LAUNCH_SPREAD,
+                100 * (1 - entry.fail_ratio),
+                ", ".join(
+                    "p{:g} {}ms".format(percentile * 100, entry.get_response_time_percentile(percentile))
+                    for percentile in PERCENTILES
+                ),
+                entry.max_response_time,
+            )
+
+
+REPORT = BurstReport()
+
+
+def _reset():
+    """Launch and report each test separately"""
+    global LAUNCH, REPORT  # pylint: disable=global-statement
+    LAUNCH = Launch()
+    REPORT = BurstReport()
+
+
+# the submissions are in locust's stats, which on the master are merged across workers already
+COLLECTOR = Collector(
+    "launch_bursts",
+    log=lambda: REPORT.log(_runner.environment.stats),
+    reset=_reset,
+)
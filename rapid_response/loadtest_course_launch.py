@@ -0,0 +1,55 @@
+"""
+locust file for a rapid response course launch
+Every user logs in and enrolls, then they all submit to the same problem within a few seconds, see launch.py
+
+Run as many users as there are students in the class, e.g. -u 500, at a spawn rate they can log in at.
+"""
+import random
+import time
+
+import gevent
+from locust import TaskSet, constant, task
+from locust.exception import StopUser
+
+from common.user import BaseUser
+from rapid_response import launch, settings
+from rapid_response.loadtest_rapid_response import LOGINS, client_is_logged_into_edx, enroll, log_in, submit_answer
+
+
+class CourseLaunch(TaskSet):
+    """
+    Waits for the launch, then submits once in each burst
+    """
+    course_id = None
+    block = None
+
+    def on_start(self):
+        """Log in and enroll, then tell the launch whether this user is ready"""
+        self.course_id, self.block = launch.launch_block()
+        ready = False
+        try:
+            if LOGINS is not None:
+                LOGINS.hand_out(self.client)
+            if not client_is_logged_into_edx(self.client):
+                log_in(self.client, random.choice(settings.USERNAMES_IN_EDX))
+            ready = client_is_logged_into_edx(self.client) and enroll(self.client, self.course_id)
+        finally:
+            # counted even if this user couldn't log in or enroll, so the others aren't kept waiting
+            launch.ready(ready)
+        if not ready:
+            # sit the launch out rather than submit without being enrolled
+            raise StopUser()
+
+    @task
+    def submit_in_bursts(self):
+        """Submit a random answer at a random time in each burst's spread window"""
+        for burst, start in launch.LAUNCH.bursts():
+            gevent.sleep(max(0, start + random.uniform(0, settings.RAPID_RESPONSE_LAUNCH_SPREAD) - time.time()))
+            submit_answer(self.client, self.course_id, self.block, name=launch.burst_name(burst))
+        raise StopUser()
+
+
+class WebsiteUser(BaseUser):
+    host = settings.LMS_BASE_URL
+    tasks = [CourseLaunch]
+    wait_time = constant(0)
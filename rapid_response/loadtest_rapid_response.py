@@ -1,17 +1,116 @@
 """
+locust file for rapid response
+Users log into the LMS, enroll in a course and submit answers to its rapid response problems
 """
 import random
-from locust import HttpLocust, TaskSet, task
 
-import settings
+from locust import TaskSet, task
+
+from common.logins import login_pool
+from common.transport import response_cookies
+from common.user import BaseUser, wait_between
+from rapid_response import settings
+
+
+PASSWORD = 'edx'
 
 
 def client_is_logged_into_edx(client):
     return client.cookies.get('edxloggedin') == 'true'
 
 
+def log_in(client, username):
+    """
+    Log a user into the LMS
+
+    Args:
+        client (locust.clients.HttpSession): the client to log in with
+        username (str): the user
+
+    Returns:
+        dict: nothing to hand out with the session, or None if the login failed
+    """
+    # load the login form to get the token
+    initial_login_resp = client.get(
+        '/login',
+        name='Initial login request'
+    )
+    csrf_token = response_cookies(initial_login_resp).get('csrftoken')
+    # login edx
+    client.post(
+        '/user_api/v1/account/login_session/',
+        data={
+            'email': '{}@example.com'.format(username),
+            'password': PASSWORD,
+            'remember': 'false'
+        },
+        headers={
+            'Referer': '/login',
+            'X-CSRFToken': csrf_token
+        },
+        name='Actual login'
+    )
+    return {} if client_is_logged_into_edx(client) else None
+
+
+def enroll(client, course_id):
+    """
+    Enroll the logged in user in a course
+
+    Args:
+        client (locust.clients.HttpSession): the user's client
+        course_id (str): the course
+
+    Returns:
+        bool: whether the user was enrolled
+    """
+    # Unenrolling before enrolling because edX throws an error when an enrolled
+    # user requests to enroll again.
+    for enrollment_action in ['unenroll', 'enroll']:
+        response = client.post(
+            '/change_enrollment',
+            data={
+                'course_id': course_id,
+                'enrollment_action': enrollment_action
+            },
+            headers={
+                'X-CSRFToken': client.cookies.get('csrftoken')
+            },
+            name='Course Enrollment ({})'.format(enrollment_action),
+        )
+    return response.ok
+
+
+def submit_answer(client, course_id, block, name='Problem Submission'):
+    """
+    Submit a random answer to a problem
+
+    Args:
+        client (locust.clients.HttpSession): the logged in user's client
+        course_id (str): the problem's course
+        block (dict): the problem's block from RAPID_RESPONSE_COURSE_DATA
+        name (str): the name to report the request under
+
+    Returns:
+        requests.Response: the response
+    """
+    return client.post(
+        '/courses/{}/xblock/{}/handler/xmodule_handler/problem_check'.format(course_id, block['id']),
+        data={'input_{}'.format(block['choicegroup_id']): random.choice(block['answer_ids'])},
+        headers={
+            'X-CSRFToken': client.cookies.get('csrftoken')
+        },
+        name=name,
+    )
+
+
+# sessions of users logged in before the test, if LOCUST_PRELOGIN is set
+LOGINS = login_pool("the LMS", settings.LMS_BASE_URL, settings.USERNAMES_IN_EDX, log_in)
+
+
 class ProblemSubmission(TaskSet):
     """
+    Submits answers to the course's problems
     """
     course_data = None
 
@@ -19,37 +118,15 @@ class ProblemSubmission(TaskSet):
         """on_start is called before any task is scheduled """
         self.course_data = self.parent.course_data
 
-    @staticmethod
-    def _get_answer_post_url(course_id, block_id):
-        return '/courses/{}/xblock/{}/handler/xmodule_handler/problem_check'.format(
-            course_id,
-            block_id
-        )
-
-    @staticmethod
-    def _answer_post_dict(choicegroup_id, answer_id):
-        return {'input_{}'.format(choicegroup_id): answer_id}
-
     @task
     def submit_answer(self):
         """
+        Submits a random answer to a random problem
         """
         # Stop this task if not logged in yet
         if not client_is_logged_into_edx(self.client):
             self.interrupt()
-        course_id = self.course_data['course_id']
-        block = random.choice(self.course_data['blocks'])
-        block_id = block['id']
-        choicegroup_id = block['choicegroup_id']
-        answer_id = random.choice(block['answer_ids'])
-        self.client.post(
-            self._get_answer_post_url(course_id, block_id),
-            data=self._answer_post_dict(choicegroup_id, answer_id),
-            headers={
-                'X-CSRFToken': self.client.cookies.get('csrftoken')
-            },
-            name='Problem Submission',
-        )
+        submit_answer(self.client, self.course_data['course_id'], random.choice(self.course_data['blocks']))
 
     @task
     def stop(self):
@@ -58,66 +135,32 @@ class ProblemSubmission(TaskSet):
 
 class UserLogIn(TaskSet):
     """
+    Logs in and enrolls, then submits answers
     """
     tasks = {ProblemSubmission: 5}
     enrolled_users = None
     username = None
     course_data = None
-    pw = 'edx'
 
     def on_start(self):
         """on_start is called before any task is scheduled """
         self.enrolled_users = self.parent.enrolled_users
-        self.username = random.choice(settings.USERNAMES_IN_EDX)
         self.course_data = random.choice(settings.RAPID_RESPONSE_COURSE_DATA)
-
-    def _login(self):
-        # load the login form to get the token
-        initial_login_resp = self.client.get(
-            '/login',
-            name='Initial login request'
-        )
-        csrf_token = initial_login_resp.cookies.get('csrftoken')
-        # login edx
-        self.client.post(
-            '/user_api/v1/account/login_session/',
-            data={
-                'email': '{}@example.com'.format(self.username),
-                'password': self.pw,
-                'remember': 'false'
-            },
-            headers={
-                'Referer': '/login',
-                'X-CSRFToken': csrf_token
-            },
-            name='Actual login'
-        )
+        login = LOGINS.hand_out(self.client) if LOGINS is not None else None
+        self.username = login.username if login is not None else random.choice(settings.USERNAMES_IN_EDX)
 
     def _enroll(self):
-        course_id = self.course_data['course_id']
-        # Unenrolling before enrolling because edX throws an error when an enrolled
-        # user requests to enroll again.
-        for enrollment_action in ['unenroll', 'enroll']:
-            self.client.post(
-                '/change_enrollment',
-                data={
-                    'course_id': course_id,
-                    'enrollment_action': enrollment_action
-                },
-                headers={
-                    'X-CSRFToken': self.client.cookies.get('csrftoken')
-                },
-                name='Course Enrollment ({})'.format(enrollment_action),
-            )
+        enroll(self.client, self.course_data['course_id'])
         self.enrolled_users.add(self.username)
 
     @task
     def login_and_enroll(self):
         """
+        Logs in and enrolls if this user hasn't yet
         """
         if not client_is_logged_into_edx(self.client):
-            self._login()
-        if not self.username in self.enrolled_users:
+            log_in(self.client, self.username)
+        if self.username not in self.enrolled_users:
             self._enroll()
 
     @task
@@ -130,12 +173,7 @@ class UserBehavior(TaskSet):
     enrolled_users = set()
 
 
-class WebsiteUser(HttpLocust):
+class WebsiteUser(BaseUser):
     host = settings.LMS_BASE_URL
-    task_set = UserBehavior
-    min_wait = settings.LOCUST_TASK_MIN_WAIT
-    max_wait = settings.LOCUST_TASK_MAX_WAIT
-
-
-if __name__ == "__main__":
-    WebsiteUser().run()
+    tasks = [UserBehavior]
+    wait_time = wait_between(settings.LOCUST_TASK_MIN_WAIT, settings.LOCUST_TASK_MAX_WAIT)
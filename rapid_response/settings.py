@@ -1,13 +1,9 @@
 """
+Settings for the rapid response tests
 """
 import os
-import json
-
-
-def get_var(name, default=None):
-    """Return the settings in a the environment"""
-    return os.environ.get(name, default)
 
+from common.settings import get_json, get_list, get_var
 
 # locust settings
 LOCUST_TASK_MIN_WAIT = int(get_var('LOCUST_TASK_MIN_WAIT', 1000))
@@ -15,22 +11,18 @@ LOCUST_TASK_MAX_WAIT = int(get_var('LOCUST_TASK_MAX_WAIT', 3000))
 
 LMS_BASE_URL = get_var('LMS_BASE_URL', 'http://localhost:18000')
 
-usernames_in_edx_env = get_var('USERNAMES_IN_EDX')
-USERNAMES_IN_EDX = []
-# first try to load usernames from environment
-if usernames_in_edx_env:
-    USERNAMES_IN_EDX = [username.strip() for username in usernames_in_edx_env.split(',')]
-# otherwise load from file
-else:
-    with open(os.path.join(os.path.dirname(__file__), 'usernames.txt')) as user_file:
-        for username in user_file:
-            USERNAMES_IN_EDX.append(username.strip())
+# from the environment, or otherwise one per line in usernames.txt
+USERNAMES_IN_EDX = get_list('USERNAMES_IN_EDX', os.path.join(os.path.dirname(__file__), 'usernames.txt'))
+# from the environment, or otherwise course_data.json, see course_data.json.example
+RAPID_RESPONSE_COURSE_DATA = get_json(
+    'RAPID_RESPONSE_COURSE_DATA', os.path.join(os.path.dirname(__file__), 'course_data.json')
+)
 
-course_data_env = get_var('RAPID_RESPONSE_COURSE_DATA')
-RAPID_RESPONSE_COURSE_DATA = []
-# first try to load course data JSON from environment
-if course_data_env:
-    RAPID_RESPONSE_COURSE_DATA = json.loads(course_data_env.strip())
-else:
-    with open(os.path.join(os.path.dirname(__file__), 'course_data.json')) as course_data_file:
-        RAPID_RESPONSE_COURSE_DATA = json.load(course_data_file)
+# course launch, see launch.py
+# the problem everyone submits to, a block id from the course data, or "" for the first course's first block
+RAPID_RESPONSE_LAUNCH_BLOCK = get_var('RAPID_RESPONSE_LAUNCH_BLOCK', '')
+# seconds over which each burst's submissions are spread
+RAPID_RESPONSE_LAUNCH_SPREAD = float(get_var('RAPID_RESPONSE_LAUNCH_SPREAD', 5))
+# how many bursts, and the seconds from the start of one to the start of the next
+RAPID_RESPONSE_LAUNCH_BURSTS = int(get_var('RAPID_RESPONSE_LAUNCH_BURSTS', 1))
+RAPID_RESPONSE_LAUNCH_INTERVAL = float(get_var('RAPID_RESPONSE_LAUNCH_INTERVAL', 60))